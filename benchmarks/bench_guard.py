@@ -0,0 +1,65 @@
+"""Per-call overhead of `Guard.__call__`.
+
+Compares the compiled check plan with the reference (interpreted) path,
+which binds the arguments by `Description.parse_pass_in` and checks
+every value through `Guard.check_inputs`/`Guard.check_outputs`.
+
+    $ python -m benchmarks.bench_guard
+"""
+import timeit
+import typing as T
+
+from funcdesc import make_guard, Guard, Val
+
+
+def make_func(n_args: int) -> T.Callable:
+    """Create a function with `n_args` range limited int arguments."""
+    params = ", ".join(f"a{i}: Val[int, [0, 100]]" for i in range(n_args))
+    src = f"def func({params}) -> int:\n    return a0\n"
+    namespace: T.Dict[str, T.Any] = {}
+    exec(src, {"Val": Val}, namespace)
+    return namespace["func"]
+
+
+def reference_call(guard: Guard, *args, **kwargs):
+    """The guarded call without the compiled plan."""
+    pass_in = guard.desc.parse_pass_in(args, kwargs)
+    errors: list = []
+    guard.check_inputs(pass_in, errors)
+    res = guard.func(*args, **kwargs)
+    guard.check_outputs(res, errors)
+    return res
+
+
+def per_call(stmt: T.Callable, number: int) -> float:
+    """Best per-call time(in seconds) of `stmt` over 5 repeats."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number
+
+
+def bench(n_args: int, number: int = 20000) -> T.Dict[str, float]:
+    func = make_func(n_args)
+    guard = make_guard(func)
+    args = tuple(range(n_args))
+    raw = per_call(lambda: func(*args), number)
+    before = per_call(lambda: reference_call(guard, *args), number)
+    after = per_call(lambda: guard(*args), number)
+    return {
+        "raw": raw,
+        "before": before - raw,
+        "after": after - raw,
+    }
+
+
+def main():
+    print(f"{'args':>4} {'before(us)':>12} {'after(us)':>12} {'speedup':>8}")
+    for n_args in (1, 5, 20):
+        res = bench(n_args)
+        before, after = res["before"] * 1e6, res["after"] * 1e6
+        print(
+            f"{n_args:>4} {before:>12.3f} {after:>12.3f} "
+            f"{before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
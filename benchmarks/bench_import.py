@@ -0,0 +1,64 @@
+"""Import time of funcdesc, measured by `python -X importtime`.
+
+Each statement runs in a fresh interpreter, the cumulative import time
+of the imported modules is reported(best of several runs), along with
+the slowest funcdesc submodules of the first statement.
+
+    $ python -m benchmarks.bench_import
+"""
+import sys
+import subprocess
+import typing as T
+
+
+STATEMENTS = {
+    "import funcdesc": "import funcdesc",
+    "from funcdesc import Description": "from funcdesc import Description",
+    "from funcdesc import make_guard": "from funcdesc import make_guard",
+}
+
+
+def import_times(stmt: str) -> T.Dict[str, T.Tuple[int, int]]:
+    """Run the statement in a new interpreter, return the
+    (self, cumulative) import time(in us) of each module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative))
+    return times
+
+
+def total_time(times: T.Dict[str, T.Tuple[int, int]]) -> int:
+    """Import time of all modules imported by the statement,
+    the sum of the self times."""
+    return sum(s for s, _ in times.values())
+
+
+def bench(repeat: int = 5) -> T.Dict[str, float]:
+    """Best total import time(in seconds) of each statement."""
+    return {
+        name: min(total_time(import_times(stmt)) for _ in range(repeat)) / 1e6
+        for name, stmt in STATEMENTS.items()
+    }
+
+
+def main():
+    print(f"{'statement':<36} {'time(ms)':>10}")
+    for name, seconds in bench().items():
+        print(f"{name:<36} {seconds * 1e3:>10.2f}")
+    times = import_times(STATEMENTS["from funcdesc import make_guard"])
+    funcdesc_times = sorted(
+        ((s, n) for n, (s, _) in times.items() if n.startswith("funcdesc")),
+        reverse=True)
+    print("\nslowest funcdesc modules(self time) of `make_guard`:")
+    for self_us, name in funcdesc_times[:5]:
+        print(f"    {name:<32} {self_us / 1e3:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Lookups of a `DescriptionRegistry` vs scanning a dict of descriptions.
+
+Builds a registry of `N_DESCS` generated descriptions, then measures the
+best time(in microseconds) of each query answered by the indexes and by
+a linear scan, and of replacing one description.
+
+    $ python -m benchmarks.bench_index
+"""
+import time
+import typing as T
+
+from funcdesc import Description, Value, DescriptionRegistry
+from funcdesc.types import InputPath, WriteFile
+
+
+N_DESCS = 100000
+
+
+def make_desc(idx: int) -> Description:
+    inputs = [
+        Value(int, [0, 10], name=f"a{i}") for i in range(idx % 5 + 1)
+    ]
+    side_effects = []
+    if idx % 100 == 0:
+        inputs.append(Value(InputPath, name="path"))
+    if idx % 1000 == 0:
+        side_effects.append(WriteFile("{inputs[path]}.out"))
+    outputs = [Value(float if idx % 2 else str, name="out")]
+    return Description(inputs, outputs, side_effects, name=f"func{idx}")
+
+
+def best(func: T.Callable[[], T.Any], repeat: int = 5) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1e6
+
+
+def bench(n_descs: int = N_DESCS) -> T.Dict[str, T.Tuple[float, float]]:
+    """The (indexed, scan) times of the queries."""
+    descs = {f"func{i}": make_desc(i).freeze() for i in range(n_descs)}
+    reg = DescriptionRegistry(descs)
+    queries = {
+        "input_type": (
+            lambda: set(reg.with_input_type(InputPath)),
+            lambda: {n for n, d in descs.items()
+                     if any(v.type is InputPath for v in d.inputs)},
+        ),
+        "output_type": (
+            lambda: len(reg.with_output_type(float)),
+            lambda: len([n for n, d in descs.items()
+                         if any(v.type is float for v in d.outputs)]),
+        ),
+        "side_effect": (
+            lambda: set(reg.with_side_effect(WriteFile)),
+            lambda: {n for n, d in descs.items()
+                     if any(isinstance(s, WriteFile)
+                            for s in d.side_effects)},
+        ),
+        "find": (
+            lambda: reg.find(input_type=InputPath, side_effect=WriteFile),
+            lambda: {n for n, d in descs.items()
+                     if any(v.type is InputPath for v in d.inputs) and
+                     any(isinstance(s, WriteFile) for s in d.side_effects)},
+        ),
+    }
+    res = {q: (best(i), best(s)) for q, (i, s) in queries.items()}
+    new = make_desc(1).freeze()
+    res["replace"] = (best(lambda: reg.add("func0", new)), float("nan"))
+    return res
+
+
+def main():
+    print(f"{N_DESCS} descriptions")
+    print(f"{'query':>12} {'indexed(us)':>12} {'scan(us)':>12}")
+    for query, (indexed, scan) in bench().items():
+        print(f"{query:>12} {indexed:>12.1f} {scan:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
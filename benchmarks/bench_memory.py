@@ -0,0 +1,52 @@
+"""Memory footprint of Description objects.
+
+Reports the bytes allocated(measured by `tracemalloc`) per Description
+with different numbers of inputs and outputs.
+
+    $ python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+import typing as T
+
+from funcdesc import Description, Value
+
+
+def make_desc(idx: int, n_inputs: int, n_outputs: int) -> Description:
+    inputs = [
+        Value(int, [0, 10], name=f"a{i}") for i in range(n_inputs)
+    ]
+    outputs = [
+        Value(int, name=f"output_{i}") for i in range(n_outputs)
+    ]
+    return Description(inputs, outputs, name=f"func{idx}")
+
+
+def bytes_per_desc(
+        n_inputs: int, n_outputs: int, n_descs: int = 2000) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    descs = [make_desc(i, n_inputs, n_outputs) for i in range(n_descs)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del descs
+    return (end - start) / n_descs
+
+
+def bench() -> T.Dict[str, float]:
+    res = {}
+    for n_inputs, n_outputs in ((0, 1), (1, 1), (5, 1), (20, 3)):
+        res[f"{n_inputs}in_{n_outputs}out"] = bytes_per_desc(
+            n_inputs, n_outputs)
+    return res
+
+
+def main():
+    print(f"{'inputs/outputs':>14} {'bytes/desc':>12}")
+    for key, size in bench().items():
+        print(f"{key:>14} {size:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
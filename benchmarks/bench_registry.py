@@ -0,0 +1,104 @@
+"""Loading descriptions from a JSON Lines file vs a binary registry file.
+
+Writes the same descriptions in both formats, then in a fresh process
+for each case measures the time and the peak RSS(on Linux, in KB) of
+loading the whole file and of looking up a single description by name.
+`import_only` is the baseline RSS of a process only importing funcdesc.
+
+    $ python -m benchmarks.bench_registry
+"""
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import typing as T
+
+from funcdesc import Description, Value
+from funcdesc.utils.json import dump_jsonl
+from funcdesc.utils.binary import dump_binary
+
+
+N_DESCS = 20000
+
+_CASES = {
+    "import_only": "res = None\n",
+    "jsonl_all": (
+        "from funcdesc.utils.json import iter_jsonl\n"
+        "res = list(iter_jsonl(PATH + '.jsonl'))\n"
+    ),
+    "jsonl_one": (
+        "from funcdesc.utils.json import iter_jsonl\n"
+        "res = list(iter_jsonl(PATH + '.jsonl', names={NAME}))\n"
+    ),
+    "binary_all": (
+        "from funcdesc.utils.binary import BinaryRegistry\n"
+        "res = list(BinaryRegistry(PATH + '.bin'))\n"
+    ),
+    "binary_one": (
+        "from funcdesc.utils.binary import BinaryRegistry\n"
+        "res = BinaryRegistry(PATH + '.bin')[NAME]\n"
+    ),
+}
+
+_RUNNER = """
+import json, resource, time
+import funcdesc
+PATH, NAME = {path!r}, {name!r}
+t0 = time.perf_counter()
+{code}
+t1 = time.perf_counter()
+try:  # ru_maxrss survives exec, the peak of the parent leaks into it
+    with open("/proc/self/status") as f:
+        rss = int(next(ln for ln in f if ln.startswith("VmHWM")).split()[1])
+except (OSError, StopIteration):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": t1 - t0, "rss_kb": rss}}))
+"""
+
+
+def make_desc(idx: int) -> Description:
+    inputs = [
+        Value(int, [0, 10], name=f"a{i}", doc="an input")
+        for i in range(idx % 5 + 1)
+    ]
+    return Description(
+        inputs, [Value(float, name="out")],
+        name=f"func{idx}", doc="A generated function.")
+
+
+def run_case(path: str, name: str, code: str) -> T.Dict[str, float]:
+    src = _RUNNER.format(path=path, name=name, code=code)
+    out = subprocess.check_output([sys.executable, "-c", src])
+    return json.loads(out)
+
+
+def bench(n_descs: int = N_DESCS) -> T.Dict[str, T.Dict[str, float]]:
+    res = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "descs")
+        descs = [make_desc(i) for i in range(n_descs)]
+        dump_jsonl(descs, path + ".jsonl")
+        dump_binary(descs, path + ".bin")
+        name = f"func{n_descs // 2}"
+        for case, code in _CASES.items():
+            res[case] = run_case(path, name, code)
+        res["file_size"] = {
+            "jsonl": os.path.getsize(path + ".jsonl"),
+            "binary": os.path.getsize(path + ".bin"),
+        }
+    return res
+
+
+def main():
+    res = bench()
+    sizes = res.pop("file_size")
+    print(f"file size: jsonl {sizes['jsonl']} bytes, "
+          f"binary {sizes['binary']} bytes")
+    print(f"{'case':>12} {'ms':>10} {'peak RSS(KB)':>14}")
+    for case, r in res.items():
+        print(f"{case:>12} {r['seconds'] * 1e3:>10.2f} {r['rss_kb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Benchmark suite of funcdesc, for catching performance regressions.
+
+Measures `parse_func`, the `Guard.__call__` overhead with every
+combination of the check flags, JSON round trips, `desc_to_pydantic`,
+`compose_signature` and the import time(see `bench_import`).
+Every result is the best per-operation time(in seconds) over
+several repeats.
+
+    $ python -m benchmarks.run                        # print the results
+    $ python -m benchmarks.run -o baseline.json       # save as JSON
+    $ python -m benchmarks.run --baseline baseline.json --max-slowdown 1.3
+
+With `--baseline`, the results are compared with a saved run and the
+command exits with status 1 when any benchmark is slower than
+`max_slowdown` times its baseline, and by more than `min_delta_ns`
+nanoseconds(the guard overheads are differences of small times,
+their ratios are dominated by noise). `--filter` selects benchmarks by
+name prefix, `--quick` runs fewer iterations.
+"""
+import sys
+import json
+import timeit
+import argparse
+import platform
+import itertools
+import typing as T
+
+import funcdesc
+from funcdesc import Description, Val, SideEffect, make_guard, parse_func
+from funcdesc.mark import mark_input, mark_output, mark_side_effect
+
+from .bench_import import STATEMENTS, bench as import_bench
+
+
+Bench = T.Callable[[], None]
+
+
+def make_func(n_args: int, marks: str) -> T.Callable:
+    """Create a function with `n_args` arguments, `marks` is one of:
+    "plain"(only type annotations), "val"(`Val` annotations),
+    "decorator"(`mark_input`/`mark_output` decorators)."""
+    if marks == "val":
+        params = ", ".join(f"a{i}: Val[int, [0, 100]]" for i in range(n_args))
+        ret = "Val[int, [0, 100]]"
+    else:
+        params = ", ".join(f"a{i}: int" for i in range(n_args))
+        ret = "int"
+    src = f"def func({params}) -> {ret}:\n    return 0\n"
+    namespace: T.Dict[str, T.Any] = {}
+    exec(src, {"Val": Val}, namespace)
+    func = namespace["func"]
+    if marks == "decorator":
+        for i in range(n_args):
+            func = mark_input(f"a{i}", range=[0, 100], doc="an arg")(func)
+        func = mark_output(0, range=[0, 100])(func)
+    return func
+
+
+class NoopEffect(SideEffect):
+    def __init__(self):
+        super().__init__("do nothing")
+
+
+def parse_benches() -> T.Dict[str, Bench]:
+    res = {}
+    for n_args, marks in itertools.product(
+            (0, 5, 20), ("plain", "val", "decorator")):
+        func = make_func(n_args, marks)
+        res[f"parse_func/{n_args}args_{marks}"] = \
+            (lambda f: lambda: parse_func(f))(func)
+    return res
+
+
+def guard_benches() -> T.Dict[str, Bench]:
+    """Per-call time of the guarded function minus the raw function."""
+    res = {}
+    func = mark_side_effect(NoopEffect())(make_func(5, "val"))
+    args = tuple(range(5))
+    names = ("inputs", "outputs", "type", "range", "side_effect")
+    for flags in itertools.product((True, False), repeat=len(names)):
+        kwargs = {f"check_{n}": f for n, f in zip(names, flags)}
+        guard = make_guard(func, **kwargs)
+        label = "_".join(n for n, f in zip(names, flags) if f) or "none"
+        res[f"guard/{label}"] = (lambda g: lambda: g(*args))(guard)
+    res["guard/raw"] = lambda: func(*args)
+    return res
+
+
+def desc_benches() -> T.Dict[str, Bench]:
+    res: T.Dict[str, Bench] = {}
+    desc = parse_func(make_func(5, "decorator"))
+    json_str = desc.to_json()
+    res["json/to_json"] = desc.to_json
+    res["json/from_json"] = lambda: Description.from_json(json_str)
+    res["json/round_trip"] = \
+        lambda: Description.from_json(desc.to_json())
+    res["signature/compose_signature"] = desc.compose_signature
+    try:
+        from funcdesc.pydantic import desc_to_pydantic
+    except ImportError:  # pragma: no cover
+        pass
+    else:
+        res["pydantic/desc_to_pydantic"] = \
+            lambda: desc_to_pydantic(desc, cache=True)
+        res["pydantic/desc_to_pydantic_uncached"] = \
+            lambda: desc_to_pydantic(desc)
+    return res
+
+
+def all_benches() -> T.Dict[str, Bench]:
+    res = {}
+    res.update(parse_benches())
+    res.update(guard_benches())
+    res.update(desc_benches())
+    return res
+
+
+def per_op(stmt: Bench, min_time: float, repeat: int) -> float:
+    """Best per-operation time of `stmt` over `repeat` runs,
+    each run lasts at least about `min_time` seconds."""
+    timer = timeit.Timer(stmt)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(
+        prefixes: T.Sequence[str] = (), quick: bool = False,
+        ) -> T.Dict[str, T.Any]:
+    min_time, repeat = (0.01, 3) if quick else (0.05, 5)
+
+    def selected(name: str) -> bool:
+        return (not prefixes) or any(name.startswith(p) for p in prefixes)
+
+    results = {}
+    for name, stmt in all_benches().items():
+        if selected(name):
+            results[name] = per_op(stmt, min_time, repeat)
+    if any(selected(f"import/{stmt}") for stmt in STATEMENTS):
+        for stmt, seconds in import_bench(repeat).items():
+            if selected(f"import/{stmt}"):
+                results[f"import/{stmt}"] = seconds
+    raw = results.get("guard/raw")
+    if raw is not None:
+        for name in results:
+            if name.startswith("guard/") and name != "guard/raw":
+                results[name] = max(results[name] - raw, 0.0)
+    return {
+        "meta": {
+            "funcdesc": funcdesc.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+        results: T.Dict[str, float],
+        baseline: T.Dict[str, float],
+        max_slowdown: float,
+        min_delta: float = 0.0,
+        ) -> T.List[T.Tuple[str, float, float, float]]:
+    """Return the (name, baseline, current, ratio) of the benchmarks
+    slower than `max_slowdown` times the baseline and by more than
+    `min_delta` seconds."""
+    slower = []
+    for name, time in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if time - base <= max(base * (max_slowdown - 1), min_delta):
+            continue
+        ratio = time / base if base else float("inf")
+        slower.append((name, base, time, ratio))
+    return slower
+
+
+def print_results(
+        results: T.Dict[str, float],
+        baseline: T.Optional[T.Dict[str, float]] = None):
+    print(f"{'benchmark':<44} {'time(us)':>10} {'baseline':>10} {'ratio':>7}")
+    for name, time in results.items():
+        line = f"{name:<44} {time * 1e6:>10.3f}"
+        base = (baseline or {}).get(name)
+        if base:
+            line += f" {base * 1e6:>10.3f} {time / base:>6.2f}x"
+        print(line)
+
+
+def main(argv: T.Optional[T.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON to compare with")
+    parser.add_argument(
+        "--max-slowdown", type=float, default=1.25,
+        help="fail when a benchmark is slower than this times the baseline")
+    parser.add_argument(
+        "--min-delta-ns", type=float, default=100.0,
+        help="ignore slowdowns smaller than this(in nanoseconds)")
+    parser.add_argument(
+        "--filter", action="append", default=[],
+        help="only run the benchmarks with this name prefix")
+    parser.add_argument("--quick", action="store_true")
+    opts = parser.parse_args(argv)
+
+    report = run(opts.filter, opts.quick)
+    results = report["results"]
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump(report, f, indent=2)
+    baseline = None
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    if baseline is None:
+        return 0
+    slower = compare(
+        results, baseline, opts.max_slowdown, opts.min_delta_ns * 1e-9)
+    for name, base, time, ratio in slower:
+        print(
+            f"SLOWER: {name} {base * 1e6:.3f}us -> {time * 1e6:.3f}us "
+            f"({ratio:.2f}x > {opts.max_slowdown}x)")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
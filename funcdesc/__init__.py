@@ -1,17 +1,57 @@
-from .desc import Description, Value, SideEffect
-from .guard import make_guard, Guard
-from .parse import parse_func
-from .mark import (
-    mark_input, mark_output, mark_side_effect,
-    Val, Outputs,
-)
+import typing as T
+import importlib
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .desc import Description, Value, SideEffect
+    from .guard import make_guard, Guard, AsyncGuard
+    from .parse import parse_func
+    from .registry import DescriptionRegistry
+    from .mark import (
+        mark_input, mark_output, mark_side_effect,
+        Val, Outputs,
+    )
+
+# the submodules are imported on first access of their attributes,
+# keep `import funcdesc` cheap for the tools only reading descriptions
+_LAZY_ATTRS = {
+    "Description": "desc", "Value": "desc", "SideEffect": "desc",
+    "make_guard": "guard", "Guard": "guard", "AsyncGuard": "guard",
+    "parse_func": "parse",
+    "DescriptionRegistry": "registry",
+    "mark_input": "mark", "mark_output": "mark", "mark_side_effect": "mark",
+    "Val": "mark", "Outputs": "mark",
+}
+
+# submodules accessible as attributes, like when they were all
+# imported by the package
+_SUBMODULES = frozenset({
+    "batch", "desc", "disk_cache", "errors", "executor", "guard", "mark",
+    "metrics", "parse", "plan", "policy", "pydantic", "registry", "scan",
+    "types", "utils", "validators",
+})
 
 __all__ = [
     "Description", "Value", "SideEffect",
-    "make_guard", "Guard",
-    "parse_func",
+    "make_guard", "Guard", "AsyncGuard",
+    "parse_func", "DescriptionRegistry",
     "mark_input", "mark_output", "mark_side_effect",
     "Val", "Outputs"
 ]
 
 __version__ = '0.1.9'
+
+
+def __getattr__(name: str) -> T.Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        if name in _SUBMODULES:
+            # also bound as an attribute by the import system
+            return importlib.import_module(f".{name}", __name__)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> T.List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS) | _SUBMODULES)
@@ -0,0 +1,302 @@
+import typing as T
+import inspect
+from collections.abc import Mapping
+
+from .desc import Description, Value, NotDef, _check_number_in_range
+from .errors import CheckError
+from .plan import _type_error, _range_error, _missing_error, _tag_error
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .guard import Guard, AsyncGuard
+
+
+Rows = T.Union[
+    T.Sequence[T.Union[tuple, T.Mapping[str, T.Any]]],
+    T.Mapping[str, T.Sequence],
+]
+Call = T.Tuple[tuple, T.Dict[str, T.Any]]
+
+
+def _import_numpy() -> T.Any:
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+class BatchResult():
+    """The results of calling a guarded function on many rows.
+
+    `results[i]` is the return value of the i-th row,
+    `errors[i]` the check errors of the i-th row if it is invalid,
+    or the exception raised by the function on it. The function is
+    only called on the rows whose inputs are valid.
+    """
+    def __init__(self, n_rows: int) -> None:
+        self.n_rows = n_rows
+        self.results: T.List[T.Any] = [None] * n_rows
+        self.errors: T.Dict[int, T.List[Exception]] = {}
+
+    @property
+    def valid_rows(self) -> T.List[int]:
+        return [i for i in range(self.n_rows) if i not in self.errors]
+
+    def __repr__(self) -> str:
+        return (
+            f"<BatchResult n_rows={self.n_rows} "
+            f"n_errors={len(self.errors)}>"
+        )
+
+
+def rows_to_calls(rows: Rows) -> T.List[Call]:
+    """Convert the rows to (args, kwargs) pairs."""
+    if isinstance(rows, Mapping):
+        names = list(rows.keys())
+        columns = [rows[n] for n in names]
+        if len(set(len(c) for c in columns)) > 1:
+            raise ValueError("All columns should have the same length.")
+        return [((), dict(zip(names, vals))) for vals in zip(*columns)]
+    calls: T.List[Call] = []
+    for row in rows:
+        if isinstance(row, Mapping):
+            calls.append(((), dict(row)))
+        else:
+            calls.append((tuple(row), {}))
+    return calls
+
+
+def _bind_columns(
+        desc: Description, columns: T.Mapping[str, T.Sequence],
+        ) -> T.Dict[str, T.Sequence]:
+    """Bind a column-oriented mapping to the inputs without
+    building the rows."""
+    binding = desc.binding_plan
+    n_rows = len(next(iter(columns.values()))) if columns else 0
+    if any(len(c) != n_rows for c in columns.values()):
+        raise ValueError("All columns should have the same length.")
+    bound: T.Dict[str, T.Sequence] = {}
+    for name, kind, _, default in binding.slots:
+        if kind is inspect.Parameter.VAR_POSITIONAL:
+            bound[name] = [()] * n_rows
+        elif kind is inspect.Parameter.VAR_KEYWORD:
+            extra = [n for n in columns if n not in binding.keyword_names]
+            bound[name] = [
+                {n: columns[n][i] for n in extra} for i in range(n_rows)]
+        elif (kind is not inspect.Parameter.POSITIONAL_ONLY) and \
+                (name in columns):
+            bound[name] = columns[name]
+        elif default is not NotDef:
+            bound[name] = [default] * n_rows
+        else:
+            raise _missing_error(name)
+    if binding.var_keyword is None:
+        for name in columns:
+            if name not in binding.keyword_names:
+                raise TypeError(
+                    f"got an unexpected keyword argument '{name}'")
+    return bound
+
+
+def _vectorizable(values: T.Sequence, range_: T.Any, np: T.Any) -> T.Any:
+    """The (array, low, high) to compare the values with the bounds by
+    NumPy with the same results as the scalar checks, None if it can't.
+    """
+    try:
+        low, high = range_
+    except (TypeError, ValueError):
+        return None
+    arr = np.asarray(values)
+    if arr.ndim != 1:
+        return None
+    kind = arr.dtype.kind
+    if kind in "iu":
+        # the bounds are cast to the dtype of the array, or compared
+        # as floats(inexact above 2**53)
+        info = np.iinfo(arr.dtype)
+        for b in (low, high):
+            if (type(b) is not int) or not (info.min <= b <= info.max):
+                return None
+    elif kind == "f":
+        if (not isinstance(values, np.ndarray)) and \
+                not all(isinstance(v, float) for v in values):
+            return None  # the ints were converted to floats
+        for b in (low, high):
+            if not isinstance(b, (int, float)) or (float(b) != b):
+                return None
+    else:
+        return None
+    return arr, low, high
+
+
+def _check_column(
+        val: Value,
+        values: T.Sequence,
+        row_ids: T.Sequence[int],
+        type_checker: T.Optional[T.Callable],
+        range_checker: T.Optional[T.Callable],
+        np: T.Any,
+        ) -> T.Dict[int, Exception]:
+    """Check the values of one input in all rows,
+    return the first error of each invalid row."""
+    errors: T.Dict[int, Exception] = {}
+    if val.kind is inspect.Parameter.VAR_POSITIONAL:
+        row_ids = [r for r, vs in zip(row_ids, values) for _ in vs]
+        values = [v for vs in values for v in vs]
+    elif val.kind is inspect.Parameter.VAR_KEYWORD:
+        row_ids = [r for r, vs in zip(row_ids, values) for _ in vs]
+        values = [v for vs in values for v in vs.values()]
+    if type_checker is not None:
+        passed_values, passed_rows = [], []
+        for row, v in zip(row_ids, values):
+            try:
+                if not type_checker(v, val.type):
+                    raise _type_error(v, val.type)
+            except Exception as e:
+                errors.setdefault(row, _tag_error(e, val))
+            else:
+                passed_values.append(v)
+                passed_rows.append(row)
+        values, row_ids = passed_values, passed_rows
+    if range_checker is None:
+        return errors
+    # the same range in both branches, up to date with the value's
+    range_ = val.checked_range
+    vectorized = None
+    if (np is not None) and (range_checker is _check_number_in_range) \
+            and (range_ is not None):
+        vectorized = _vectorizable(values, range_, np)
+    if vectorized is not None:
+        arr, low, high = vectorized
+        in_range = (arr >= low) & (arr <= high)
+        for idx in np.flatnonzero(~in_range):
+            err = _range_error(values[idx], range_)
+            errors.setdefault(row_ids[idx], _tag_error(err, val))
+        return errors
+    for row, v in zip(row_ids, values):
+        try:
+            if not range_checker(v, range_):
+                raise _range_error(v, range_)
+        except Exception as e:
+            errors.setdefault(row, _tag_error(e, val))
+    return errors
+
+
+def check_batch(
+        guard: "Guard",
+        rows: Rows,
+        vectorize: bool = True,
+        ) -> T.Tuple[T.List[Call], T.Dict[int, T.List[Exception]]]:
+    """Bind and check the inputs of all rows, value by value.
+
+    Return the (args, kwargs) of the rows and the errors of the
+    invalid rows. Range checks of numbers are done by vectorized
+    NumPy comparisons when NumPy is installed and `vectorize` is set.
+    """
+    desc = guard.desc
+    calls = rows_to_calls(rows)
+    errors: T.Dict[int, T.List[Exception]] = {}
+    row_ids: T.List[int]
+    if isinstance(rows, Mapping):
+        try:
+            columns = _bind_columns(desc, rows)
+        except TypeError as e:
+            return calls, {i: [e] for i in range(len(calls))}
+        row_ids = list(range(len(calls)))
+    else:
+        bound, row_ids = [], []
+        for i, (args, kwargs) in enumerate(calls):
+            try:
+                bound.append(desc.parse_pass_in(args, kwargs))
+                row_ids.append(i)
+            except TypeError as e:
+                errors[i] = [e]
+        columns = {
+            name: [b[name] for b in bound]
+            for name, *_ in desc.binding_plan.slots
+        }
+    if not guard.is_check_inputs:
+        return calls, errors
+    np = _import_numpy() if vectorize else None
+    plan = guard.plan
+    for val, (name, *_) in zip(desc.inputs, desc.binding_plan.slots):
+        type_checker, range_checker = plan.resolve_checkers(val)
+        if (type_checker is None) and (range_checker is None):
+            continue
+        val_errors = _check_column(
+            val, columns[name], row_ids,
+            type_checker, range_checker, np)
+        for row, err in val_errors.items():
+            errors.setdefault(row, []).append(err)
+    return calls, errors
+
+
+def map_batch(
+        guard: "Guard",
+        rows: Rows,
+        vectorize: bool = True,
+        ) -> BatchResult:
+    """Check all rows at once, then call the function
+    on the valid rows and check their outputs."""
+    calls, errors = check_batch(guard, rows, vectorize)
+    result = BatchResult(len(calls))
+    result.errors.update(errors)
+    with_side_effects = guard._with_side_effects
+    for i, (args, kwargs) in enumerate(calls):
+        if i in errors:
+            continue
+        try:
+            if with_side_effects:
+                pass_in = guard.desc.parse_pass_in(args, kwargs)
+                guard.check_side_effects_before_run(pass_in, [])
+            res = guard.func(*args, **kwargs)
+            guard.plan.check_outputs(res)
+            if with_side_effects:
+                guard.check_side_effects_after_run(pass_in, res, [])
+        except CheckError as e:
+            err = e.args[0]
+            result.errors[i] = err if isinstance(err, list) else [e]
+            continue
+        except Exception as e:  # raised by the function, keep the others
+            result.errors[i] = [e]
+            continue
+        result.results[i] = res
+    return result
+
+
+async def async_map_batch(
+        guard: "AsyncGuard",
+        rows: Rows,
+        vectorize: bool = True,
+        ) -> BatchResult:
+    """`map_batch` for coroutine functions,
+    the valid rows are run concurrently."""
+    import asyncio  # heavy, only needed by the coroutine functions
+    calls, errors = check_batch(guard, rows, vectorize)
+    result = BatchResult(len(calls))
+    result.errors.update(errors)
+    with_side_effects = guard._with_side_effects
+
+    async def run(i: int, args: tuple, kwargs: dict):
+        try:
+            if with_side_effects:
+                pass_in = guard.desc.parse_pass_in(args, kwargs)
+                await guard.async_check_side_effects_before_run(pass_in, [])
+            res = await guard.func(*args, **kwargs)
+            guard.plan.check_outputs(res)
+            if with_side_effects:
+                await guard.async_check_side_effects_after_run(
+                    pass_in, res, [])
+        except CheckError as e:
+            err = e.args[0]
+            result.errors[i] = err if isinstance(err, list) else [e]
+        except Exception as e:
+            result.errors[i] = [e]
+        else:
+            result.results[i] = res
+
+    await asyncio.gather(*[
+        run(i, args, kwargs) for i, (args, kwargs) in enumerate(calls)
+        if i not in errors
+    ])
+    return result
@@ -1,15 +1,24 @@
 import typing as T
-from copy import copy
 import inspect
+import types
 
 from .utils.json import DescriptionJSONEncoder, DescriptionJSONDecoder
 from .utils.misc import CreateByGetItem
+from .utils.fingerprint import canonical, digest
+from .validators import ContainerStrategy, compile_check, is_typing_construct
 
 
 class _NotDef:
     def __str__(self):
         return "NotDef"
 
+    def __repr__(self):
+        return "NotDef"
+
+    def __reduce__(self):
+        # keep the singleton when pickled or copied
+        return "NotDef"
+
 
 NotDef = _NotDef()
 
@@ -17,14 +26,141 @@ NotDef = _NotDef()
 T1 = T.TypeVar("T1")
 
 
+class Pending:
+    """Placeholder of a lazily computed `type` or `doc` of a Value,
+    replaced by the result of `compute` when the attribute is first
+    read. Pickled as the computed value."""
+    __slots__ = ("compute",)
+
+    def __init__(self, compute: T.Callable[[], T.Any]) -> None:
+        self.compute = compute
+
+    def __reduce__(self):
+        return (_resolved, (self.compute(),))
+
+
+def _resolved(value: T.Any) -> T.Any:
+    return value
+
+
+class _Frozen:
+    """Mixin for the immutable variants of the description classes,
+    instances are switched to them by the `freeze` methods."""
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f"Can't set attribute '{name}' of a frozen "
+            f"{_thawed_class(type(self)).__name__}."
+        )
+
+    def __delattr__(self, name):
+        raise AttributeError(
+            f"Can't delete attribute '{name}' of a frozen "
+            f"{_thawed_class(type(self)).__name__}."
+        )
+
+    def __reduce__(self):
+        # frozen classes are created dynamically, pickle a mutable copy
+        return (_freeze, (self.copy(),))  # type: ignore
+
+    def __hash__(self):
+        return hash(self._hash_key())  # type: ignore
+
+
+def _freeze(obj):
+    return obj.freeze()
+
+
+_frozen_classes: T.Dict[type, type] = {}
+
+
+def _frozen_class(cls: type) -> type:
+    if issubclass(cls, _Frozen):
+        return cls
+    frozen = _frozen_classes.get(cls)
+    if frozen is None:
+        frozen = type(f"Frozen{cls.__name__}", (cls, _Frozen), {
+            "__slots__": (),
+            "__module__": cls.__module__,
+            # `__eq__` of the mutable classes disables the hashing
+            "__hash__": _Frozen.__hash__,
+        })
+        _frozen_classes[cls] = frozen
+    return frozen
+
+
+def _thawed_class(cls: type) -> type:
+    if issubclass(cls, _Frozen):
+        return cls.__bases__[0]
+    return cls
+
+
+def _range_copy(range_: T.Any) -> T.Any:
+    """Shallow copy of a mutable range(compared with the range to
+    detect the edits made in place), None for the other ranges."""
+    if isinstance(range_, (list, dict, set)):
+        return range_.copy()
+    return None
+
+
+_slot_names: T.Dict[type, T.Tuple[str, ...]] = {}
+
+
+def _copy_attrs(src: T.Any, cls: type) -> T.Any:
+    """Create an instance of `cls` with the attributes(slots and
+    `__dict__`) of `src`, without calling `__init__`."""
+    names = _slot_names.get(cls)
+    if names is None:
+        names = _slot_names[cls] = tuple(
+            n for klass in cls.__mro__
+            for n in getattr(klass, "__slots__", ())
+            # the fingerprint cache is only valid for the frozen `src`
+            if n not in ("__dict__", "__weakref__", "_fingerprint")
+        )
+    new: T.Any = object.__new__(cls)
+    for n in names:
+        try:
+            object.__setattr__(new, n, getattr(src, n))
+        except AttributeError:  # unset slot
+            pass
+    if hasattr(src, "__dict__"):
+        new.__dict__.update(src.__dict__)
+    return new
+
+
 TypeChecker = T.Callable[[T.Any, type], bool]
 RangeChecker = T.Callable[[T.Any, T.Any], bool]
 
 
+def _checker_mro(type_: T.Any) -> T.Tuple[T.Any, ...]:
+    """The classes to look up the checkers for, most specific first."""
+    if isinstance(type_, type) and \
+            not isinstance(type_, types.GenericAlias):  # type: ignore
+        return type_.__mro__
+    return ()
+
+
+def _as_type_checker(check: T.Callable[[T.Any], bool]) -> TypeChecker:
+    def type_checker(v, type_):
+        return check(v)
+    return type_checker
+
+
 class Value(metaclass=CreateByGetItem):
     """The description of a value."""
-    type_to_range_checker: T.Dict[type, TypeChecker] = {}
-    type_to_type_checker: T.Dict[type, RangeChecker] = {}
+    __slots__ = (
+        "name", "_type", "range", "default", "_doc", "kind",
+        "_kwargs", "_checkers", "_fingerprint",
+    )
+    type_to_range_checker: T.Dict[type, RangeChecker] = {}
+    type_to_type_checker: T.Dict[type, TypeChecker] = {}
+    # increased when a checker is registered,
+    # for invalidating the resolved checkers
+    checker_version = 0
+    # elements of the containers checked for the generic types,
+    # can be overridden per value by the `container_strategy` kwarg
+    container_strategy = ContainerStrategy("full")
 
     def __init__(
             self,
@@ -33,37 +169,157 @@ class Value(metaclass=CreateByGetItem):
             default: T.Union[_NotDef, T1] = NotDef,
             name: T.Optional[str] = None,
             doc: T.Optional[str] = None,
+            kind: T.Optional[inspect._ParameterKind] = None,
             **kwargs,
             ):
         self.name = name
         self.type = type_
         self.range = range_
         self.default = default
-        self.kwargs = kwargs
+        # allocated on first access of `kwargs`
+        self._kwargs: T.Optional[T.Dict[str, T.Any]] = kwargs or None
         self.doc = doc
+        # parameter kind of an input, None means POSITIONAL_OR_KEYWORD
+        self.kind = kind
+        self._checkers: T.Optional[tuple] = None
 
     @property
-    def type_checker(self):
-        if self.type is None:
-            return None
-        else:
-            return self.type_to_type_checker.get(self.type.__name__, None)
+    def type(self) -> T.Any:
+        type_ = self._type
+        if type_.__class__ is Pending:
+            type_ = type_.compute()
+            # bypass the frozen check, it's a cache
+            object.__setattr__(self, "_type", type_)
+        return type_
+
+    @type.setter
+    def type(self, type_: T.Any):
+        self._type = type_
 
     @property
-    def range_checker(self):
-        if self.type is None:
-            return None
-        else:
-            return self.type_to_range_checker.get(self.type.__name__, None)
+    def doc(self) -> T.Optional[str]:
+        doc = self._doc
+        if doc.__class__ is Pending:
+            doc = doc.compute()
+            object.__setattr__(self, "_doc", doc)
+        return doc
+
+    @doc.setter
+    def doc(self, doc: T.Optional[str]):
+        self._doc = doc
+
+    @property
+    def kwargs(self) -> T.Dict[str, T.Any]:
+        """Extra attributes of the value."""
+        kwargs = self._kwargs
+        if kwargs is None:
+            kwargs = {}
+            object.__setattr__(self, "_kwargs", kwargs)
+        return kwargs
+
+    @kwargs.setter
+    def kwargs(self, kwargs: T.Dict[str, T.Any]):
+        self._kwargs = kwargs
+
+    @property
+    def checkers(
+            self
+            ) -> T.Tuple[T.Optional[TypeChecker], T.Optional[RangeChecker]]:
+        """The (type_checker, range_checker) pair of the value, cached
+        until the type is changed or a new checker is registered."""
+        cache = self._checkers
+        strategy = None if self._kwargs is None else \
+            self._kwargs.get("container_strategy")
+        if (cache is None) or (cache[0] != Value.checker_version) or \
+                (cache[1] is not self.type) or (cache[2] is not strategy):
+            cache = (
+                Value.checker_version, self.type, strategy,
+                *self.resolve_checkers(self.type, strategy))
+            # bypass the frozen check, it's a cache
+            object.__setattr__(self, "_checkers", cache)
+        return cache[3], cache[4]
+
+    @property
+    def type_checker(self) -> T.Optional[TypeChecker]:
+        return self.checkers[0]
+
+    @property
+    def range_checker(self) -> T.Optional[RangeChecker]:
+        return self.checkers[1]
+
+    @property
+    def checked_range(self) -> T.Any:
+        """The range passed to the range checker. Checkers with a
+        `prepare_range` attribute get the range prepared by it(e.g. a
+        hashed index of the allowed values), cached with the checkers
+        until the range is replaced or edited in place(compared with a
+        copy of it)."""
+        range_checker = self.range_checker
+        prepare = getattr(range_checker, "prepare_range", None)
+        range_ = self.range
+        if prepare is None:
+            return range_
+        cache = T.cast(tuple, self._checkers)
+        if (len(cache) == 5) or (cache[5] is not range_) or \
+                ((cache[6] is not None) and (cache[6] != range_)):
+            cache = cache[:5] + (range_, _range_copy(range_), prepare(range_))
+            object.__setattr__(self, "_checkers", cache)
+        return cache[7]
+
+    @classmethod
+    def resolve_checkers(
+            cls, type_: T.Any,
+            strategy: T.Optional[ContainerStrategy] = None,
+            ) -> T.Tuple[T.Optional[TypeChecker], T.Optional[RangeChecker]]:
+        """Find the checkers registered for the type or,
+        following the MRO, for its nearest base class.
+
+        Typing constructs(`List[int]`, `Optional[str]`, `Literal[1, 2]`
+        ...) get a type checker compiled from their structure, the
+        elements of the containers are selected by `strategy`
+        (`Value.container_strategy` by default)."""
+        type_checker, range_checker = None, None
+        for klass in _checker_mro(type_):
+            if type_checker is None:
+                type_checker = cls.type_to_type_checker.get(klass)
+            if range_checker is None:
+                range_checker = cls.type_to_range_checker.get(klass)
+        if (type_checker is None) and is_typing_construct(type_):
+            check = compile_check(
+                type_, strategy or cls.container_strategy,
+                lambda klass: cls.resolve_checkers(klass)[0])
+            if check is not None:
+                type_checker = _as_type_checker(check)
+        return type_checker, range_checker
 
     @classmethod
     def register_range_check(cls, type, checker):
-        cls.type_to_range_checker[type.__name__] = checker
+        cls.type_to_range_checker[type] = checker
+        Value.checker_version += 1
 
     @classmethod
     def register_type_check(cls, type, checker=None):
         checker = checker or (lambda v, t: isinstance(v, t))
-        cls.type_to_type_checker[type.__name__] = checker
+        cls.type_to_type_checker[type] = checker
+        Value.checker_version += 1
+
+    @property
+    def frozen(self) -> bool:
+        return isinstance(self, _Frozen)
+
+    def freeze(self) -> "Value":
+        """Make the value immutable(in place) and return it."""
+        if self.frozen:
+            return self
+        self.__class__ = _frozen_class(type(self))
+        return self
+
+    def copy(self) -> "Value":
+        """Get a mutable copy of the value."""
+        new: Value = _copy_attrs(self, _thawed_class(type(self)))
+        if self._kwargs is not None:
+            new._kwargs = dict(self._kwargs)
+        return new
 
     def check_type(self, val):
         if self.type_checker is not None:
@@ -73,7 +329,7 @@ class Value(metaclass=CreateByGetItem):
 
     def check_range(self, val):
         if (self.range_checker is not None):
-            if (not self.range_checker(val, self.range)):
+            if (not self.range_checker(val, self.checked_range)):
                 raise ValueError(
                     f"Value {val} is not in a valid range({self.range}).")
 
@@ -83,13 +339,36 @@ class Value(metaclass=CreateByGetItem):
             f"default={self.default}>"
         )
 
+    def fingerprint(self) -> str:
+        """Structural fingerprint(hex digest) of the value, the same
+        across processes for the equal values, usable as a cache key.
+        The kwargs are not included. Cached when the value is frozen."""
+        fp = getattr(self, "_fingerprint", None)
+        if fp is None:
+            fp = digest("Value", canonical((
+                self.name, self.doc, self.type,
+                self.range, self.default, self.kind,
+            )))
+            if self.frozen:
+                object.__setattr__(self, "_fingerprint", fp)
+        return fp
+
+    def _hash_key(self) -> tuple:
+        # only the fields always hashable, consistent with `__eq__`
+        try:
+            type_ = hash(self.type)
+        except TypeError:
+            type_ = None
+        return (self.name, self.doc, self.kind, type_)
+
     def __eq__(self, other):
         return (
             self.name == other.name and
             self.doc == other.doc and
             self.type == other.type and
             self.range == other.range and
-            self.default == other.default
+            self.default == other.default and
+            self.kind == other.kind
         )
 
 
@@ -107,6 +386,8 @@ Value.register_type_check(bool)
 
 
 class SideEffect():
+    __slots__ = ("_description",)
+
     def __init__(self, description: str):
         self._description = description
 
@@ -123,12 +404,123 @@ class SideEffect():
     def __repr__(self):
         return f"<{self.__class__.__name__} description={self.description}>"
 
+    def fingerprint(self) -> str:
+        """Structural fingerprint of the side effect:
+        its class and description."""
+        cls = type(self)
+        return digest(
+            "SideEffect", f"{cls.__module__}.{cls.__qualname__}",
+            canonical(self.description))
+
     def __eq__(self, other):
         return self.description == other.description
 
+    def __hash__(self):
+        return hash(self.description)
+
+
+_POSITIONAL_ONLY = inspect.Parameter.POSITIONAL_ONLY
+_POSITIONAL_OR_KEYWORD = inspect.Parameter.POSITIONAL_OR_KEYWORD
+_VAR_POSITIONAL = inspect.Parameter.VAR_POSITIONAL
+_KEYWORD_ONLY = inspect.Parameter.KEYWORD_ONLY
+_VAR_KEYWORD = inspect.Parameter.VAR_KEYWORD
+
+
+class BindingPlan():
+    """Precomputed plan for binding the pass in arguments
+    to the inputs of a description."""
+    def __init__(self, inputs: T.List[Value]):
+        self.n_inputs = len(inputs)
+        # what the plan was built from, see `matches`
+        self._source = [
+            (val, val.name, val.kind, val.default) for val in inputs]
+        # (name, kind, position, default) for each input
+        self.slots: T.List[T.Tuple[str, T.Any, int, T.Any]] = []
+        self.keyword_names: T.Set[str] = set()
+        self.var_positional: T.Optional[str] = None
+        self.var_keyword: T.Optional[str] = None
+        n_positional = 0
+        for val in inputs:
+            name = "?" if val.name is None else val.name
+            kind = _POSITIONAL_OR_KEYWORD if val.kind is None else val.kind
+            if kind in (_POSITIONAL_ONLY, _POSITIONAL_OR_KEYWORD):
+                self.slots.append((name, kind, n_positional, val.default))
+                n_positional += 1
+            else:
+                self.slots.append((name, kind, -1, val.default))
+            if kind in (_POSITIONAL_OR_KEYWORD, _KEYWORD_ONLY):
+                self.keyword_names.add(name)
+            elif kind is _VAR_POSITIONAL:
+                self.var_positional = name
+            elif kind is _VAR_KEYWORD:
+                self.var_keyword = name
+        self.n_positional = n_positional
+
+    def matches(self, inputs: T.Sequence[Value]) -> bool:
+        """If the plan is up to date with the inputs: the same Value
+        objects, with the same names, kinds and defaults(by identity).
+        """
+        if len(inputs) != self.n_inputs:
+            return False
+        for val, (src, name, kind, default) in zip(inputs, self._source):
+            if (val is not src) or (val.name != name) or \
+                    (val.kind is not kind) or (val.default is not default):
+                return False
+        return True
+
+    def bind(self, args: tuple, kwargs: dict) -> T.Dict[str, T.Any]:
+        """Bind the arguments to the input names,
+        default values are filled for the missing arguments."""
+        n_args = len(args)
+        if (n_args > self.n_positional) and (self.var_positional is None):
+            raise TypeError(
+                f"takes {self.n_positional} positional arguments "
+                f"but {n_args} were given"
+            )
+        res: T.Dict[str, T.Any] = {}
+        n_kw_used = 0
+        for name, kind, pos, default in self.slots:
+            if kind is _VAR_POSITIONAL:
+                res[name] = args[self.n_positional:]
+                continue
+            elif kind is _VAR_KEYWORD:
+                if n_kw_used == len(kwargs):
+                    res[name] = {}
+                else:
+                    res[name] = {
+                        k: v for k, v in kwargs.items()
+                        if k not in self.keyword_names
+                    }
+                n_kw_used = len(kwargs)
+                continue
+            elif pos >= 0 and pos < n_args:
+                if (kind is _POSITIONAL_OR_KEYWORD) and (name in kwargs):
+                    raise TypeError(f"multiple values for argument '{name}'")
+                res[name] = args[pos]
+                continue
+            elif (kind is not _POSITIONAL_ONLY) and (name in kwargs):
+                res[name] = kwargs[name]
+                n_kw_used += 1
+                continue
+            if default is NotDef:
+                raise TypeError(
+                    f"{name} is not provided and has no default value."
+                )
+            res[name] = default
+        if n_kw_used != len(kwargs):
+            unexpected = [k for k in kwargs if k not in self.keyword_names]
+            raise TypeError(
+                f"got an unexpected keyword argument '{unexpected[0]}'")
+        return res
+
 
 class Description():
     """The description of a function."""
+    __slots__ = (
+        "_inputs", "outputs", "side_effects", "name", "doc",
+        "_binding_plan", "_fingerprint",
+    )
+
     def __init__(
             self,
             inputs: T.Optional[T.List[Value]] = None,
@@ -137,34 +529,64 @@ class Description():
             name: T.Optional[str] = None,
             doc: T.Optional[str] = None,
             ):
+        self._binding_plan: T.Optional[BindingPlan] = None
         self.inputs = [] if inputs is None else inputs
         self.outputs = [] if outputs is None else outputs
         self.side_effects = [] if side_effects is None else side_effects
         self.name = name
         self.doc = doc
 
+    @property
+    def inputs(self) -> T.List[Value]:
+        return self._inputs
+
+    @inputs.setter
+    def inputs(self, inputs: T.List[Value]):
+        self._inputs = inputs
+        self._binding_plan = None
+
+    @property
+    def binding_plan(self) -> BindingPlan:
+        """The cached binding plan of the inputs. Frozen descriptions
+        build it once, for the mutable ones it's rebuilt when an input
+        is replaced, added or removed, or its name, kind or default
+        is changed."""
+        plan = self._binding_plan
+        if (plan is None) or \
+                (not self.frozen and not plan.matches(self._inputs)):
+            plan = self._binding_plan = BindingPlan(self._inputs)
+        return plan
+
     def parse_pass_in(self, args: tuple, kwargs: dict) -> T.Dict[str, T.Any]:
         """Get the pass in value of the func
         arguments according to the inputs description."""
+        return self.binding_plan.bind(args, kwargs)
 
-        args_ = list(args)
-        kwargs = copy(kwargs)
-        res = {}
-        for val in self.inputs:
-            has_default = val.default is not NotDef
-            name = "?" if val.name is None else val.name
-            if len(args_) > 0:
-                res[name] = args_.pop(0)
-            elif (len(kwargs) > 0) and (name in kwargs):
-                res[name] = kwargs.pop(name)
-            else:
-                if has_default:
-                    res[name] = val.default
-                else:
-                    raise TypeError(
-                        f"{name} is not provided and has no default value."
-                    )
-        return res
+    @property
+    def frozen(self) -> bool:
+        return isinstance(self, _Frozen)
+
+    def freeze(self) -> "Description":
+        """Make the description and its values immutable(in place)
+        and return it. The inputs, outputs and side effects
+        are converted to tuples."""
+        if self.frozen:
+            return self
+        inputs = tuple(v.freeze() for v in self.inputs)
+        self.inputs = inputs  # type: ignore
+        self.outputs = tuple(v.freeze() for v in self.outputs)  # type: ignore
+        self.side_effects = tuple(self.side_effects)  # type: ignore
+        self._binding_plan = BindingPlan(self.inputs)
+        self.__class__ = _frozen_class(type(self))
+        return self
+
+    def copy(self) -> "Description":
+        """Get a mutable copy of the description, values are copied too."""
+        new: Description = _copy_attrs(self, _thawed_class(type(self)))
+        new.inputs = [v.copy() for v in self.inputs]
+        new.outputs = [v.copy() for v in self.outputs]
+        new.side_effects = list(self.side_effects)
+        return new
 
     def to_json(self) -> str:
         json_str = DescriptionJSONEncoder().encode(self)
@@ -189,11 +611,33 @@ class Description():
             ">"
         )
 
+    def fingerprint(self) -> str:
+        """Structural fingerprint(hex digest) of the description, made of
+        the fingerprints of its values and side effects, the same across
+        processes for the equal descriptions. Cached when frozen."""
+        fp = getattr(self, "_fingerprint", None)
+        if fp is None:
+            fp = digest(
+                "Description", canonical((self.name, self.doc)),
+                *(v.fingerprint() for v in self.inputs), "",
+                *(v.fingerprint() for v in self.outputs), "",
+                *(s.fingerprint() for s in self.side_effects),
+            )
+            if self.frozen:
+                object.__setattr__(self, "_fingerprint", fp)
+        return fp
+
+    def _hash_key(self) -> tuple:
+        return (
+            self.name, self.doc, tuple(self.inputs),
+            tuple(self.outputs), tuple(self.side_effects),
+        )
+
     def __eq__(self, other):
         return (
-            self.inputs == other.inputs and
-            self.outputs == other.outputs and
-            self.side_effects == other.side_effects and
+            list(self.inputs) == list(other.inputs) and
+            list(self.outputs) == list(other.outputs) and
+            list(self.side_effects) == list(other.side_effects) and
             self.name == other.name and
             self.doc == other.doc
         )
@@ -208,10 +652,11 @@ class Description():
                 default = inspect._empty
             else:
                 default = val.default
+            kind = _POSITIONAL_OR_KEYWORD if val.kind is None else val.kind
             params.append(
                 inspect.Parameter(
                     val.name or "?",
-                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                    kind,
                     default=default,
                     annotation=val.type,
                 )
@@ -230,3 +675,54 @@ class Description():
             return_annotation=rtn_type
         )
         return sig
+
+
+class InternTable():
+    """Table of the canonical frozen instances of the values and
+    descriptions, structurally identical ones(same fingerprint) are
+    stored once, e.g. a `Val[int, [0, 10]]` parameter shared by
+    many functions. The instances are kept until `clear`."""
+    def __init__(self) -> None:
+        self._values: T.Dict[str, Value] = {}
+        self._descriptions: T.Dict[str, Description] = {}
+
+    def value(self, val: Value) -> Value:
+        """The canonical instance of the value. A frozen value is
+        stored as it is, a mutable one is copied and frozen."""
+        fp = val.fingerprint()
+        res = self._values.get(fp)
+        if res is None:
+            res = val if val.frozen else val.copy().freeze()
+            res = self._values.setdefault(fp, res)
+        return res
+
+    def description(self, desc: Description) -> Description:
+        """The canonical instance of the description, its inputs and
+        outputs are the canonical instances of the values."""
+        fp = desc.fingerprint()
+        res = self._descriptions.get(fp)
+        if res is None:
+            new = _copy_attrs(desc, _thawed_class(type(desc)))
+            new.inputs = [self.value(v) for v in desc.inputs]
+            new.outputs = [self.value(v) for v in desc.outputs]
+            new.side_effects = list(desc.side_effects)
+            res = self._descriptions.setdefault(fp, new.freeze())
+        return res
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._descriptions.clear()
+
+    def __len__(self) -> int:
+        return len(self._values) + len(self._descriptions)
+
+
+intern_table = InternTable()
+
+
+def intern_value(val: Value) -> Value:
+    return intern_table.value(val)
+
+
+def intern_description(desc: Description) -> Description:
+    return intern_table.description(desc)
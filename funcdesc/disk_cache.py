@@ -0,0 +1,308 @@
+import os
+import re
+import sys
+import dis
+import types
+import pickle
+import hashlib
+import sqlite3
+import threading
+import typing as T
+
+from .desc import Description, Value
+from .mark import FUNC_MARK_STORE_KEY
+from .parse import _parse_func, parse_cache
+from .utils.fingerprint import digest
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS descriptions (
+    qualname TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (qualname, variant)
+)
+"""
+
+
+def _code_parts(code: types.CodeType) -> tuple:
+    # not the line numbers, moving a function doesn't change it
+    return (
+        code.co_code, code.co_varnames, code.co_argcount,
+        code.co_posonlyargcount, code.co_kwonlyargcount, code.co_flags,
+    )
+
+
+# path -> ((mtime, size), lines)
+_file_lines: T.Dict[str, T.Tuple[T.Tuple[int, int], T.List[bytes]]] = {}
+# code -> ((mtime, size) of its file, digest of its source lines)
+_segment_digests: T.Dict[types.CodeType, T.Tuple[T.Tuple[int, int], str]] = {}
+
+
+def _source_lines(
+        path: str,
+        ) -> T.Optional[T.Tuple[T.Tuple[int, int], T.List[bytes]]]:
+    """Lines of a source file, cached until it's modified."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _file_lines.get(path)
+    if (cached is None) or (cached[0] != stamp):
+        with open(path, "rb") as f:
+            cached = _file_lines[path] = (stamp, f.readlines())
+    return cached
+
+
+def _body_line(code: types.CodeType) -> int:
+    """The line of the first statement of the function body after
+    the `def` line(the line of the def for one-line functions)."""
+    first = code.co_firstlineno
+    co_lines = getattr(code, "co_lines", None)  # python >= 3.10
+    lines = (line for _, _, line in co_lines()) if co_lines is not None \
+        else (line for _, line in dis.findlinestarts(code))
+    for line in lines:
+        if (line is not None) and (line > first):
+            return line
+    return first
+
+
+def _segment_digest(code: types.CodeType) -> T.Optional[str]:
+    """Digest of the source lines of the function header: from the
+    first decorator to the first statement of the body, the docstring
+    included. The rest of the body is covered by the bytecode.
+    None if the source file can't be read."""
+    source = _source_lines(code.co_filename)
+    if source is None:
+        return None
+    stamp, lines = source
+    cached = _segment_digests.get(code)
+    if (cached is not None) and (cached[0] == stamp):
+        return cached[1]
+    segment = b"".join(lines[code.co_firstlineno - 1: _body_line(code)])
+    res = hashlib.blake2b(segment, digest_size=16).hexdigest()
+    _segment_digests[code] = (stamp, res)
+    return res
+
+
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def _stable_repr(obj: T.Any) -> str:
+    # without the addresses of the objects with the default repr
+    return _ADDRESS.sub("", repr(obj))
+
+
+def _annotations(obj: T.Any) -> T.Any:
+    annotations = getattr(obj, "__annotations__", None)
+    if not annotations:
+        return annotations
+    # the repr of Value doesn't show all fields
+    return {
+        k: (v.name, v.doc, v.type, v.range, v.default, v.kind)
+        if isinstance(v, Value) else v
+        for k, v in annotations.items()
+    }
+
+
+def source_key(func: T.Callable) -> str:
+    """Digest of what the description of the function is parsed from,
+    for the function and the functions it wraps: the source lines of
+    the function, the bytecode, the annotations, the defaults, the
+    marks and `__signature__`.
+
+    Only the function's own source lines are hashed, editing or moving
+    the other functions of the module doesn't change the key. The annotations
+    and defaults are hashed by their `repr`(without the addresses),
+    objects whose `repr` doesn't show their content are compared by
+    their types only, clear the cache after changing them."""
+    parts = [f"python:{sys.version_info[:2]}"]
+    obj: T.Any = func
+    while obj is not None:
+        attrs = getattr(obj, "__dict__", {})
+        marks = attrs.get(FUNC_MARK_STORE_KEY)
+        code = getattr(obj, "__code__", None)
+        segment = None if code is None else _segment_digest(code)
+        parts.append(_stable_repr((
+            segment, getattr(obj, "__doc__", None),
+            None if code is None else _code_parts(code),
+            _annotations(obj),
+            getattr(obj, "__defaults__", None),
+            getattr(obj, "__kwdefaults__", None),
+            str(attrs.get("__signature__")),
+            None if marks is None else (
+                marks.input_marks, marks.output_marks,
+                marks.side_effect_marks),
+        )))
+        # `inspect.signature` follows `__wrapped__`
+        obj = attrs.get("__wrapped__")
+    return digest(*parts)
+
+
+def _value_fields(v: Value) -> tuple:
+    return (v.type, v.range, v.default, v.name, v.doc, v.kind, v._kwargs)
+
+
+def _dumps(desc: Description) -> bytes:
+    """Pickle the fields of the description, loading them is several
+    times faster than unpickling the description objects."""
+    return pickle.dumps((
+        desc.name, desc.doc,
+        [_value_fields(v) for v in desc.inputs],
+        [_value_fields(v) for v in desc.outputs],
+        list(desc.side_effects),
+    ), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _loads(data: bytes) -> Description:
+    name, doc, inputs, outputs, side_effects = pickle.loads(data)
+
+    def value(type_, range_, default, name, doc, kind, kwargs):
+        return Value(type_, range_, default, name, doc, kind, **(kwargs or {}))
+
+    return Description(
+        [value(*f) for f in inputs], [value(*f) for f in outputs],
+        side_effects, name, doc,
+    ).freeze()
+
+
+class DiskCache():
+    """Persistent cache of the parsed descriptions in a SQLite database,
+    shared by the processes using the same file.
+
+    Entries are keyed by the qualified name of the function and the
+    parse options, and store the `source_key` of the function when it
+    was parsed. An entry with a different key is stale and reparsed.
+    The descriptions are pickled, only use cache files you trust.
+    Descriptions which can't be pickled are parsed every time.
+    """
+    def __init__(
+            self, path: T.Union[str, os.PathLike],
+            timeout: float = 30.0,
+            ) -> None:
+        self.path = os.fspath(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.unloadable = 0
+        self.unpicklable = 0
+        self._connect()  # create the table
+
+    def _connect(self) -> sqlite3.Connection:
+        """The connection of the current thread and process,
+        connections are not shared across `fork`."""
+        conn = getattr(self._local, "conn", None)
+        if (conn is None) or (self._local.pid != os.getpid()):
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None,
+                check_same_thread=False)
+            # readers don't block the writer and vice versa
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(
+            self,
+            func: T.Callable,
+            update_by_docstring: bool = False,
+            lazy_docstring: bool = False,
+            ) -> Description:
+        """Get the frozen description of the function from the cache,
+        parse and store it when it's missing or stale.
+
+        The stored descriptions have their types and docs computed, so
+        `lazy_docstring` is ignored: the docstrings are parsed with the
+        rest on a miss, and not at all on a hit."""
+        is_method = isinstance(func, types.MethodType)
+        target = func.__func__ if is_method else func  # type: ignore
+        qualname = f"{getattr(target, '__module__', None)}." \
+            f"{getattr(target, '__qualname__', repr(target))}"
+        variant = f"{int(is_method)}{int(update_by_docstring)}"
+        key = source_key(target)
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT key, data FROM descriptions "
+            "WHERE qualname = ? AND variant = ?",
+            (qualname, variant)).fetchone()
+        if row is None:
+            self._count("misses")
+        elif row[0] != key:
+            self._count("stale")
+        else:
+            try:
+                desc = _loads(row[1])
+            except Exception:
+                # the function is unchanged but the entry can't be
+                # loaded(e.g. a type of it was renamed), not stale
+                self._count("unloadable")
+            else:
+                self._count("hits")
+                return desc
+        desc = _parse_func(func, update_by_docstring).freeze()
+        try:
+            data = _dumps(desc)
+            if _loads(data) != desc:
+                raise pickle.PicklingError("not equal after unpickling")
+        except Exception:
+            self._count("unpicklable")
+            return desc
+        # concurrent writers of the same function store the same result
+        conn.execute(
+            "INSERT OR REPLACE INTO descriptions VALUES (?, ?, ?, ?)",
+            (qualname, variant, key, data))
+        return desc
+
+    def __len__(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM descriptions").fetchone()[0]
+
+    def clear(self) -> None:
+        """Delete all entries and reset the statistics."""
+        self._connect().execute("DELETE FROM descriptions")
+        with self._lock:
+            self.hits = self.misses = self.stale = self.unpicklable = 0
+
+    def stats(self) -> T.Dict[str, int]:
+        """Statistics of this process: `misses` are the functions not
+        in the cache, `stale` the ones changed since they were stored,
+        `unloadable` the unchanged ones whose entries failed to load."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "unloadable": self.unloadable,
+            "unpicklable": self.unpicklable,
+            "size": len(self),
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def enable_disk_cache(
+        path: T.Union[str, os.PathLike], timeout: float = 30.0,
+        ) -> DiskCache:
+    """Back the in-memory `parse_cache`(used by `parse_func(cache=True)`)
+    with a `DiskCache` at `path`."""
+    cache = DiskCache(path, timeout)
+    parse_cache.persistent = cache
+    return cache
+
+
+def disable_disk_cache() -> None:
+    parse_cache.persistent = None
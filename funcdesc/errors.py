@@ -0,0 +1,6 @@
+class CheckError(Exception):
+    pass
+
+
+class SideEffectError(Exception):
+    pass
@@ -0,0 +1,372 @@
+import typing as T
+import os
+import math
+import pickle
+import importlib
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from .desc import Description
+from .errors import CheckError
+from .guard import Guard, AsyncGuard
+from .batch import Rows, Call, BatchResult, check_batch, _import_numpy
+
+
+# the segments the worker failed to close, the function still holds
+# views of them. Kept alive, closing them at exit would fail again.
+_unclosed: T.List[SharedMemory] = []
+
+
+class SharedArray():
+    """Handle of a NumPy array copied into a shared memory segment,
+    pickled instead of the array data."""
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name: str, shape: tuple, dtype: str) -> None:
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    @classmethod
+    def create(
+            cls, arr: T.Any, np: T.Any,
+            ) -> T.Tuple["SharedArray", SharedMemory]:
+        """Copy the array into a new segment, return the handle and
+        the closed segment, unlink it when the array is not needed."""
+        shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+        view = np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)
+        view[...] = arr
+        del view
+        shm.close()
+        return cls(shm.name, arr.shape, arr.dtype.str), shm
+
+    def attach(self, np: T.Any) -> T.Tuple[T.Any, SharedMemory]:
+        """Get an array viewing the segment, and the segment."""
+        shm = SharedMemory(name=self.name)
+        arr = np.ndarray(self.shape, np.dtype(self.dtype), buffer=shm.buf)
+        return arr, shm
+
+    def __repr__(self) -> str:
+        return (
+            f"<SharedArray name={self.name} shape={self.shape} "
+            f"dtype={self.dtype}>"
+        )
+
+
+def _is_shareable(obj: T.Any, np: T.Any, threshold: int) -> bool:
+    return (np is not None) and isinstance(obj, np.ndarray) and \
+        (not obj.dtype.hasobject) and (obj.nbytes >= threshold)
+
+
+def _share(
+        obj: T.Any, np: T.Any, threshold: int,
+        segments: T.List[SharedMemory],
+        ) -> T.Any:
+    if _is_shareable(obj, np, threshold):
+        handle, shm = SharedArray.create(obj, np)
+        segments.append(shm)
+        return handle
+    return obj
+
+
+def _share_call(
+        call: Call, np: T.Any, threshold: int,
+        segments: T.List[SharedMemory],
+        ) -> Call:
+    args, kwargs = call
+    return (
+        tuple(_share(a, np, threshold, segments) for a in args),
+        {k: _share(v, np, threshold, segments) for k, v in kwargs.items()},
+    )
+
+
+def _attach(obj: T.Any, np: T.Any, segments: T.List[SharedMemory]) -> T.Any:
+    if isinstance(obj, SharedArray):
+        arr, shm = obj.attach(np)
+        segments.append(shm)
+        return arr
+    return obj
+
+
+def _export_result(res: T.Any, np: T.Any, threshold: int) -> T.Any:
+    """Put the large arrays of the result into new segments(left for
+    the parent to unlink), copy the small ones, they may view the
+    segments of the arguments."""
+    def export(obj):
+        if _is_shareable(obj, np, threshold):
+            return SharedArray.create(obj, np)[0]
+        if (np is not None) and isinstance(obj, np.ndarray):
+            return obj.copy()
+        return obj
+    if isinstance(res, tuple):
+        return tuple(export(r) for r in res)
+    return export(res)
+
+
+def _import_result(res: T.Any, np: T.Any) -> T.Any:
+    """Copy the arrays out of the segments of the result
+    and unlink the segments."""
+    def load(obj):
+        if not isinstance(obj, SharedArray):
+            return obj
+        view, shm = obj.attach(np)
+        arr = view.copy()
+        del view
+        shm.close()
+        shm.unlink()
+        return arr
+    if isinstance(res, tuple):
+        return tuple(load(r) for r in res)
+    return load(res)
+
+
+class FunctionRef():
+    """Reference to a function by its module and qualified name,
+    for the functions decorated at the top level of a module, whose
+    names are bound to the guards. Resolved to the function in
+    the worker."""
+    __slots__ = ("module", "qualname")
+
+    def __init__(self, module: str, qualname: str) -> None:
+        self.module = module
+        self.qualname = qualname
+
+    def resolve(self) -> T.Callable:
+        obj: T.Any = importlib.import_module(self.module)
+        for name in self.qualname.split("."):
+            obj = getattr(obj, name)
+        return obj.func if isinstance(obj, Guard) else obj
+
+
+def _picklable_func(func: T.Callable) -> T.Union[T.Callable, FunctionRef]:
+    try:
+        pickle.dumps(func)
+    except Exception:
+        module = getattr(func, "__module__", None)
+        qualname = getattr(func, "__qualname__", "<locals>")
+        if (module is None) or ("<locals>" in qualname):
+            raise
+        return FunctionRef(module, qualname)
+    return func
+
+
+class RemoteTraceback(Exception):
+    """The traceback of an exception raised in a worker,
+    set as the `__cause__` of the exception."""
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+def _call(
+        func: T.Callable, call: Call, np: T.Any, threshold: int,
+        segments: T.List[SharedMemory],
+        ) -> T.Any:
+    args, kwargs = call
+    args = tuple(_attach(a, np, segments) for a in args)
+    kwargs = {k: _attach(v, np, segments) for k, v in kwargs.items()}
+    return _export_result(func(*args, **kwargs), np, threshold)
+
+
+def _run_calls(
+        func: T.Union[T.Callable, FunctionRef],
+        calls: T.List[Call], threshold: int,
+        ) -> T.List[T.Tuple[bool, T.Any]]:
+    """Run in the worker: call the function on each (args, kwargs),
+    return the (succeeded, result or exception) of the calls."""
+    if isinstance(func, FunctionRef):
+        func = func.resolve()
+    np = _import_numpy()
+    outcomes: T.List[T.Tuple[bool, T.Any]] = []
+    segments: T.List[SharedMemory] = []
+    for call in calls:
+        try:
+            outcomes.append((True, _call(func, call, np, threshold, segments)))
+        except Exception as e:
+            # the frames of the traceback hold the views of the segments,
+            # and the traceback is not pickled, send it as text
+            tb = traceback.format_exc()
+            outcomes.append((False, (e.with_traceback(None), tb)))
+    for shm in segments:
+        try:
+            shm.close()
+        except BufferError:  # pragma: no cover
+            _unclosed.append(shm)
+    return outcomes
+
+
+class GuardExecutor():
+    """Run a guarded function in a process pool.
+
+    The inputs(and the side effects before run) are checked in the
+    parent process, invalid calls fail without being sent to the
+    workers; the outputs(and the side effects after run) are checked
+    when the results come back. NumPy arrays of at least `shm_threshold`
+    bytes among the arguments and the results(or the elements of a
+    tuple result) are transferred through shared memory instead of
+    being pickled. `batch_size` calls are sent to a worker per task
+    by `map`, by default the calls are split to about 4 tasks per
+    worker. The function should be defined at the top level of
+    a module, so it can be loaded by the workers.
+    """
+    def __init__(
+            self,
+            func: T.Union[T.Callable, Guard],
+            desc: T.Optional[Description] = None,
+            max_workers: T.Optional[int] = None,
+            batch_size: T.Optional[int] = None,
+            shm_threshold: int = 1 << 20,
+            mp_context: T.Any = None,
+            **guard_kwargs,
+            ) -> None:
+        if isinstance(func, Guard):
+            guard = func
+        else:
+            guard = Guard(func, desc, **guard_kwargs)
+        if isinstance(guard, AsyncGuard):
+            raise TypeError("Coroutine functions can't be run in processes.")
+        if (batch_size is not None) and (batch_size < 1):
+            raise ValueError(
+                f"batch_size should be a positive integer, got {batch_size}")
+        self.guard = guard
+        self._func = _picklable_func(guard.func)
+        self.batch_size = batch_size
+        self.shm_threshold = shm_threshold
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(self.max_workers, mp_context)
+        self._np = _import_numpy()
+
+    def _check_inputs(self, args: tuple, kwargs: dict) -> T.Optional[dict]:
+        guard = self.guard
+        pass_in = guard.plan.check_inputs(args, kwargs)
+        if guard._with_side_effects:
+            assert pass_in is not None
+            guard.check_side_effects_before_run(pass_in, [])
+        return pass_in
+
+    def _check_result(self, res: T.Any, pass_in: T.Optional[dict]) -> None:
+        guard = self.guard
+        guard.plan.check_outputs(res)
+        if guard._with_side_effects:
+            assert pass_in is not None
+            guard.check_side_effects_after_run(pass_in, res, [])
+
+    def _dispatch(self, calls: T.List[Call]) -> Future:
+        """Send the calls to a worker as one task."""
+        np, threshold = self._np, self.shm_threshold
+        segments: T.List[SharedMemory] = []
+        try:
+            shared = [_share_call(c, np, threshold, segments) for c in calls]
+            task = self._pool.submit(
+                _run_calls, self._func, shared, threshold)
+        except BaseException:
+            _unlink(segments)
+            raise
+        if segments:
+            task.add_done_callback(lambda _: _unlink(segments))
+        return task
+
+    def _results(self, task: Future) -> T.List[T.Tuple[bool, T.Any]]:
+        """The (succeeded, result or exception) of the calls of a task."""
+        res = []
+        for ok, value in task.result():
+            if ok:
+                value = _import_result(value, self._np)
+            else:
+                value, tb = value
+                value.__cause__ = RemoteTraceback(f'\n"""\n{tb}"""')
+            res.append((ok, value))
+        return res
+
+    def submit(self, *args, **kwargs) -> Future:
+        """Check the inputs and schedule the call, return a future of
+        its checked result. A `CheckError` of the inputs is set to the
+        returned future without running the function."""
+        future: Future = Future()
+        try:
+            pass_in = self._check_inputs(args, kwargs)
+        except CheckError as e:
+            future.set_exception(e)
+            return future
+
+        def resolve(task: Future):
+            try:
+                (ok, value), = self._results(task)
+                if not ok:
+                    raise value
+                self._check_result(value, pass_in)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(value)
+
+        self._dispatch([(args, kwargs)]).add_done_callback(resolve)
+        return future
+
+    def map(
+            self, rows: Rows,
+            vectorize: bool = True,
+            batch_size: T.Optional[int] = None,
+            ) -> BatchResult:
+        """`Guard.map` running the valid rows in the workers,
+        `batch_size` overrides the one of the executor. Exceptions
+        raised in the workers are recorded in the errors of their rows.
+        """
+        calls, errors = check_batch(self.guard, rows, vectorize)
+        result = BatchResult(len(calls))
+        result.errors.update(errors)
+        ids, pass_ins, valid = [], [], []
+        for i, (args, kwargs) in enumerate(calls):
+            if i in errors:
+                continue
+            try:
+                pass_in = None
+                if self.guard._with_side_effects:
+                    pass_in = self._check_inputs(args, kwargs)
+            except CheckError as e:
+                result.errors[i] = _error_list(e)
+                continue
+            ids.append(i)
+            pass_ins.append(pass_in)
+            valid.append((args, kwargs))
+        size = batch_size or self.batch_size or \
+            max(math.ceil(len(valid) / (self.max_workers * 4)), 1)
+        tasks = [
+            self._dispatch(valid[s:s + size])
+            for s in range(0, len(valid), size)
+        ]
+        outcomes = [o for task in tasks for o in self._results(task)]
+        for i, pass_in, (ok, value) in zip(ids, pass_ins, outcomes):
+            if not ok:
+                # with the RemoteTraceback as the cause
+                result.errors[i] = [value]
+                continue
+            try:
+                self._check_result(value, pass_in)
+            except CheckError as e:
+                result.errors[i] = _error_list(e)
+                continue
+            result.results[i] = value
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait)
+
+    def __enter__(self) -> "GuardExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+
+def _error_list(e: CheckError) -> T.List[Exception]:
+    err = e.args[0]
+    return err if isinstance(err, list) else [e]
+
+
+def _unlink(segments: T.List[SharedMemory]) -> None:
+    for shm in segments:
+        try:
+            shm.unlink()
+        except FileNotFoundError:  # pragma: no cover
+            pass
@@ -1,23 +1,38 @@
 import typing as T
 import functools
 import types
+import inspect
+from time import perf_counter
 
 from .desc import Value, Description
 from .parse import parse_func
-
-
-class CheckError(Exception):
-    pass
-
-
-class SideEffectError(Exception):
-    pass
+from .plan import CheckPlan, _tag_error
+from .errors import CheckError, SideEffectError
+from .policy import CheckPolicy
+from .metrics import GuardMetrics, PHASES, registry as metrics_registry
+from .batch import (
+    Rows, BatchResult, check_batch, map_batch, async_map_batch
+)
 
 
 TF2 = T.TypeVar("TF2", bound=T.Callable)
 
+# prefix of the keys of the bound guards cached in the instance dicts
+_BOUND_KEY_PREFIX = "_funcdesc_bound_"
+
 
 class Guard(T.Generic[TF2]):
+    """Check the inputs, outputs and side effects of a function
+    according to its description.
+
+    The checking code is compiled into a `CheckPlan` on construction,
+    and recompiled on the next call after `desc` is modified. Call
+    `compile` again after changing the check flags.
+    With a `policy`, only the calls selected by it are checked,
+    the others call `func` directly. With `metrics` set, the call
+    counts, failures and timings are recorded in `self.metrics`,
+    which is also registered in `funcdesc.metrics.registry`.
+    """
     def __init__(
             self,
             func: TF2,
@@ -27,9 +42,18 @@ class Guard(T.Generic[TF2]):
             check_side_effect: bool = False,
             check_type: bool = True,
             check_range: bool = True,
+            policy: T.Optional[CheckPolicy] = None,
+            metrics: bool = False,
             ) -> None:
+        self._method_type: T.Optional[type] = None
+        if isinstance(func, (classmethod, staticmethod)):
+            self._method_type = type(func)
+            func = func.__func__  # type: ignore
         self.func = func
         functools.update_wrapper(self, func)
+        self._attr_name: T.Optional[str] = None
+        # inputs(`self` or `cls`) bound by `bind`
+        self._n_bound_inputs = 0
         if desc is None:
             desc = parse_func(func)
         self.desc = desc
@@ -38,26 +62,167 @@ class Guard(T.Generic[TF2]):
         self.is_check_side_effect = check_side_effect
         self.is_check_inputs = check_inputs
         self.is_check_outputs = check_outputs
+        self.policy = policy
+        self.metrics: T.Optional[GuardMetrics] = None
+        if metrics:
+            name = getattr(func, "__qualname__", None) or repr(func)
+            module = getattr(func, "__module__", None)
+            self.metrics = GuardMetrics(
+                f"{module}.{name}" if module else name, desc)
+            metrics_registry.register(self.metrics)
+        self.compile()
+
+    def compile(self) -> CheckPlan:
+        """Build the compiled checking plan of the guard."""
+        self._with_side_effects = (
+            self.is_check_side_effect and len(self.desc.side_effects) > 0)
+        self._plan = CheckPlan(
+            self.desc,
+            check_inputs=self.is_check_inputs,
+            check_outputs=self.is_check_outputs,
+            check_type=self.is_check_type,
+            check_range=self.is_check_range,
+            bind_inputs=self._with_side_effects,
+        )
+        if (self.metrics is not None) and (self._n_bound_inputs == 0):
+            # shared with the bound guards, keep the full description
+            self.metrics.desc = self.desc
+        self._method_guard: T.Optional[Guard] = None
+        self._class_guards: T.Dict[type, Guard] = {}
+        return self._plan
+
+    @property
+    def plan(self) -> CheckPlan:
+        """The compiled checking plan, it's recompiled when the
+        description is modified or new checkers are registered
+        after it was built."""
+        plan = self._plan
+        if not plan.is_current(self.desc):
+            plan = self.compile()
+        return plan
 
     def __call__(self, *args, **kwargs):
-        pass_in = self.desc.parse_pass_in(args, kwargs)
-        errors = []
-        if self.is_check_inputs:
-            self.check_inputs(pass_in, errors)
-        if self.is_check_side_effect:
-            self.check_side_effects_before_run(
-                pass_in, errors)
+        if (self.policy is not None) or (self.metrics is not None):
+            return self._call_instrumented(args, kwargs)
+        plan = self._plan
+        if not plan.is_current(self.desc):
+            plan = self.compile()
+        if self._with_side_effects:
+            return self._call_with_side_effects(args, kwargs)
+        return plan.call(self.func, args, kwargs)
+
+    def _call_instrumented(self, args: tuple, kwargs: dict):
+        policy, metrics = self.policy, self.metrics
+        timed = (metrics is not None) or \
+            ((policy is not None) and policy.timed)
+        if metrics is not None:
+            metrics.calls += 1
+        if (policy is not None) and not policy.should_check(args, kwargs):
+            if not timed:
+                return self.func(*args, **kwargs)
+            t0 = perf_counter()
+            res = self.func(*args, **kwargs)
+            self._record_unchecked(perf_counter() - t0)
+            return res
+        plan = self.plan
+        if not timed:
+            if self._with_side_effects:
+                return self._call_with_side_effects(args, kwargs)
+            return plan.call(self.func, args, kwargs)
+        if metrics is not None:
+            metrics.checked_calls += 1
+        with_side_effects = self._with_side_effects
+        stamps = [perf_counter()]
+        try:
+            pass_in = plan.check_inputs(args, kwargs)
+            stamps.append(perf_counter())
+            if with_side_effects:
+                self.check_side_effects_before_run(T.cast(dict, pass_in), [])
+            stamps.append(perf_counter())
+            res = self.func(*args, **kwargs)
+            stamps.append(perf_counter())
+            plan.check_outputs(res)
+            stamps.append(perf_counter())
+            if with_side_effects:
+                self.check_side_effects_after_run(
+                    T.cast(dict, pass_in), res, [])
+            stamps.append(perf_counter())
+        except CheckError as e:
+            self._record_failure(stamps, e)
+            raise
+        self._record_checked(stamps)
+        return res
+
+    def _record_unchecked(self, func_time: float) -> None:
+        if (self.policy is not None) and self.policy.timed:
+            self.policy.record(0.0, func_time)
+        if self.metrics is not None:
+            self.metrics.timings["func"].observe(func_time)
+
+    def _record_checked(self, stamps: T.List[float]) -> None:
+        """Record the timings of a checked call, `stamps` are the
+        time points between the phases in `metrics.PHASES`, fewer
+        when the call failed in the middle."""
+        if (len(stamps) == len(PHASES) + 1) and \
+                (self.policy is not None) and self.policy.timed:
+            t0, _, t2, t3, _, t5 = stamps
+            self.policy.record((t2 - t0) + (t5 - t3), t3 - t2)
+        if self.metrics is not None:
+            timings = self.metrics.timings
+            for i, phase in enumerate(PHASES[:len(stamps) - 1]):
+                if ("side_effects" in phase) and not self._with_side_effects:
+                    continue
+                timings[phase].observe(stamps[i + 1] - stamps[i])
+
+    def _record_failure(
+            self, stamps: T.List[float], error: CheckError) -> None:
+        self._record_checked(stamps)
+        phase = PHASES[len(stamps) - 1]
+        # CheckError raised inside the function is not a failure of this guard
+        if (self.metrics is not None) and (phase != "func"):
+            self.metrics.record_failure(
+                phase, error, self.desc, self._n_bound_inputs)
+
+    def _call_with_side_effects(self, args: tuple, kwargs: dict):
+        plan = self._plan
+        pass_in = plan.check_inputs(args, kwargs)
+        assert pass_in is not None
+        self.check_side_effects_before_run(pass_in, [])
         res = self.func(*args, **kwargs)
-        if self.is_check_outputs:
-            self.check_outputs(res, errors)
-        if self.is_check_side_effect:
-            self.check_side_effects_after_run(
-                pass_in, res, errors)
+        plan.check_outputs(res)
+        self.check_side_effects_after_run(pass_in, res, [])
         return res
 
+    def check_batch(
+            self, rows: "Rows", vectorize: bool = True,
+            ) -> T.Dict[int, T.List[Exception]]:
+        """Check the inputs of many calls at once.
+
+        `rows` is a sequence of argument tuples(or keyword argument
+        mappings), or a column-oriented mapping from input names to
+        sequences of values. Return the errors of the invalid rows.
+        """
+        _, errors = check_batch(self, rows, vectorize)
+        return errors
+
+    def map(self, rows: "Rows", vectorize: bool = True) -> BatchResult:
+        """Call the function on many rows, only the rows
+        pass the input checks are run. See `check_batch` for
+        the format of `rows`. Exceptions raised by the function
+        are recorded in the errors of their rows."""
+        return map_batch(self, rows, vectorize)
+
     def check_inputs(self, pass_in: dict, errors: list):
         for val in self.desc.inputs:
-            self.check_value(val, pass_in[val.name], errors)
+            pass_val = pass_in["?" if val.name is None else val.name]
+            if val.kind is inspect.Parameter.VAR_POSITIONAL:
+                for v in pass_val:
+                    self.check_value(val, v, errors)
+            elif val.kind is inspect.Parameter.VAR_KEYWORD:
+                for v in pass_val.values():
+                    self.check_value(val, v, errors)
+            else:
+                self.check_value(val, pass_val, errors)
         if len(errors) > 0:
             raise CheckError(errors)
 
@@ -92,7 +257,7 @@ class Guard(T.Generic[TF2]):
             if self.is_check_range:
                 arg.check_range(val)
         except Exception as e:
-            errors.append(e)
+            errors.append(_tag_error(e, arg))
 
     def get_input_dict(self, pass_in: dict) -> dict:
         in_dict: T.Dict[T.Union[int, str], T.Any] = {}
@@ -129,7 +294,7 @@ class Guard(T.Generic[TF2]):
                     "Error occured when check "
                     f"side effect(before run): {self.func}"
                 )
-                errors.append(err)
+                errors.append(_tag_error(err, e))
         if len(errors) > 0:
             raise CheckError(errors)
 
@@ -146,19 +311,208 @@ class Guard(T.Generic[TF2]):
                     "Error occured when check "
                     f"side effect(after run): {self.func}"
                 )
-                errors.append(err)
+                errors.append(_tag_error(err, e))
         if len(errors) > 0:
             raise CheckError(errors)
 
-    def __get__(self, obj, objtype):
-        """Allow use on instance method."""
-        if not hasattr(self, "_bounded"):  # bound only once
-            target_func = self.func
-            bound_mth = types.MethodType(target_func, obj)
-            self.func = bound_mth
-            self.desc.inputs.pop(0)
-            self._bounded = True
-        return self
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._attr_name = name
+
+    def __get__(self, obj, objtype=None):
+        """Allow use on instance method, classmethod and staticmethod.
+
+        The bound guard of an instance is cached in its `__dict__`
+        under a private key(not the attribute name, so the accesses
+        still go through here), and only reused when it's bound to
+        the same object(the copies of the instance rebind it) and
+        built from the current template: the templates are rebuilt
+        after the guard is recompiled or its policy or metrics are
+        replaced.
+        """
+        if self._method_type is staticmethod:
+            return self
+        self._check_templates()
+        if self._method_type is classmethod:
+            cls = objtype if objtype is not None else type(obj)
+            bound = self._class_guards.get(cls)
+            if bound is None:
+                bound = self._class_guards[cls] = self.bind(cls)
+            return bound
+        if obj is None:
+            return self
+        obj_dict = getattr(obj, "__dict__", None)
+        if (self._attr_name is None) or not isinstance(obj_dict, dict):
+            return self.bind(obj)
+        key = _BOUND_KEY_PREFIX + self._attr_name
+        bound = obj_dict.get(key)
+        if (bound is None) or (bound.__self__ is not obj) or \
+                (bound._template is not self._method_guard):
+            bound = obj_dict[key] = self.bind(obj)
+        return bound
+
+    def _check_templates(self) -> None:
+        """Drop the bound guard templates which are out of date."""
+        if not self._plan.is_current(self.desc):
+            self.compile()  # drops the templates
+            return
+        template = self._method_guard
+        if (template is not None) and (
+                (template.policy is not self.policy) or
+                (template.metrics is not self.metrics)):
+            self._method_guard = None
+            self._class_guards = {}
+
+    def bind(self, obj: T.Any) -> "Guard":
+        """Get a guard of the method bound to `obj`.
+
+        All bound guards share an immutable description without the
+        first input(`self` or `cls`) and its compiled plan, they are
+        built once per guard."""
+        template = self._method_guard
+        if template is None:
+            desc = self.desc.copy()
+            desc.inputs = desc.inputs[1:]
+            template = object.__new__(type(self))
+            template.__dict__.update(self.__dict__)
+            template.desc = desc.freeze()
+            template._method_type = None
+            template._n_bound_inputs = 1
+            template.compile()
+            self._method_guard = template
+        bound: T.Any = object.__new__(type(template))
+        bound.__dict__.update(template.__dict__)
+        bound.func = types.MethodType(self.func, obj)
+        bound.__self__ = obj
+        bound._template = template
+        return bound
+
+    def __reduce__(self):
+        # bound guards cached in the instance dict are pickled by name
+        if ("__self__" in self.__dict__) and (self._attr_name is not None):
+            return (getattr, (self.__self__, self._attr_name))
+        return super().__reduce__()
+
+
+async def _gather_results(results: T.List[T.Any]) -> T.List[T.Any]:
+    """Await the awaitable items of `results` concurrently."""
+    pending = [i for i, r in enumerate(results) if inspect.isawaitable(r)]
+    if pending:
+        import asyncio  # heavy, only needed by the coroutine functions
+        awaited = await asyncio.gather(*[results[i] for i in pending])
+        for i, r in zip(pending, awaited):
+            results[i] = r
+    return results
+
+
+class AsyncGuard(Guard[TF2]):
+    """Guard of a coroutine function.
+
+    Calling it returns a coroutine, the outputs are checked on the
+    awaited result. `SideEffect.check_before_run`/`check_after_run`
+    can be coroutine functions, they are run concurrently.
+    """
+    def __init__(self, func: TF2, *args, **kwargs) -> None:
+        super().__init__(func, *args, **kwargs)
+        if hasattr(inspect, "markcoroutinefunction"):  # python >= 3.12
+            inspect.markcoroutinefunction(self)
+
+    async def __call__(self, *args, **kwargs):  # type: ignore
+        policy, metrics = self.policy, self.metrics
+        if (policy is None) and (metrics is None):
+            plan = self._plan
+            if not plan.is_current(self.desc):
+                plan = self.compile()
+            if not self._with_side_effects:
+                plan.check_inputs(args, kwargs)
+                res = await self.func(*args, **kwargs)
+                plan.check_outputs(res)
+                return res
+            pass_in = T.cast(dict, plan.check_inputs(args, kwargs))
+            await self.async_check_side_effects_before_run(pass_in, [])
+            res = await self.func(*args, **kwargs)
+            plan.check_outputs(res)
+            await self.async_check_side_effects_after_run(pass_in, res, [])
+            return res
+        return await self._call_instrumented_async(args, kwargs)
+
+    async def _call_instrumented_async(self, args: tuple, kwargs: dict):
+        policy, metrics = self.policy, self.metrics
+        if metrics is not None:
+            metrics.calls += 1
+        if (policy is not None) and not policy.should_check(args, kwargs):
+            t0 = perf_counter()
+            res = await self.func(*args, **kwargs)
+            self._record_unchecked(perf_counter() - t0)
+            return res
+        plan = self.plan
+        if metrics is not None:
+            metrics.checked_calls += 1
+        with_side_effects = self._with_side_effects
+        stamps = [perf_counter()]
+        try:
+            pass_in = plan.check_inputs(args, kwargs)
+            stamps.append(perf_counter())
+            if with_side_effects:
+                await self.async_check_side_effects_before_run(
+                    T.cast(dict, pass_in), [])
+            stamps.append(perf_counter())
+            res = await self.func(*args, **kwargs)
+            stamps.append(perf_counter())
+            plan.check_outputs(res)
+            stamps.append(perf_counter())
+            if with_side_effects:
+                await self.async_check_side_effects_after_run(
+                    T.cast(dict, pass_in), res, [])
+            stamps.append(perf_counter())
+        except CheckError as e:
+            self._record_failure(stamps, e)
+            raise
+        self._record_checked(stamps)
+        return res
+
+    async def map(  # type: ignore
+            self, rows: "Rows", vectorize: bool = True) -> BatchResult:
+        """Run the valid rows concurrently, see `Guard.map`."""
+        return await async_map_batch(self, rows, vectorize)
+
+    async def async_check_side_effects_before_run(
+            self, pass_in: dict, errors: list):
+        if len(self.desc.side_effects) == 0:
+            return
+        in_dict = self.get_input_dict(pass_in)
+        results = await _gather_results([
+            e.check_before_run(in_dict) for e in self.desc.side_effects
+        ])
+        for e, ok in zip(self.desc.side_effects, results):
+            if not ok:
+                err = SideEffectError(
+                    "Error occured when check "
+                    f"side effect(before run): {self.func}"
+                )
+                errors.append(_tag_error(err, e))
+        if len(errors) > 0:
+            raise CheckError(errors)
+
+    async def async_check_side_effects_after_run(
+            self, pass_in: dict,
+            res: T.Union[tuple, T.Any], errors: list):
+        if len(self.desc.side_effects) == 0:
+            return
+        in_dict = self.get_input_dict(pass_in)
+        rtn_dict = self.get_output_dict(res)
+        results = await _gather_results([
+            e.check_after_run(in_dict, rtn_dict)
+            for e in self.desc.side_effects
+        ])
+        for e, ok in zip(self.desc.side_effects, results):
+            if not ok:
+                err = SideEffectError(
+                    "Error occured when check "
+                    f"side effect(after run): {self.func}"
+                )
+                errors.append(_tag_error(err, e))
+        if len(errors) > 0:
+            raise CheckError(errors)
 
 
 def make_guard(
@@ -169,6 +523,8 @@ def make_guard(
         check_side_effect: bool = False,
         check_type: bool = True,
         check_range: bool = True,
+        policy: T.Optional[CheckPolicy] = None,
+        metrics: bool = False,
         ) -> TF2:
     kwargs = {
         "check_inputs": check_inputs,
@@ -176,7 +532,11 @@ def make_guard(
         "check_side_effect": check_side_effect,
         "check_type": check_type,
         "check_range": check_range,
+        "policy": policy,
+        "metrics": metrics,
     }
     if func is None:
         return functools.partial(make_guard, **kwargs)  # type: ignore
+    if inspect.iscoroutinefunction(func):
+        return AsyncGuard(func, **kwargs)  # type: ignore
     return Guard(func, **kwargs)  # type: ignore
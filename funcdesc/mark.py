@@ -24,6 +24,8 @@ class FuncMarks():
         self.input_marks: T.Dict[T.Union[str, int], T.Dict] = dict()
         self.output_marks: T.Dict[T.Union[str, int], T.Dict] = dict()
         self.side_effect_marks: T.List[SideEffect] = []
+        # increased on every change, for invalidating the parse cache
+        self.version = 0
 
 
 TF1 = T.TypeVar("TF1")
@@ -59,6 +61,7 @@ def _mark_val_factory(store_key: T.Literal["input", "output"]):
                 marks.input_marks[pos_or_name] = store
             else:
                 marks.output_marks[pos_or_name] = store
+            marks.version += 1
             return func
         return wrap
 
@@ -75,6 +78,7 @@ def mark_side_effect(side_effect: SideEffect):
         func.__dict__.setdefault(FUNC_MARK_STORE_KEY, FuncMarks())
         marks: FuncMarks = func.__dict__[FUNC_MARK_STORE_KEY]
         marks.side_effect_marks.append(side_effect)
+        marks.version += 1
         return func
 
     return wrap
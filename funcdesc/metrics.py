@@ -0,0 +1,248 @@
+import typing as T
+import inspect
+import bisect
+import weakref
+from time import perf_counter
+
+from .desc import Description, SideEffect
+from .errors import CheckError
+from .plan import error_source
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from .guard import Guard
+
+
+PHASES = (
+    "check_inputs", "check_side_effects_before_run", "func",
+    "check_outputs", "check_side_effects_after_run",
+)
+CHECK_PHASES = tuple(p for p in PHASES if p != "func")
+
+# upper bounds of the histogram buckets: 1us, 2us, 4us ... ~16.8s
+_BUCKET_BOUNDS = tuple(1e-6 * 2 ** i for i in range(25))
+
+
+class Histogram():
+    """Histogram of durations(in seconds) with power of 2 buckets."""
+    def __init__(self) -> None:
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile by the upper bound of its bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(_BUCKET_BOUNDS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> T.Dict[str, T.Any]:
+        buckets = {
+            ("inf" if i == len(_BUCKET_BOUNDS) else f"{_BUCKET_BOUNDS[i]:g}"):
+            n for i, n in enumerate(self.counts) if n
+        }
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+def source_label(
+        desc: Description, source: T.Any, input_offset: int = 0,
+        ) -> str:
+    """A readable label of a Value or SideEffect of the description,
+    `input_offset` is added to the indexes of the inputs."""
+    for kind, items, offset in (
+            ("input", desc.inputs, input_offset), ("output", desc.outputs, 0),
+            ("side_effect", desc.side_effects, 0)):
+        for idx, item in enumerate(items, offset):
+            if item is source:
+                name = getattr(item, "name", None)
+                if isinstance(item, SideEffect):
+                    name = type(item).__name__
+                return f"{kind}[{idx}]" + (f":{name}" if name else "")
+    return "unknown"
+
+
+class GuardMetrics():
+    """Call counts, failure counts and timings of one guard.
+
+    `calls` counts all calls, `checked_calls` the calls which were
+    checked(see `CheckPolicy`), `failures` the calls raised CheckError.
+    `source_failures` counts the errors per failed Value/SideEffect,
+    `timings` holds a histogram for each phase in `PHASES`.
+    """
+    def __init__(self, name: str, desc: Description) -> None:
+        self.name = name
+        self.desc = desc
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.checked_calls = 0
+        self.failures = 0
+        self.phase_failures: T.Dict[str, int] = {}
+        self.source_failures: T.Dict[str, int] = {}
+        self.timings: T.Dict[str, Histogram] = {p: Histogram() for p in PHASES}
+
+    def record_failure(
+            self, phase: str, error: CheckError,
+            desc: T.Optional[Description] = None, input_offset: int = 0,
+            ) -> None:
+        """Count a failure, the failed values are labeled by their
+        positions in `desc`(`self.desc` by default). The guards of the
+        bound methods pass their description without `self`, with an
+        `input_offset` of 1 to label the inputs like the method."""
+        if desc is None:
+            desc = self.desc
+        self.failures += 1
+        self.phase_failures[phase] = self.phase_failures.get(phase, 0) + 1
+        errors = error.args[0] if error.args else None
+        if not isinstance(errors, list):
+            return
+        for err in errors:
+            label = source_label(desc, error_source(err), input_offset)
+            self.source_failures[label] = \
+                self.source_failures.get(label, 0) + 1
+
+    @property
+    def check_time(self) -> float:
+        return sum(self.timings[p].total for p in CHECK_PHASES)
+
+    @property
+    def func_time(self) -> float:
+        return self.timings["func"].total
+
+    def snapshot(self) -> T.Dict[str, T.Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "checked_calls": self.checked_calls,
+            "failures": self.failures,
+            "phase_failures": dict(self.phase_failures),
+            "source_failures": dict(self.source_failures),
+            "check_time": self.check_time,
+            "func_time": self.func_time,
+            "timings": {
+                p: h.to_dict() for p, h in self.timings.items() if h.count
+            },
+        }
+
+
+class MetricsRegistry():
+    """Process-wide collection of the metrics of all guards
+    created with `metrics=True`. Metrics of the garbage collected
+    guards are dropped."""
+    def __init__(self) -> None:
+        self._metrics: "weakref.WeakSet[GuardMetrics]" = weakref.WeakSet()
+
+    def register(self, metrics: GuardMetrics) -> None:
+        self._metrics.add(metrics)
+
+    def unregister(self, metrics: GuardMetrics) -> None:
+        self._metrics.discard(metrics)
+
+    def __iter__(self) -> T.Iterator[GuardMetrics]:
+        return iter(list(self._metrics))
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def reset(self) -> None:
+        for m in self:
+            m.reset()
+
+    def snapshot(self) -> T.List[T.Dict[str, T.Any]]:
+        """The metrics of all guards, the most expensive first."""
+        snaps = [m.snapshot() for m in self]
+        snaps.sort(key=lambda s: s["check_time"], reverse=True)
+        return snaps
+
+    def report(self) -> str:
+        """Text report of the metrics of all guards."""
+        header = (
+            f"{'guard':<30} {'calls':>8} {'checked':>8} {'failed':>7}"
+            f" {'check(ms)':>10} {'func(ms)':>10} {'overhead':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for s in self.snapshot():
+            func_time = s["func_time"]
+            overhead = (
+                f"{s['check_time'] / func_time * 100:>8.1f}%"
+                if func_time else f"{'-':>9}"
+            )
+            lines.append(
+                f"{s['name']:<30} {s['calls']:>8} {s['checked_calls']:>8}"
+                f" {s['failures']:>7} {s['check_time'] * 1e3:>10.3f}"
+                f" {func_time * 1e3:>10.3f} {overhead}"
+            )
+            for phase, t in s["timings"].items():
+                lines.append(
+                    f"    {phase:<32} mean {t['mean'] * 1e6:>10.2f}us"
+                    f"  p99 {t['p99'] * 1e6:>10.2f}us")
+            for label, n in sorted(
+                    s["source_failures"].items(), key=lambda i: -i[1]):
+                lines.append(f"    failed {label:<25} {n:>8}")
+        return "\n".join(lines)
+
+
+registry = MetricsRegistry()
+
+
+def profile_checks(
+        guard: "Guard", args: tuple = (), kwargs: T.Optional[dict] = None,
+        repeat: int = 100,
+        ) -> T.Dict[str, float]:
+    """Measure the mean time(in seconds) of checking each input Value
+    of the guard on the given arguments, and of each SideEffect's
+    `check_before_run`. The wrapped function is not called.
+    Returns a dict from the labels to the times, the most expensive
+    first."""
+    kwargs = kwargs or {}
+    desc = guard.desc
+    pass_in = desc.parse_pass_in(args, kwargs)
+    costs: T.Dict[str, float] = {}
+    for val in desc.inputs:
+        v = pass_in["?" if val.name is None else val.name]
+        if val.kind is inspect.Parameter.VAR_POSITIONAL:
+            elems = list(v)
+        elif val.kind is inspect.Parameter.VAR_KEYWORD:
+            elems = list(v.values())
+        else:
+            elems = [v]
+        errors: T.List[Exception] = []
+        t0 = perf_counter()
+        for _ in range(repeat):
+            for elem in elems:
+                guard.check_value(val, elem, errors)
+        costs[source_label(desc, val)] = (perf_counter() - t0) / repeat
+    if desc.side_effects:
+        in_dict = guard.get_input_dict(pass_in)
+        for e in desc.side_effects:
+            t0 = perf_counter()
+            for _ in range(repeat):
+                e.check_before_run(in_dict)
+            costs[source_label(desc, e)] = (perf_counter() - t0) / repeat
+    return dict(sorted(costs.items(), key=lambda i: -i[1]))
@@ -1,9 +1,12 @@
 import types
 import typing as T
 import inspect
+import weakref
+import functools
 
-from .desc import Description, Value
+from .desc import Description, Value, Pending
 from .mark import FUNC_MARK_STORE_KEY, FuncMarks
+from .utils.type_expr import resolve_type
 
 
 def _update_val_by_marks(
@@ -18,8 +21,11 @@ def _update_val_by_marks(
         store = None
 
     if store is not None:
-        val.kwargs.update(store.pop("attrs"))
-        val.__dict__.update(store)
+        attrs = store.pop("attrs")
+        if attrs:
+            val.kwargs.update(attrs)
+        for attr, v in store.items():
+            setattr(val, attr, v)
 
 
 def parse_func_inputs(
@@ -31,7 +37,7 @@ def parse_func_inputs(
     for idx, (name, param) in enumerate(sig.parameters.items()):
         ann = param.annotation
         if isinstance(ann, Value):
-            val = ann
+            val = ann.copy()
         elif ann is inspect._empty:
             val = Value(None)
         else:
@@ -43,6 +49,9 @@ def parse_func_inputs(
         if param.default is not inspect._empty:
             val.default = param.default
 
+        if param.kind is not inspect.Parameter.POSITIONAL_OR_KEYWORD:
+            val.kind = param.kind
+
         # update by marks
         mark_idx = idx + 1 if is_method else idx
         _update_val_by_marks(mark_idx, name, marks, val)
@@ -81,13 +90,13 @@ def parse_func_outputs(
     ret = sig.return_annotation
 
     def to_val(o):
-        return o if isinstance(o, Value) else Value(o)
+        return o.copy() if isinstance(o, Value) else Value(o)
 
     val: Value
     if ret is inspect._empty:
         outputs.extend(marks_to_outputs(marks))
     elif isinstance(ret, Value):
-        outputs.append(ret)
+        outputs.append(ret.copy())
     elif isinstance(ret, list):
         outputs.extend([to_val(o) for o in ret])
     elif T.get_origin(ret) is tuple:
@@ -104,33 +113,195 @@ def parse_func_outputs(
     return outputs
 
 
-def update_using_docstring(desc: Description, docstring: str):
+class DocItem(T.NamedTuple):
+    description: T.Optional[str]
+    type_name: T.Optional[str]
+
+
+class DocInfo(T.NamedTuple):
+    """The parameters(by name, without the leading `*`)
+    and the returns of a docstring."""
+    params: T.Dict[str, DocItem]
+    returns: T.Optional[DocItem]
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_docstring(docstring: str) -> DocInfo:
+    """Parse the docstring with `docstring_parser`, cached by the text.
+    The result is shared, don't modify it."""
     import docstring_parser
     doc = docstring_parser.parse(docstring)
-    for i, val in enumerate(desc.inputs):
-        if val.doc is None:
-            val.doc = doc.params[i].description
-        if val.type is None:
-            val.type = eval(doc.params[i].type_name or "None")
+    params = {
+        p.arg_name.lstrip("*"): DocItem(p.description, p.type_name)
+        for p in doc.params
+    }
+    returns = None
     if doc.returns is not None:
-        for i, val in enumerate(desc.outputs):
-            if val.doc is None:
-                val.doc = doc.returns.description
-            if val.type is type(None):
-                val.type = eval(doc.returns.type_name or "None")
+        returns = DocItem(doc.returns.description, doc.returns.type_name)
+    return DocInfo(params, returns)
+
+
+def _docstring_item(
+        docstring: str, name: T.Optional[str],
+        ) -> T.Optional[DocItem]:
+    """The item of the input `name`, or the returns when it's None."""
+    info = parse_docstring(docstring)
+    if name is None:
+        return info.returns
+    return info.params.get(name)
+
+
+def update_using_docstring(
+        desc: Description, docstring: str,
+        env: T.Optional[T.Mapping[str, T.Any]] = None,
+        lazy: bool = False):
+    """Update the docs and missing types of the values by the docstring,
+    type names are resolved by `resolve_type` with `env`.
+
+    The inputs are matched with the docstring parameters by name.
+    With `lazy`, the docstring is only parsed when the updated `doc`
+    or `type` of a value is first read."""
+    def doc_of(name: T.Optional[str]) -> T.Optional[str]:
+        item = _docstring_item(docstring, name)
+        return None if item is None else item.description
+
+    def type_of(name: T.Optional[str], default: T.Any) -> T.Any:
+        item = _docstring_item(docstring, name)
+        if item is None:
+            return default
+        return resolve_type(item.type_name or "None", env)
+
+    def update(val: Value, name: T.Optional[str], missing_type: T.Any):
+        if val.doc is None:
+            if lazy:
+                pending: T.Any = Pending(functools.partial(doc_of, name))
+                val.doc = pending
+            else:
+                val.doc = doc_of(name)
+        if val.type is missing_type:
+            if lazy:
+                val.type = Pending(
+                    functools.partial(type_of, name, missing_type))
+            else:
+                val.type = type_of(name, missing_type)
+
+    for val in desc.inputs:
+        if val.name is not None:
+            update(val, val.name, None)
+    for val in desc.outputs:
+        update(val, None, type(None))
+
+
+class ParseCache():
+    """Memoize the results of `parse_func`, weakly keyed on the function.
+
+    Cached descriptions are frozen, use `Description.copy` to get a
+    mutable one. An entry is invalidated when the marks store or the
+    `__signature__` of the function changes(e.g. after `mark_input`,
+    `sign_parameters` or `copy_signature`).
+
+    With `persistent` set(see `funcdesc.disk_cache.enable_disk_cache`),
+    the missing descriptions are taken from it instead of parsed.
+    """
+    def __init__(self) -> None:
+        self._store: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.persistent: T.Any = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _fingerprint(target: T.Callable) -> tuple:
+        attrs = getattr(target, "__dict__", {})
+        marks = attrs.get(FUNC_MARK_STORE_KEY)
+        version = -1 if marks is None else marks.version
+        return (marks, version, attrs.get("__signature__"))
+
+    def get(
+            self,
+            func: T.Callable,
+            update_by_docstring: bool = False,
+            lazy_docstring: bool = False,
+            ) -> Description:
+        """Get the description of the function, parse it when
+        it is not cached or the cached one is out of date."""
+        is_method = isinstance(func, types.MethodType)
+        target = func.__func__ if is_method else func  # type: ignore
+        key = (is_method, update_by_docstring, lazy_docstring)
+        fingerprint = self._fingerprint(target)
+        try:
+            entries = self._store.get(target)
+        except TypeError:  # not weak referenceable
+            self.misses += 1
+            return self._parse(func, update_by_docstring, lazy_docstring)
+        if entries is not None and key in entries:
+            cached_fp, desc = entries[key]
+            if all(a is b for a, b in zip(cached_fp, fingerprint)):
+                self.hits += 1
+                return desc
+            self.invalidations += 1
+        self.misses += 1
+        desc = self._parse(func, update_by_docstring, lazy_docstring)
+        if entries is None:
+            entries = self._store[target] = {}
+        entries[key] = (fingerprint, desc)
+        return desc
+
+    def _parse(
+            self, func: T.Callable,
+            update_by_docstring: bool, lazy_docstring: bool,
+            ) -> Description:
+        if self.persistent is not None:
+            return self.persistent.get(
+                func, update_by_docstring, lazy_docstring)
+        return _parse_func(func, update_by_docstring, lazy_docstring).freeze()
+
+    def clear(self) -> None:
+        self._store.clear()
+        self.hits = self.misses = self.invalidations = 0
+
+    def stats(self) -> T.Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": len(self._store),
+        }
+
+
+parse_cache = ParseCache()
 
 
 def parse_func(
         func: T.Callable,
-        update_by_docstring: bool = False
+        update_by_docstring: bool = False,
+        cache: bool = False,
+        lazy_docstring: bool = False,
+        ) -> Description:
+    """Parse the function and return a Description object.
+
+    With `cache=True` the result is memoized in `parse_cache`,
+    and the returned description is frozen. With `lazy_docstring`,
+    the docstring is parsed when the docs or the types taken
+    from it are first read(see `update_using_docstring`)."""
+    if cache:
+        return parse_cache.get(func, update_by_docstring, lazy_docstring)
+    return _parse_func(func, update_by_docstring, lazy_docstring)
+
+
+def _parse_func(
+        func: T.Callable,
+        update_by_docstring: bool = False,
+        lazy_docstring: bool = False,
         ) -> Description:
-    """Parse the function and return a Description object."""
     sig = inspect.signature(func)
     is_method = isinstance(func, types.MethodType)
     func_marks: T.Optional[FuncMarks] = func.__dict__.get(FUNC_MARK_STORE_KEY)
     desc = parse_signature(sig, is_method, func_marks)
     if update_by_docstring:
-        update_using_docstring(desc, func.__doc__ or "")
+        update_using_docstring(
+            desc, func.__doc__ or "", getattr(func, "__globals__", None),
+            lazy=lazy_docstring)
     desc.name = func.__name__
     desc.doc = func.__doc__
     return desc
@@ -149,5 +320,5 @@ def parse_signature(
     desc.inputs = inputs
     outputs = parse_func_outputs(sig, func_marks.output_marks)
     desc.outputs = outputs
-    desc.side_effects = func_marks.side_effect_marks
+    desc.side_effects = list(func_marks.side_effect_marks)
     return desc
@@ -0,0 +1,345 @@
+import typing as T
+import inspect
+import itertools
+import linecache
+
+from .desc import (
+    Description, Value, BindingPlan, NotDef, _check_number_in_range,
+    _range_copy,
+)
+from .errors import CheckError
+
+
+_plan_ids = itertools.count()
+
+
+def _type_error(val: T.Any, type_: T.Any) -> TypeError:
+    return TypeError(f"Value {val} is not in valid type({type_})")
+
+
+def _range_error(val: T.Any, range_: T.Any) -> ValueError:
+    return ValueError(f"Value {val} is not in a valid range({range_}).")
+
+
+def _missing_error(name: str) -> TypeError:
+    return TypeError(f"{name} is not provided and has no default value.")
+
+
+def _tag_error(err: Exception, source: T.Any) -> Exception:
+    """Record the Value or SideEffect which caused the error
+    on it, read it with `error_source`."""
+    try:
+        err.funcdesc_source = source  # type: ignore
+    except AttributeError:  # pragma: no cover
+        pass
+    return err
+
+
+def error_source(err: Exception) -> T.Any:
+    """The Value or SideEffect which caused a check error,
+    None if unknown."""
+    return getattr(err, "funcdesc_source", None)
+
+
+def compile_source(
+        source: str,
+        namespace: T.Dict[str, T.Any],
+        filename: str,
+        ) -> T.Dict[str, T.Any]:
+    """Execute generated source in `namespace` and return the namespace.
+
+    The source is registered in `linecache`, so tracebacks through the
+    generated functions show the generated lines."""
+    code = compile(source, filename, "exec")
+    linecache.cache[filename] = (
+        len(source), None, source.splitlines(True), filename)
+    exec(code, namespace)
+    return namespace
+
+
+class CheckPlan():
+    """Checking functions specialized for one Description.
+
+    The argument binding, the resolved type/range checkers and the
+    skip logic for values without checkers are baked into generated
+    Python source once, so the per-call overhead of the compiled
+    functions is only a handful of bytecode ops.
+
+    The plan is a snapshot of the description, `is_current` tells
+    if it's still up to date with it and with the registered checkers.
+    """
+    def __init__(
+            self,
+            desc: Description,
+            check_inputs: bool = True,
+            check_outputs: bool = True,
+            check_type: bool = True,
+            check_range: bool = True,
+            bind_inputs: bool = False,
+            ) -> None:
+        self.desc = desc
+        self.is_check_inputs = check_inputs
+        self.is_check_outputs = check_outputs
+        self.is_check_type = check_type
+        self.is_check_range = check_range
+        self.bind_inputs = bind_inputs
+        self.checker_version = Value.checker_version
+        self.namespace: T.Dict[str, T.Any] = {
+            "CheckError": CheckError,
+            "NotDef": NotDef,
+            "_type_error": _type_error,
+            "_range_error": _range_error,
+            "_missing_error": _missing_error,
+            "_tag_error": _tag_error,
+        }
+        self.source = self.generate()
+        filename = f"<funcdesc plan {next(_plan_ids)}: {desc.name}>"
+        ns = compile_source(self.source, self.namespace, filename)
+        self.check_inputs: T.Callable[[tuple, dict], T.Optional[dict]] = \
+            ns["check_inputs"]
+        self.check_outputs: T.Callable[[T.Any], None] = ns["check_outputs"]
+        self.call: T.Callable[[T.Callable, tuple, dict], T.Any] = ns["call"]
+        self._matches: T.Callable[[Description], bool] = ns["matches"]
+
+    def is_current(self, desc: Description) -> bool:
+        """If the plan is up to date: built for `desc` with the current
+        checkers, and the values of `desc` are the same objects with
+        the same types, ranges(also compared with a copy, for the edits
+        made in place), names, kinds, defaults and container strategies
+        as when it was built, and it still has(or has no) side effects.
+        """
+        return (desc is self.desc) and \
+            (self.checker_version == Value.checker_version) and \
+            self._matches(desc)
+
+    def resolve_checkers(
+            self, val: Value
+            ) -> T.Tuple[T.Optional[T.Callable], T.Optional[T.Callable]]:
+        """Get the (type_checker, range_checker) pair that
+        actually needs to run for the value."""
+        type_checker = val.type_checker if self.is_check_type else None
+        range_checker = val.range_checker if self.is_check_range else None
+        if (range_checker is _check_number_in_range) and (val.range is None):
+            range_checker = None
+        return type_checker, range_checker
+
+    def _value_check_lines(
+            self, prefix: str, idx: int, val: Value, var: str,
+            ) -> T.List[str]:
+        type_checker, range_checker = self.resolve_checkers(val)
+        if (type_checker is None) and (range_checker is None):
+            return []
+        ns = self.namespace
+        ns[f"_{prefix}val{idx}"] = val
+        # variadic inputs are checked element by element
+        lines = ["    try:"]
+        if val.kind is inspect.Parameter.VAR_POSITIONAL:
+            lines.append(f"        for x in {var}:")
+            ind, elem = " " * 12, "x"
+        elif val.kind is inspect.Parameter.VAR_KEYWORD:
+            lines.append(f"        for x in {var}.values():")
+            ind, elem = " " * 12, "x"
+        else:
+            ind, elem = " " * 8, var
+        if type_checker is not None:
+            tc, t = f"_{prefix}tc{idx}", f"_{prefix}t{idx}"
+            ns[tc], ns[t] = type_checker, val.type
+            lines += [
+                f"{ind}if not {tc}({elem}, {t}):",
+                f"{ind}    raise _type_error({elem}, {t})",
+            ]
+        if range_checker is not None:
+            rc, r = f"_{prefix}rc{idx}", f"_{prefix}r{idx}"
+            ns[rc], ns[r] = range_checker, val.checked_range
+            lines += [
+                f"{ind}if not {rc}({elem}, {r}):",
+                f"{ind}    raise _range_error({elem}, {r})",
+            ]
+        lines += [
+            "    except Exception as e:",
+            "        if errors is None:",
+            "            errors = []",
+            f"        errors.append(_tag_error(e, _{prefix}val{idx}))",
+        ]
+        return lines
+
+    def _bind_lines(
+            self, idx: int, slot: T.Tuple[str, T.Any, int, T.Any],
+            binding: BindingPlan,
+            ) -> T.List[str]:
+        name, kind, pos, default = slot
+        var = f"v{idx}"
+        if kind is inspect.Parameter.VAR_POSITIONAL:
+            return [f"    {var} = args[{binding.n_positional}:]"]
+        elif kind is inspect.Parameter.VAR_KEYWORD:
+            self.namespace["_keyword_names"] = frozenset(
+                binding.keyword_names)
+            return [
+                f"    {var} = {{k: v for k, v in kwargs.items()"
+                " if k not in _keyword_names}",
+            ]
+        lines = []
+        branch = "if"
+        if pos >= 0:
+            lines += [
+                f"    if n_args > {pos}:",
+                f"        {var} = args[{pos}]",
+            ]
+            branch = "elif"
+        if kind is not inspect.Parameter.POSITIONAL_ONLY:
+            lines += [
+                f"    {branch} {name!r} in kwargs:",
+                f"        {var} = kwargs[{name!r}]",
+            ]
+        lines.append("    else:")
+        if default is NotDef:
+            lines.append(f"        raise _missing_error({name!r})")
+        else:
+            self.namespace[f"_d{idx}"] = default
+            lines.append(f"        {var} = _d{idx}")
+        return lines
+
+    def _input_lines(self, bind: bool) -> T.List[str]:
+        inputs = self.desc.inputs
+        binding = self.desc.binding_plan
+        checks: T.List[str] = []
+        checked = set()
+        if self.is_check_inputs:
+            for idx, val in enumerate(inputs):
+                val_checks = self._value_check_lines("i", idx, val, f"v{idx}")
+                if val_checks:
+                    checked.add(idx)
+                checks += val_checks
+        if (not checks) and (not bind):
+            return []
+        lines = []
+        if binding.n_positional > 0:
+            lines.append("    n_args = len(args)")
+        for idx, slot in enumerate(binding.slots):
+            if (not bind) and (idx not in checked):
+                # only the checked values need to be bound
+                continue
+            lines += self._bind_lines(idx, slot, binding)
+        if checks:
+            lines.append("    errors = None")
+            lines += checks
+            lines += [
+                "    if errors is not None:",
+                "        raise CheckError(errors)",
+            ]
+        return lines
+
+    def _pass_in_line(self) -> str:
+        if not self.bind_inputs:
+            return "    return None"
+        items = ", ".join(
+            f"{('?' if val.name is None else val.name)!r}: v{idx}"
+            for idx, val in enumerate(self.desc.inputs)
+        )
+        return f"    return {{{items}}}"
+
+    def _output_lines(self) -> T.List[str]:
+        if not self.is_check_outputs:
+            return []
+        outputs = self.desc.outputs
+        n_out = len(outputs)
+        lines = [
+            "    if isinstance(res, tuple):",
+            f"        if len(res) != {n_out}:",
+            "            raise CheckError(",
+            "                f\"Output num({len(res)}) not match the\"",
+            f"                \" description outputs num({n_out})\"",
+            "            )",
+        ]
+        lines += [f"        o{idx} = res[{idx}]" for idx in range(n_out)]
+        lines.append("    else:")
+        if n_out != 1:
+            lines += [
+                "        raise CheckError(",
+                "            \"Output num(1) not match the\"",
+                f"            \" description outputs num({n_out})\"",
+                "        )",
+            ]
+        else:
+            lines.append("        o0 = res")
+        checks: T.List[str] = []
+        for idx, val in enumerate(outputs):
+            checks += self._value_check_lines("o", idx, val, f"o{idx}")
+        if checks:
+            lines.append("    errors = None")
+            lines += checks
+            lines += [
+                "    if errors is not None:",
+                "        raise CheckError(errors)",
+            ]
+        return lines
+
+    def _match_lines(self) -> T.List[str]:
+        """Compare the description with what the plan was built from,
+        the values of the frozen descriptions can't be changed."""
+        desc = self.desc
+        if desc.frozen:
+            return ["    return True"]
+        ns = self.namespace
+        inputs, outputs = desc.inputs, desc.outputs
+        lines = [
+            "    inputs, outputs = desc.inputs, desc.outputs",
+            f"    if (len(inputs) != {len(inputs)}) or "
+            f"(len(outputs) != {len(outputs)}) or "
+            f"((len(desc.side_effects) > 0) is not "
+            f"{len(desc.side_effects) > 0}):",
+            "        return False",
+        ]
+        values = [("inputs", i, v) for i, v in enumerate(inputs)] + \
+            [("outputs", i, v) for i, v in enumerate(outputs)]
+        for idx, (seq, i, val) in enumerate(values):
+            var = f"_s{idx}"
+            ns[var] = val
+            ns[f"{var}t"], ns[f"{var}r"] = val._type, val.range
+            ns[f"{var}n"], ns[f"{var}k"] = val.name, val.kind
+            ns[f"{var}d"], ns[f"{var}kw"] = val.default, val._kwargs
+            lines += [
+                f"    v = {seq}[{i}]",
+                f"    if (v is not {var}) or (v._type is not {var}t) or "
+                f"(v.range is not {var}r) or (v.name != {var}n) or "
+                f"(v.kind is not {var}k) or (v.default is not {var}d) or "
+                f"(v._kwargs is not {var}kw):",
+                "        return False",
+            ]
+            range_copy = _range_copy(val.range)
+            if range_copy is not None:
+                # the edits made in place
+                ns[f"{var}c"] = range_copy
+                lines += [
+                    f"    if {var}c != {var}r:",
+                    "        return False",
+                ]
+            if val._kwargs is not None:
+                ns[f"{var}cs"] = val._kwargs.get("container_strategy")
+                lines += [
+                    f"    if {var}kw.get('container_strategy') "
+                    f"is not {var}cs:",
+                    "        return False",
+                ]
+        lines.append("    return True")
+        return lines
+
+    def generate(self) -> str:
+        """Generate the source of the checking functions."""
+        output_lines = self._output_lines()
+        lines = ["def check_inputs(args, kwargs):"]
+        lines += self._input_lines(self.bind_inputs)
+        lines.append(self._pass_in_line())
+        lines.append("")
+        lines.append("def check_outputs(res):")
+        lines += output_lines or ["    pass"]
+        lines.append("")
+        lines.append("def call(func, args, kwargs):")
+        lines += self._input_lines(False)
+        lines.append("    res = func(*args, **kwargs)")
+        lines += output_lines
+        lines.append("    return res")
+        lines.append("")
+        lines.append("def matches(desc):")
+        lines += self._match_lines()
+        return "\n".join(lines) + "\n"
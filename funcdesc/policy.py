@@ -0,0 +1,141 @@
+import typing as T
+import random
+import itertools
+import threading
+
+
+class CheckPolicy():
+    """Decide which calls of a guarded function are checked.
+
+    `should_check` is called before each call, calls it rejects
+    go straight to the wrapped function. Policies with `timed` set
+    get the measured check and function time of every call
+    through `record`.
+    """
+    timed = False
+
+    def should_check(self, args: tuple, kwargs: dict) -> bool:
+        return True
+
+    def record(self, check_time: float, func_time: float) -> None:
+        pass
+
+    def reset(self) -> None:
+        """Forget the state(counters, timings) of the policy."""
+        pass
+
+
+class EveryN(CheckPolicy):
+    """Check the 1st, (n+1)-th, (2n+1)-th ... calls."""
+    def __init__(self, n: int) -> None:
+        if n < 1:
+            raise ValueError(f"n should be a positive integer, got {n}")
+        self.n = n
+        self.reset()
+
+    def should_check(self, args: tuple, kwargs: dict) -> bool:
+        return next(self._counter) % self.n == 0
+
+    def reset(self) -> None:
+        self._counter = itertools.count()
+
+    def __repr__(self) -> str:
+        return f"EveryN({self.n})"
+
+
+class RandomFraction(CheckPolicy):
+    """Check a random fraction of the calls."""
+    def __init__(
+            self, fraction: float, seed: T.Optional[int] = None) -> None:
+        if not (0.0 <= fraction <= 1.0):
+            raise ValueError(
+                f"fraction should be in range [0, 1], got {fraction}")
+        self.fraction = fraction
+        self._random = random.Random(seed)
+
+    def should_check(self, args: tuple, kwargs: dict) -> bool:
+        return self._random.random() < self.fraction
+
+    def __repr__(self) -> str:
+        return f"RandomFraction({self.fraction})"
+
+
+ArgTypes = T.Tuple[T.Any, ...]
+
+
+class FirstNPerSignature(CheckPolicy):
+    """Check only the first `n` calls of each distinct
+    argument-type signature, the types of the positional arguments
+    and the names and types of the keyword arguments."""
+    def __init__(self, n: int = 1) -> None:
+        if n < 1:
+            raise ValueError(f"n should be a positive integer, got {n}")
+        self.n = n
+        self.reset()
+
+    @staticmethod
+    def signature(args: tuple, kwargs: dict) -> ArgTypes:
+        sig: ArgTypes = tuple(type(a) for a in args)
+        if kwargs:
+            sig += tuple((k, type(v)) for k, v in sorted(kwargs.items()))
+        return sig
+
+    def should_check(self, args: tuple, kwargs: dict) -> bool:
+        sig = self.signature(args, kwargs)
+        with self._lock:
+            count = self.counts.get(sig, 0)
+            if count >= self.n:
+                return False
+            self.counts[sig] = count + 1
+        return True
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self.counts: T.Dict[ArgTypes, int] = {}
+
+    def __repr__(self) -> str:
+        return f"FirstNPerSignature({self.n})"
+
+
+class OverheadBudget(CheckPolicy):
+    """Keep the total check time under `percent` percent of the total
+    run time of the wrapped function.
+
+    The first `warmup` calls are always checked. After that a call is
+    checked only when the accumulated check time is within the budget.
+    """
+    timed = True
+
+    def __init__(self, percent: float, warmup: int = 1) -> None:
+        if percent <= 0:
+            raise ValueError(f"percent should be positive, got {percent}")
+        self.percent = percent
+        self.warmup = warmup
+        self.reset()
+
+    def should_check(self, args: tuple, kwargs: dict) -> bool:
+        if self.n_checked < self.warmup:
+            return True
+        budget = self.func_time * self.percent / 100
+        return self.check_time <= budget
+
+    def record(self, check_time: float, func_time: float) -> None:
+        if check_time > 0:
+            self.n_checked += 1
+        self.check_time += check_time
+        self.func_time += func_time
+
+    def reset(self) -> None:
+        self.n_checked = 0
+        self.check_time = 0.0
+        self.func_time = 0.0
+
+    @property
+    def overhead(self) -> float:
+        """The measured check time in percent of the function time."""
+        if self.func_time == 0:
+            return 0.0
+        return self.check_time / self.func_time * 100
+
+    def __repr__(self) -> str:
+        return f"OverheadBudget({self.percent})"
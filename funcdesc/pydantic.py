@@ -1,9 +1,14 @@
 import typing as T
+import threading
+from collections import OrderedDict
 
 from .desc import Description, Value, NotDef
 from .parse import parse_func
 
-from pydantic import create_model, Field
+from pydantic import BaseModel, create_model, Field
+
+
+Models = T.Dict[str, T.Type[BaseModel]]
 
 
 def value_to_field(value: Value):
@@ -16,7 +21,7 @@ def value_to_field(value: Value):
     return field
 
 
-def desc_to_pydantic(description: Description) -> dict:
+def _create_models(description: Description) -> Models:
     res = {}
     for _tp in ("inputs", "outputs"):
         fields = {}
@@ -30,6 +35,111 @@ def desc_to_pydantic(description: Description) -> dict:
     return res
 
 
-def parse_func_pydantic(func: T.Callable) -> dict:
-    desc = parse_func(func)
-    return desc_to_pydantic(desc)
+def _hashable(obj: T.Any) -> T.Hashable:
+    # the type is included, so `1`, `1.0` and `True` are not the same
+    try:
+        hash(obj)
+        return (type(obj), obj)
+    except TypeError:
+        return (type(obj), repr(obj))
+
+
+def model_key(description: Description) -> tuple:
+    """Structural key of the models of a description: its name and
+    the names, types, defaults and docs of the inputs and outputs."""
+    def value_key(val: Value) -> tuple:
+        return (val.name, _hashable(val.type), _hashable(val.default), val.doc)
+    return (
+        description.name,
+        tuple(value_key(v) for v in description.inputs),
+        tuple(value_key(v) for v in description.outputs),
+    )
+
+
+class ModelCache():
+    """LRU cache of the pydantic models created from descriptions,
+    equivalent descriptions(see `model_key`) get the same model classes.
+    """
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._store: "OrderedDict[tuple, T.Dict[str, T.Any]]" = \
+            OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, description: Description) -> T.Dict[str, T.Any]:
+        key = model_key(description)
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is not None:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        # models are created out of the lock, the first stored one wins
+        entry = {"models": _create_models(description), "schemas": None}
+        with self._lock:
+            entry = self._store.setdefault(key, entry)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+        return entry
+
+    def models(self, description: Description) -> Models:
+        return dict(self._entry(description)["models"])
+
+    def schemas(self, description: Description) -> T.Dict[str, dict]:
+        """The JSON Schemas of the models, computed once per entry.
+        The schema dicts are shared, don't modify them."""
+        entry = self._entry(description)
+        schemas = entry["schemas"]
+        if schemas is None:
+            schemas = entry["schemas"] = {
+                k: m.model_json_schema() for k, m in entry["models"].items()
+            }
+        return dict(schemas)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> T.Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._store),
+            "maxsize": self.maxsize,
+        }
+
+
+model_cache = ModelCache()
+
+
+def clear_model_cache() -> None:
+    model_cache.clear()
+
+
+def desc_to_pydantic(description: Description, cache: bool = False) -> dict:
+    """Create the pydantic models of the inputs and outputs.
+
+    With `cache`, the models are taken from `model_cache`, so the
+    same model classes are returned for equivalent descriptions,
+    don't modify them."""
+    if cache:
+        return model_cache.models(description)
+    return _create_models(description)
+
+
+def desc_to_json_schema(description: Description) -> dict:
+    """The JSON Schemas of the inputs and outputs models,
+    precomputed once per cached model."""
+    return model_cache.schemas(description)
+
+
+def parse_func_pydantic(func: T.Callable, cache: bool = False) -> dict:
+    """`desc_to_pydantic` of the description of the function. With
+    `cache`, the frozen description is taken from the parse cache
+    and the models from `model_cache`."""
+    desc = parse_func(func, cache=cache)
+    return desc_to_pydantic(desc, cache=cache)
@@ -0,0 +1,274 @@
+import typing as T
+from collections.abc import Set
+
+from .desc import Description, Value, SideEffect
+
+
+Names = T.AbstractSet[str]
+# (index, key), the keys are hashable
+_IndexKey = T.Tuple[str, T.Any]
+
+_EMPTY: T.Dict[str, None] = {}
+
+# the indexes of the registry
+_INPUT_TYPE = "input_type"
+_OUTPUT_TYPE = "output_type"
+_VALUE_NAME = "value_name"
+_RANGE_CHECKER = "range_checker"
+_SIDE_EFFECT = "side_effect"
+
+
+def _type_key(type_: T.Any) -> T.Hashable:
+    """Index key of a type, the unhashable "types"(e.g. a list of
+    output types) are keyed by their repr."""
+    try:
+        hash(type_)
+    except TypeError:
+        return ("<unhashable>", repr(type_))
+    return type_
+
+
+class _SubclassesView(Set):
+    """Read-only live view of the names indexed by the subclasses of a
+    class, merged from the per-class names on each access."""
+    __slots__ = ("_index", "_cls")
+
+    def __init__(
+            self, index: T.Dict[T.Hashable, T.Dict[str, None]], cls: type,
+            ) -> None:
+        self._index = index
+        self._cls = cls
+
+    @classmethod
+    def _from_iterable(cls, it):
+        # results of `&`, `|` ...
+        return set(it)
+
+    def _names(self) -> T.Iterator[T.Dict[str, None]]:
+        # the keys are the distinct classes, far fewer than the names
+        cls = self._cls
+        for key, names in self._index.items():
+            if isinstance(key, type) and issubclass(key, cls):
+                yield names
+
+    def __contains__(self, name: object) -> bool:
+        return any(name in names for names in self._names())
+
+    def __iter__(self) -> T.Iterator[str]:
+        seen: T.Set[str] = set()
+        for names in self._names():
+            for name in names:
+                if name not in seen:
+                    seen.add(name)
+                    yield name
+
+    def __len__(self) -> int:
+        seen: T.Set[str] = set()
+        for names in self._names():
+            seen.update(names)
+        return len(seen)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({set(self)!r})"
+
+
+class DescriptionRegistry():
+    """Descriptions by name, with inverted indexes for finding the
+    descriptions by the types of their inputs and outputs, the names
+    of their values, the range checkers of their values and the
+    classes of their side effects.
+
+    The descriptions are frozen when added(mutable ones are copied),
+    the indexes are updated incrementally when a description is added,
+    replaced or removed. A value is indexed by the range checker
+    resolved for its type when it was added, only if it has a range.
+
+    The results of the lookups are read-only live views of the
+    indexes(set-like, so they can be combined by `&` and `|`), copy
+    them before changing the registry if they are iterated after it.
+    The views of the keys indexed when they were taken follow all the
+    later changes, the views of unknown keys stay empty. The views of
+    the subclass lookups merge the names of the matching classes on
+    each access, so they also see the classes indexed later.
+    """
+    def __init__(
+            self,
+            descs: T.Optional[T.Mapping[str, Description]] = None,
+            ) -> None:
+        self._descs: T.Dict[str, Description] = {}
+        # index -> key -> names(dicts, for the read-only key views)
+        self._indexes: T.Dict[str, T.Dict[T.Hashable, T.Dict[str, None]]] = {
+            _INPUT_TYPE: {}, _OUTPUT_TYPE: {}, _VALUE_NAME: {},
+            _RANGE_CHECKER: {}, _SIDE_EFFECT: {},
+        }
+        # name -> the (index, key) the description is indexed by
+        self._keys: T.Dict[str, T.Set[_IndexKey]] = {}
+        if descs is not None:
+            self.update(descs)
+
+    @staticmethod
+    def _value_keys(
+            val: Value, type_index: str,
+            ) -> T.Iterator[_IndexKey]:
+        yield type_index, _type_key(val.type)
+        if val.name is not None:
+            yield _VALUE_NAME, val.name
+        if val.range is not None:
+            range_checker = val.range_checker
+            if range_checker is not None:
+                yield _RANGE_CHECKER, range_checker
+
+    def _desc_keys(
+            self, desc: Description,
+            ) -> T.Set[_IndexKey]:
+        keys: T.Set[_IndexKey] = set()
+        for val in desc.inputs:
+            keys.update(self._value_keys(val, _INPUT_TYPE))
+        for val in desc.outputs:
+            keys.update(self._value_keys(val, _OUTPUT_TYPE))
+        for effect in desc.side_effects:
+            keys.add((_SIDE_EFFECT, type(effect)))
+        return keys
+
+    def add(self, name: str, desc: Description) -> Description:
+        """Add the description, replacing the one with the same name.
+        Return the stored(frozen) description."""
+        # freeze and key the new one first, a failure keeps the old one
+        desc = desc if desc.frozen else desc.copy().freeze()
+        keys = self._desc_keys(desc)
+        if name in self._descs:
+            self.remove(name)
+        indexes = self._indexes
+        for index, key in keys:
+            indexes[index].setdefault(key, {})[name] = None
+        self._descs[name] = desc
+        self._keys[name] = keys
+        return desc
+
+    def update(self, descs: T.Mapping[str, Description]) -> None:
+        for name, desc in descs.items():
+            self.add(name, desc)
+
+    def remove(self, name: str) -> Description:
+        """Remove the description and return it,
+        raise KeyError when it's not in the registry."""
+        desc = self._descs.pop(name)
+        indexes = self._indexes
+        for index, key in self._keys.pop(name):
+            # the emptied dicts are kept, the views of them stay live
+            del indexes[index][key][name]
+        return desc
+
+    def clear(self) -> None:
+        self._descs.clear()
+        self._keys.clear()
+        for index in self._indexes.values():
+            for names in index.values():
+                names.clear()
+
+    def __setitem__(self, name: str, desc: Description) -> None:
+        self.add(name, desc)
+
+    def __delitem__(self, name: str) -> None:
+        self.remove(name)
+
+    def __getitem__(self, name: str) -> Description:
+        return self._descs[name]
+
+    def get(
+            self, name: str,
+            default: T.Optional[Description] = None,
+            ) -> T.Optional[Description]:
+        return self._descs.get(name, default)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._descs
+
+    def __len__(self) -> int:
+        return len(self._descs)
+
+    def __iter__(self) -> T.Iterator[str]:
+        return iter(self._descs)
+
+    def items(self) -> T.ItemsView[str, Description]:
+        return self._descs.items()
+
+    def _lookup(self, index: str, key: T.Hashable) -> Names:
+        return self._indexes[index].get(key, _EMPTY).keys()
+
+    def _lookup_classes(
+            self, index: str, cls: type, subclasses: bool,
+            ) -> Names:
+        if not subclasses:
+            return self._lookup(index, cls)
+        return _SubclassesView(self._indexes[index], cls)
+
+    def with_input_type(
+            self, type_: T.Any, subclasses: bool = False,
+            ) -> Names:
+        """Names of the descriptions with an input of the type,
+        or of its subclasses when `subclasses` is set."""
+        if isinstance(type_, type):
+            return self._lookup_classes(_INPUT_TYPE, type_, subclasses)
+        return self._lookup(_INPUT_TYPE, _type_key(type_))
+
+    def with_output_type(
+            self, type_: T.Any, subclasses: bool = False,
+            ) -> Names:
+        """Names of the descriptions with an output of the type,
+        or of its subclasses when `subclasses` is set."""
+        if isinstance(type_, type):
+            return self._lookup_classes(_OUTPUT_TYPE, type_, subclasses)
+        return self._lookup(_OUTPUT_TYPE, _type_key(type_))
+
+    def with_value_name(self, name: str) -> Names:
+        """Names of the descriptions with an input or output named so."""
+        return self._lookup(_VALUE_NAME, name)
+
+    def with_range_checker(self, checker: T.Any) -> Names:
+        """Names of the descriptions with a value checked by the range
+        checker. `checker` is the checker function, or a type whose
+        checker is used, e.g. `OneOf` or `int`."""
+        if isinstance(checker, type):
+            checker = Value.resolve_checkers(checker)[1]
+            if checker is None:
+                return _EMPTY.keys()
+        return self._lookup(_RANGE_CHECKER, checker)
+
+    def with_side_effect(
+            self, cls: T.Type[SideEffect], subclasses: bool = True,
+            ) -> Names:
+        """Names of the descriptions with a side effect of the class
+        or, unless `subclasses` is unset, of its subclasses."""
+        return self._lookup_classes(_SIDE_EFFECT, cls, subclasses)
+
+    def find(
+            self,
+            input_type: T.Any = None,
+            output_type: T.Any = None,
+            value_name: T.Optional[str] = None,
+            range_checker: T.Any = None,
+            side_effect: T.Optional[T.Type[SideEffect]] = None,
+            ) -> T.Set[str]:
+        """Names of the descriptions matching all the given criteria,
+        see the `with_*` methods. Intersected from the smallest result.
+        """
+        results = []
+        if input_type is not None:
+            results.append(self.with_input_type(input_type))
+        if output_type is not None:
+            results.append(self.with_output_type(output_type))
+        if value_name is not None:
+            results.append(self.with_value_name(value_name))
+        if range_checker is not None:
+            results.append(self.with_range_checker(range_checker))
+        if side_effect is not None:
+            results.append(self.with_side_effect(side_effect))
+        if not results:
+            return set(self._descs)
+        results.sort(key=len)
+        res = set(results[0])
+        for names in results[1:]:
+            # lookups in the larger views, not iterating them
+            res = {n for n in res if n in names}
+        return res
@@ -0,0 +1,302 @@
+import os
+import ast
+import types
+import inspect
+import warnings
+import typing
+import typing as T
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from .desc import Description, Value, SideEffect
+from .mark import mark_input, mark_output, FUNC_MARK_STORE_KEY, FuncMarks
+from .parse import parse_signature
+from .utils.type_expr import resolve_type, _parse, _BUILTIN_TYPES
+
+
+PathLike = T.Union[str, os.PathLike]
+
+_VALUE_NAMES = ("Val", "Value")
+_TUPLE_NAMES = ("Tuple", "tuple")
+_MARKS = {"mark_input": mark_input, "mark_output": mark_output}
+
+
+def _name_of(node: ast.AST) -> T.Optional[str]:
+    """The last name of `name` or `module.name`."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+class _Scanner():
+    def __init__(self) -> None:
+        # top level assignments of literals, for the ranges like
+        # `Val[str, CHOICES]`
+        self.constants: T.Dict[str, T.Any] = {}
+        # names bound to `typing` and its members by the imports,
+        # e.g. `import typing as T`
+        self.env: T.Dict[str, T.Any] = {}
+        # the other module level names(classes, functions, other
+        # imports and assignments), they shadow the builtins
+        self.local_names: T.Set[str] = set()
+
+    def literal(self, node: ast.AST) -> T.Any:
+        """Evaluate a literal or a module constant, other expressions
+        are kept as their source strings."""
+        if isinstance(node, ast.Name) and (node.id in self.constants):
+            return self.constants[node.id]
+        try:
+            return ast.literal_eval(node)
+        except (ValueError, TypeError, SyntaxError):
+            return ast.unparse(node)
+
+    def type_of(self, node: ast.AST) -> T.Any:
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            expr = node.value  # string annotation
+        else:
+            expr = ast.unparse(node)
+        try:
+            # only the builtins and the names imported from `typing`
+            _, names = _parse(expr)
+            for name in names:
+                if (name not in self.env) and ((name in self.local_names) or
+                                               (name not in _BUILTIN_TYPES) or
+                                               (name == "typing")):
+                    return expr
+            return resolve_type(expr, self.env)
+        except (NameError, ValueError, TypeError, SyntaxError):
+            # e.g. `T.Dict[int]`, which can only fail when it's used
+            return expr
+
+    def annotation(self, node: T.Optional[ast.AST]) -> T.Any:
+        """Convert an annotation to the annotation `parse_signature`
+        expects: a type(or its string), a Value or a list of them."""
+        if node is None:
+            return inspect.Parameter.empty
+        if isinstance(node, ast.Subscript):
+            name = _name_of(node.value)
+            elts = node.slice.elts if isinstance(node.slice, ast.Tuple) \
+                else [node.slice]
+            if name in _VALUE_NAMES:
+                args = [self.literal(e) for e in elts[1:]]
+                return Value(self.type_of(elts[0]), *args)
+            if name == "Outputs":
+                return [self.annotation(e) for e in elts]
+        if isinstance(node, ast.List):
+            return [self.annotation(e) for e in node.elts]
+        return self.type_of(node)
+
+    def returns(self, node: T.Optional[ast.AST]) -> T.Any:
+        # tuples are multiple outputs, like in `parse_func`
+        if isinstance(node, ast.Subscript) and \
+                (_name_of(node.value) in _TUPLE_NAMES) and \
+                isinstance(node.slice, ast.Tuple):
+            return [self.annotation(e) for e in node.slice.elts]
+        return self.annotation(node)
+
+    def signature(
+            self, node: T.Union[ast.FunctionDef, ast.AsyncFunctionDef],
+            ) -> inspect.Signature:
+        args = node.args
+        params = []
+        positional = [
+            (a, inspect.Parameter.POSITIONAL_ONLY) for a in args.posonlyargs
+        ] + [
+            (a, inspect.Parameter.POSITIONAL_OR_KEYWORD) for a in args.args
+        ]
+        n_no_default = len(positional) - len(args.defaults)
+        for i, (arg, kind) in enumerate(positional):
+            default = inspect.Parameter.empty
+            if i >= n_no_default:
+                default = self.literal(args.defaults[i - n_no_default])
+            params.append(inspect.Parameter(
+                arg.arg, kind, default=default,
+                annotation=self.annotation(arg.annotation)))
+        if args.vararg is not None:
+            params.append(inspect.Parameter(
+                args.vararg.arg, inspect.Parameter.VAR_POSITIONAL,
+                annotation=self.annotation(args.vararg.annotation)))
+        for arg, default_node in zip(args.kwonlyargs, args.kw_defaults):
+            default = inspect.Parameter.empty if default_node is None \
+                else self.literal(default_node)
+            params.append(inspect.Parameter(
+                arg.arg, inspect.Parameter.KEYWORD_ONLY, default=default,
+                annotation=self.annotation(arg.annotation)))
+        if args.kwarg is not None:
+            params.append(inspect.Parameter(
+                args.kwarg.arg, inspect.Parameter.VAR_KEYWORD,
+                annotation=self.annotation(args.kwarg.annotation)))
+        return inspect.Signature(
+            params, return_annotation=self.returns(node.returns))
+
+    def marks(
+            self, node: T.Union[ast.FunctionDef, ast.AsyncFunctionDef],
+            ) -> FuncMarks:
+        holder = types.SimpleNamespace()
+        marks = holder.__dict__[FUNC_MARK_STORE_KEY] = FuncMarks()
+        # decorators are applied from the bottom
+        for dec in reversed(node.decorator_list):
+            if not isinstance(dec, ast.Call):
+                continue
+            name = _name_of(dec.func)
+            if name == "mark_side_effect" and dec.args:
+                # the side effect classes are not imported,
+                # only their source is kept
+                marks.side_effect_marks.append(
+                    SideEffect(ast.unparse(dec.args[0])))
+            elif (name in _MARKS) and dec.args:
+                kwargs = {}
+                for kw in dec.keywords:
+                    if kw.arg is None:  # **kwargs
+                        continue
+                    if kw.arg == "type":
+                        kwargs["type"] = self.type_of(kw.value)
+                    else:
+                        kwargs[kw.arg] = self.literal(kw.value)
+                _MARKS[name](self.literal(dec.args[0]), **kwargs)(holder)
+        return marks
+
+    def describe(
+            self, node: T.Union[ast.FunctionDef, ast.AsyncFunctionDef],
+            ) -> Description:
+        desc = parse_signature(self.signature(node), False, self.marks(node))
+        desc.name = node.name
+        desc.doc = ast.get_docstring(node, clean=False)
+        return desc
+
+    def bind_names(self, tree: ast.Module) -> None:
+        """Collect the module level names, before describing
+        the functions(the annotations may refer to later ones)."""
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name == "typing":
+                        self.env[alias.asname or "typing"] = typing
+                    else:
+                        name = alias.asname or alias.name.split(".")[0]
+                        self.local_names.add(name)
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    name = alias.asname or alias.name
+                    if (node.module == "typing") and \
+                            hasattr(typing, alias.name):
+                        self.env[name] = getattr(typing, alias.name)
+                    else:
+                        self.local_names.add(name)
+            elif isinstance(node, (
+                    ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.local_names.add(node.name)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) \
+                    else [node.target]
+                self.local_names.update(
+                    t.id for t in targets if isinstance(t, ast.Name))
+        # also bound by the module, can't tell which one is used
+        for name in self.local_names:
+            self.env.pop(name, None)
+
+    def scan(self, tree: ast.Module) -> T.Dict[str, Description]:
+        self.bind_names(tree)
+        res = {}
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and (len(node.targets) == 1) \
+                    and isinstance(node.targets[0], ast.Name):
+                value = self.literal(node.value)
+                if not isinstance(value, str) or \
+                        isinstance(node.value, ast.Constant):
+                    self.constants[node.targets[0].id] = value
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) \
+                    and not node.name.startswith("_"):
+                res[node.name] = self.describe(node)
+        return res
+
+
+def scan_source(
+        source: str, filename: str = "<string>",
+        ) -> T.Dict[str, Description]:
+    """Describe the public top level functions of the module source
+    without importing it, return the descriptions by the function names.
+
+    The descriptions are built from the annotations(`Val[...]`,
+    `Outputs[...]` and types), the `mark_input`/`mark_output`/
+    `mark_side_effect` decorators and the docstrings. Only the builtin
+    classes and the names imported from `typing` are resolved(see
+    `resolve_type`), the other types are kept as their source strings,
+    like `DescriptionJSONDecoder` does. So are the
+    defaults and ranges which are not literals(or module level literal
+    constants). Side effects are plain `SideEffect`s with their source
+    as the description."""
+    tree = ast.parse(source, filename)
+    return _Scanner().scan(tree)
+
+
+def module_name(path: PathLike) -> str:
+    """The dotted module name of a source file, the parent directories
+    with an `__init__.py` are the packages."""
+    path = Path(path).resolve()
+    parts = [] if path.stem == "__init__" else [path.stem]
+    parent = path.parent
+    while (parent / "__init__.py").exists():
+        parts.append(parent.name)
+        parent = parent.parent
+    return ".".join(reversed(parts))
+
+
+def scan_file(path: PathLike) -> T.Dict[str, Description]:
+    """Describe the public functions of a source file, return the
+    descriptions by the qualified names(`package.module.func`)."""
+    with open(path, "rb") as f:
+        source = f.read()
+    module = module_name(path)
+    descs = scan_source(source.decode("utf-8"), str(path))
+    return {f"{module}.{name}": desc for name, desc in descs.items()}
+
+
+def _scan_file_safe(
+        path: str,
+        ) -> T.Tuple[T.Dict[str, Description], T.Optional[str]]:
+    try:
+        return scan_file(path), None
+    except (SyntaxError, OSError, UnicodeDecodeError) as e:
+        return {}, f"Failed to scan {path}: {e!r}"
+
+
+def _source_files(paths: T.Iterable[PathLike]) -> T.List[str]:
+    files: T.List[str] = []
+    for p in paths:
+        p = Path(p)
+        if p.is_dir():
+            files.extend(str(f) for f in sorted(p.rglob("*.py")))
+        else:
+            files.append(str(p))
+    return files
+
+
+def scan_paths(
+        paths: T.Union[PathLike, T.Iterable[PathLike]],
+        max_workers: T.Optional[int] = None,
+        ) -> T.Dict[str, Description]:
+    """Describe the public functions of the source files and the
+    packages(directories, scanned recursively), return the descriptions
+    by the qualified names. Files are scanned in parallel by a process
+    pool(no pool when `max_workers` is 1 or there is one file), the
+    files which can't be parsed are skipped with a warning."""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    files = _source_files(paths)
+    if (max_workers == 1) or (len(files) <= 1):
+        results = [_scan_file_safe(f) for f in files]
+    else:
+        n_workers = max_workers or os.cpu_count() or 1
+        chunksize = max(len(files) // (n_workers * 4), 1)
+        with ProcessPoolExecutor(n_workers) as pool:
+            results = list(
+                pool.map(_scan_file_safe, files, chunksize=chunksize))
+    descs: T.Dict[str, Description] = {}
+    for file_descs, error in results:
+        if error is not None:
+            warnings.warn(error)
+        descs.update(file_descs)
+    return descs
@@ -2,10 +2,14 @@ from .value import (
     OneOf, SubSet, InputPath, OutputPath,
 )
 from .side_effects import (
-    WriteFile,
+    WriteFile, PathTemplate,
+)
+from .stat_cache import (
+    StatCache, enable_stat_cache, disable_stat_cache,
 )
 
 __all__ = [
     "OneOf", "SubSet", "InputPath", "OutputPath",
-    "WriteFile",
+    "WriteFile", "PathTemplate",
+    "StatCache", "enable_stat_cache", "disable_stat_cache",
 ]
@@ -1,26 +1,66 @@
 import re
-from pathlib import Path
+import string
+import typing as T
 
 from ..desc import SideEffect
+from .stat_cache import path_exists, path_exists_now
+
+
+_FIELD_ROOT = re.compile(r"[^.\[]*")
+
+
+class PathTemplate():
+    """A path template like `"{inputs[name]}.txt"`, parsed once.
+
+    `fields` are the root names of the replacement fields("inputs"
+    or "outputs"), `depends_on_outputs` is set when the path can only
+    be known after the function returned.
+    """
+    __slots__ = ("template", "fields", "depends_on_outputs", "format")
+
+    def __init__(self, template: str) -> None:
+        self.template = template
+        self.fields = frozenset(
+            _FIELD_ROOT.match(field).group()  # type: ignore
+            for _, field, _, _ in string.Formatter().parse(template)
+            if field is not None
+        )
+        self.depends_on_outputs = "outputs" in self.fields
+        self.format: T.Callable[..., str] = template.format
+
+    def __repr__(self) -> str:
+        return f"<PathTemplate {self.template!r}>"
 
 
 class WriteFile(SideEffect):
+    """The function writes a file to the path of `path_template`,
+    which is formatted with the `inputs` and `outputs` dicts.
+    The file should not exist before the run(only checked when the
+    path doesn't depend on the outputs), and should exist after it."""
+    __slots__ = ("_template",)
+
     def __init__(self, path_template: str):
         self.path_template = path_template
 
+    @property
+    def path_template(self) -> str:
+        return self._template.template
+
+    @path_template.setter
+    def path_template(self, path_template: str):
+        self._template = PathTemplate(path_template)
+
     @property
     def description(self) -> str:
         return f"Write file to {self.path_template}"
 
     def check_before_run(self, inputs: dict) -> bool:
-        if re.match(r"\{outputs.*?\}", self.path_template):
+        template = self._template
+        if template.depends_on_outputs:
             return True
-        path = self.path_template.format(inputs=inputs)
-        path_obj = Path(path)
-        return not path_obj.exists()
+        return not path_exists(template.format(inputs=inputs))
 
     def check_after_run(self, inputs: dict, outputs: dict) -> bool:
-        path = self.path_template.format(
-            inputs=inputs, outputs=outputs)
-        path_obj = Path(path)
-        return path_obj.exists()
+        path = self._template.format(inputs=inputs, outputs=outputs)
+        # the file was just written, don't trust the snapshots
+        return path_exists_now(path)
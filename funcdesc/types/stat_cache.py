@@ -0,0 +1,121 @@
+import os
+import typing as T
+import threading
+from time import monotonic
+
+
+PathLike = T.Union[str, "os.PathLike[str]"]
+
+
+class StatCache():
+    """Cache of the file existence checks, with per-directory snapshots
+    of the entry names taken by `os.scandir`.
+
+    A snapshot is rescanned after `ttl` seconds(never when `ttl` is
+    None), or when invalidated explicitly. Changes made by other
+    processes within the ttl are not seen, so only enable the cache
+    for the directories not changed behind the guards' back, or
+    `invalidate` them after the changes.
+    """
+    def __init__(self, ttl: T.Optional[float] = 1.0) -> None:
+        self.ttl = ttl
+        # abs dir path -> (scan time, entry names)
+        self._snapshots: T.Dict[str, T.Tuple[float, T.Set[str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.scans = 0
+
+    def _scan(self, dir_path: str) -> T.Set[str]:
+        try:
+            with os.scandir(dir_path) as it:
+                names = {e.name for e in it}
+        except (FileNotFoundError, NotADirectoryError):
+            names = set()
+        with self._lock:
+            self._snapshots[dir_path] = (monotonic(), names)
+            self.scans += 1
+        return names
+
+    def _entries(self, dir_path: str) -> T.Set[str]:
+        with self._lock:
+            snapshot = self._snapshots.get(dir_path)
+            if snapshot is not None:
+                scanned, names = snapshot
+                if (self.ttl is None) or (monotonic() - scanned < self.ttl):
+                    self.hits += 1
+                    return names
+        return self._scan(dir_path)
+
+    def exists(self, path: PathLike) -> bool:
+        """If the path exists, according to the snapshot of
+        its directory. Broken symbolic links are counted as existing."""
+        dir_path, name = os.path.split(os.path.abspath(path))
+        if not name:  # the root
+            return os.path.exists(dir_path)
+        return name in self._entries(dir_path)
+
+    def refresh(self, path: PathLike) -> bool:
+        """Check the existence of the path by `os.path.lexists`(one stat
+        call), update the snapshot of its directory if it's taken."""
+        path = os.path.abspath(path)
+        exists = os.path.lexists(path)
+        dir_path, name = os.path.split(path)
+        snapshot = self._snapshots.get(dir_path)
+        if (snapshot is not None) and name:
+            with self._lock:
+                if exists:
+                    snapshot[1].add(name)
+                else:
+                    snapshot[1].discard(name)
+        return exists
+
+    def invalidate(self, path: T.Optional[PathLike] = None) -> None:
+        """Drop the snapshots of the directory of `path`, and of `path`
+        itself when it's a directory. Drop all when `path` is None."""
+        with self._lock:
+            if path is None:
+                self._snapshots.clear()
+                return
+            path = os.path.abspath(path)
+            self._snapshots.pop(path, None)
+            self._snapshots.pop(os.path.dirname(path), None)
+
+    def stats(self) -> T.Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "scans": self.scans,
+            "dirs": len(self._snapshots),
+        }
+
+
+# shared by the checkers of `InputPath` and `WriteFile`, None if disabled
+stat_cache: T.Optional[StatCache] = None
+
+
+def enable_stat_cache(ttl: T.Optional[float] = 1.0) -> StatCache:
+    """Make the path checkers use a new shared `StatCache`."""
+    global stat_cache
+    stat_cache = StatCache(ttl)
+    return stat_cache
+
+
+def disable_stat_cache() -> None:
+    global stat_cache
+    stat_cache = None
+
+
+def path_exists(path: PathLike) -> bool:
+    """`os.path.exists`, or the check of the shared cache if enabled."""
+    cache = stat_cache
+    if cache is None:
+        return os.path.exists(path)
+    return cache.exists(path)
+
+
+def path_exists_now(path: PathLike) -> bool:
+    """Check the path bypassing the snapshots, for the paths
+    just changed. The snapshot of the shared cache is updated."""
+    cache = stat_cache
+    if cache is None:
+        return os.path.exists(path)
+    return cache.refresh(path)
@@ -2,6 +2,7 @@ import typing as T
 from pathlib import Path
 
 from ..desc import Value
+from .stat_cache import path_exists
 
 
 class ValueType(object):
@@ -20,6 +21,66 @@ class ValueType(object):
         return True
 
 
+class RangeIndex():
+    """Hashed index of the allowed values of a range, with a linear
+    fallback for the unhashable ones. Built once per `Value` by the
+    `prepare_range` of the `OneOf` and `SubSet` checkers, printed as
+    the original range in the error messages."""
+    __slots__ = ("range", "_hashed", "_unhashable")
+
+    def __init__(self, range_: T.Collection) -> None:
+        self.range = range_
+        hashed, unhashable = set(), []
+        for v in range_:
+            try:
+                hashed.add(v)
+            except TypeError:
+                unhashable.append(v)
+        self._hashed = frozenset(hashed)
+        self._unhashable = unhashable
+
+    def __contains__(self, val: T.Any) -> bool:
+        try:
+            if val in self._hashed:
+                return True
+        except TypeError:  # unhashable val
+            pass
+        return any((u is val) or (u == val) for u in self._unhashable)
+
+    def missing(self, vals: T.Iterable) -> T.List[T.Any]:
+        """The elements of `vals` not in the range, in one pass."""
+        hashed, unhashable = self._hashed, self._unhashable
+        res = []
+        for v in vals:
+            try:
+                if v in hashed:
+                    continue
+            except TypeError:
+                pass
+            if not any((u is v) or (u == v) for u in unhashable):
+                res.append(v)
+        return res
+
+    def __iter__(self) -> T.Iterator:
+        return iter(self.range)
+
+    def __len__(self) -> int:
+        return len(self.range)
+
+    def __repr__(self) -> str:
+        return repr(self.range)
+
+    def __str__(self) -> str:
+        return str(self.range)
+
+
+def _prepare_range(range_: T.Any) -> T.Any:
+    # only the collections, keep the substring semantics of `str`
+    if isinstance(range_, (list, tuple, set, frozenset, dict)):
+        return RangeIndex(range_)
+    return range_
+
+
 class OneOf(ValueType):
     """Input value should be equal to at least one elements in `range`"""
     @staticmethod
@@ -28,23 +89,36 @@ class OneOf(ValueType):
 
 
 class SubSet(ValueType):
-    """Input value should be a subset of `range`"""
+    """Input value should be a subset of `range`,
+    the elements not in it are reported in the error."""
     @staticmethod
     def check_range(val, range_):
-        return all([v in range_ for v in val])
+        if isinstance(range_, RangeIndex):
+            missing = range_.missing(val)
+        else:
+            missing = [v for v in val if v not in range_]
+        if missing:
+            raise ValueError(
+                f"Elements {missing} of {val} are not in "
+                f"the valid range({range_}).")
+        return True
+
+
+OneOf.check_range.prepare_range = _prepare_range  # type: ignore
+SubSet.check_range.prepare_range = _prepare_range  # type: ignore
 
 
 class InputPath(ValueType):
     """Input value should be a file path,
-    and the file should be exist."""
+    and the file should be exist. The existence is checked through
+    the shared stat cache when it's enabled(see `enable_stat_cache`)."""
     @staticmethod
     def check_type(val, type_):
         return isinstance(val, str) or isinstance(val, Path)
 
     @staticmethod
     def check_range(val, range_):
-        path = Path(val) if isinstance(val, str) else val
-        return path.exists()
+        return path_exists(val)
 
 
 class OutputPath(ValueType):
@@ -0,0 +1,285 @@
+"""Indexed binary container for many descriptions.
+
+Layout(all integers are little-endian)::
+
+    header    MAGIC, version(u16), reserved(u16),
+              n_strings(u32), n_records(u32),
+              strings_offset(u64), index_offset(u64)
+    records   one per description, a sequence of u32:
+              name, doc, n_inputs, n_outputs, n_side_effects,
+              6 fields per value(type, range, default, name, doc, kind),
+              1 field per side effect(description)
+    strings   offsets(u32 * (n_strings + 1)) then the UTF-8 data
+    index     (name, record_offset(u64), record_size(u32)) per record,
+              sorted by name
+
+Every field of a record is an id in the string table(`NULL` for None),
+so repeated type names, docs, ranges and defaults are stored once.
+Ranges and defaults are stored as their JSON text, the file keeps
+exactly what `DescriptionJSONEncoder` keeps.
+"""
+import os
+import json
+import mmap
+import struct
+import typing as T
+
+from .json import DescriptionJSONEncoder, DescriptionJSONDecoder
+
+if T.TYPE_CHECKING:  # pragma: no cover
+    from ..desc import Description
+
+
+MAGIC = b"FDSCBIN\0"
+VERSION = 1
+NULL = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<8sHHIIQQ")
+_INDEX_ENTRY = struct.Struct("<IQI")
+_VALUE_FIELDS = ("type", "range", "default", "name", "doc", "kind")
+_JSON_FIELDS = ("range", "default")
+_NOT_CACHED = object()
+
+
+class _StringTable():
+    def __init__(self) -> None:
+        self.ids: T.Dict[str, int] = {}
+
+    def add(self, s: T.Optional[str]) -> int:
+        if s is None:
+            return NULL
+        idx = self.ids.get(s)
+        if idx is None:
+            idx = self.ids[s] = len(self.ids)
+        return idx
+
+    def to_bytes(self) -> bytes:
+        data = [s.encode("utf-8") for s in self.ids]
+        offsets = [0]
+        for d in data:
+            offsets.append(offsets[-1] + len(d))
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(data)
+
+
+def _encode_record(
+        obj: T.Dict[str, T.Any],
+        strings: _StringTable,
+        encoder: DescriptionJSONEncoder,
+        ) -> bytes:
+    fields = [
+        strings.add(obj["name"]), strings.add(obj["doc"]),
+        len(obj["inputs"]), len(obj["outputs"]), len(obj["side_effects"]),
+    ]
+    for v in obj["inputs"] + obj["outputs"]:
+        for f in _VALUE_FIELDS:
+            item = v.get(f)
+            if f in _JSON_FIELDS:
+                item = encoder.encode(item)
+            fields.append(strings.add(item))
+    for e in obj["side_effects"]:
+        fields.append(strings.add(e["description"]))
+    return struct.pack(f"<{len(fields)}I", *fields)
+
+
+def dump_binary(
+        descs: T.Iterable["Description"],
+        path: T.Union[str, os.PathLike],
+        ) -> int:
+    """Write the descriptions to an indexed binary registry file,
+    return the number of written descriptions.
+    The names of the descriptions should be unique strings."""
+    encoder = DescriptionJSONEncoder()
+    strings = _StringTable()
+    records: T.List[bytes] = []
+    names: T.Dict[str, int] = {}
+    for desc in descs:
+        if not isinstance(desc.name, str):
+            raise ValueError(f"Description name should be str: {desc}")
+        if desc.name in names:
+            raise ValueError(f"Duplicated description name: {desc.name}")
+        names[desc.name] = len(records)
+        records.append(_encode_record(encoder.default(desc), strings, encoder))
+
+    offset = _HEADER.size
+    index = []
+    for name in sorted(names):
+        rec = records[names[name]]
+        index.append((strings.add(name), rec))
+    string_bytes = strings.to_bytes()
+    with open(path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        entries = []
+        for name_id, rec in index:
+            entries.append(_INDEX_ENTRY.pack(name_id, offset, len(rec)))
+            f.write(rec)
+            offset += len(rec)
+        strings_offset = offset
+        f.write(string_bytes)
+        index_offset = strings_offset + len(string_bytes)
+        f.write(b"".join(entries))
+        f.seek(0)
+        f.write(_HEADER.pack(
+            MAGIC, VERSION, 0, len(strings.ids), len(records),
+            strings_offset, index_offset))
+    return len(records)
+
+
+class BinaryRegistry():
+    """Read-only, memory-mapped view of a binary registry file.
+
+    Opening the file only reads the header, looking up a description
+    by name binary searches the index and decodes only its record.
+    The mapped pages are shared by all processes opening the file.
+    """
+    def __init__(
+            self,
+            path: T.Union[str, os.PathLike],
+            env: T.Optional[T.Dict[str, T.Any]] = None,
+            ) -> None:
+        self.path = path
+        self.env = env
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Not a binary registry file: {path}")
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise ValueError(f"Not a binary registry file: {path}")
+            (magic, version, _, self._n_strings, self._n_records,
+             self._strings_offset, self._index_offset) = \
+                _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Not a binary registry file: {path}")
+            if version != VERSION:
+                raise ValueError(
+                    f"Unsupported registry file version: {version}")
+        except BaseException:
+            self.close()
+            raise
+        self._data_offset = self._strings_offset + 4 * (self._n_strings + 1)
+        self._strings: T.Dict[int, str] = {}
+        self._json_values: T.Dict[int, T.Any] = {}
+        self._decoder = DescriptionJSONDecoder()
+
+    def _string(self, idx: int) -> T.Optional[str]:
+        if idx == NULL:
+            return None
+        s = self._strings.get(idx)
+        if s is None:
+            start, end = struct.unpack_from(
+                "<2I", self._mm, self._strings_offset + 4 * idx)
+            s = self._strings[idx] = self._mm[
+                self._data_offset + start: self._data_offset + end
+            ].decode("utf-8")
+        return s
+
+    def _json_value(self, idx: int) -> T.Any:
+        """Decode a JSON field, the results are cached. Containers of
+        immutable items(e.g. the ranges) are shallow copied from the
+        cache, nested ones are decoded every time to not share them."""
+        cached = self._json_values.get(idx, _NOT_CACHED)
+        if cached is not _NOT_CACHED:
+            return cached.copy() if isinstance(cached, (list, dict)) \
+                else cached
+        res = json.loads(T.cast(str, self._string(idx)))
+        items = res.values() if isinstance(res, dict) else \
+            res if isinstance(res, list) else ()
+        if not any(isinstance(i, (list, dict)) for i in items):
+            self._json_values[idx] = res
+            if isinstance(res, (list, dict)):
+                return res.copy()
+        return res
+
+    def _index_entry(self, pos: int) -> T.Tuple[int, int, int]:
+        return _INDEX_ENTRY.unpack_from(
+            self._mm, self._index_offset + pos * _INDEX_ENTRY.size)
+
+    def _find(self, name: str) -> T.Optional[T.Tuple[int, int]]:
+        low, high = 0, self._n_records
+        while low < high:
+            mid = (low + high) // 2
+            name_id, offset, size = self._index_entry(mid)
+            mid_name = T.cast(str, self._string(name_id))
+            if mid_name == name:
+                return offset, size
+            elif mid_name < name:
+                low = mid + 1
+            else:
+                high = mid
+        return None
+
+    def _decode_record(self, offset: int, size: int) -> "Description":
+        fields = struct.unpack_from(f"<{size // 4}I", self._mm, offset)
+        string = self._string
+        json_value = self._json_value
+        n_inputs, n_outputs = fields[2], fields[3]
+        values = []
+        pos = 5
+        for _ in range(n_inputs + n_outputs):
+            type_, range_, default, name, doc, kind = fields[pos: pos + 6]
+            v = {
+                "type": string(type_),
+                "range": json_value(range_),
+                "default": json_value(default),
+                "name": string(name),
+                "doc": string(doc),
+            }
+            if kind != NULL:
+                v["kind"] = string(kind)
+            values.append(v)
+            pos += 6
+        jdict = {
+            "name": string(fields[0]),
+            "doc": string(fields[1]),
+            "inputs": values[:n_inputs],
+            "outputs": values[n_inputs:],
+            "side_effects": [
+                {"description": string(idx)} for idx in fields[pos:]
+            ],
+        }
+        return self._decoder.decode_dict(jdict, self.env)
+
+    def get(
+            self, name: str,
+            default: T.Optional["Description"] = None,
+            ) -> T.Optional["Description"]:
+        loc = self._find(name)
+        if loc is None:
+            return default
+        return self._decode_record(*loc)
+
+    def __getitem__(self, name: str) -> "Description":
+        loc = self._find(name)
+        if loc is None:
+            raise KeyError(name)
+        return self._decode_record(*loc)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and (self._find(name) is not None)
+
+    def __len__(self) -> int:
+        return self._n_records
+
+    def names(self) -> T.Iterator[str]:
+        """The names of the descriptions, in sorted order."""
+        for pos in range(self._n_records):
+            yield T.cast(str, self._string(self._index_entry(pos)[0]))
+
+    def __iter__(self) -> T.Iterator["Description"]:
+        for pos in range(self._n_records):
+            _, offset, size = self._index_entry(pos)
+            yield self._decode_record(offset, size)
+
+    def close(self) -> None:
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "BinaryRegistry":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,43 @@
+import enum
+import hashlib
+import typing as T
+
+
+def canonical(obj: T.Any) -> str:
+    """Encode an object as a string which is the same across processes
+    for structurally equal objects. Classes are encoded by their
+    qualified names; unknown objects by their `repr`, so objects with
+    the default `repr` (containing the address) are not stable."""
+    if isinstance(obj, enum.Enum):
+        return f"enum:{_qualname(type(obj))}.{obj.name}"
+    if (obj is None) or isinstance(obj, (bool, int, float, str, bytes)):
+        return f"{type(obj).__name__}:{obj!r}"
+    if isinstance(obj, (list, tuple)):
+        items = ",".join(canonical(x) for x in obj)
+        return f"{type(obj).__name__}({items})"
+    if isinstance(obj, dict):
+        items = ",".join(sorted(
+            f"{canonical(k)}={canonical(v)}" for k, v in obj.items()))
+        return f"dict({items})"
+    if isinstance(obj, (set, frozenset)):
+        items = ",".join(sorted(canonical(x) for x in obj))
+        return f"{type(obj).__name__}({items})"
+    if isinstance(obj, type) and (T.get_origin(obj) is None):
+        return f"type:{_qualname(obj)}"
+    if (T.get_origin(obj) is not None) or \
+            (type(obj).__module__ in ("typing", "types")):
+        return f"typing:{obj!r}"
+    return f"{_qualname(type(obj))}:{obj!r}"
+
+
+def _qualname(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def digest(*parts: str) -> str:
+    """Hex digest of the parts, used as the fingerprint."""
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        h.update(p.encode("utf-8", "surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
@@ -1,7 +1,11 @@
+import os
 import types
 import typing as T
 import warnings
 import json
+import contextlib
+
+from .type_expr import resolve_type
 
 if T.TYPE_CHECKING:  # pragma: no cover
     from ..desc import Value, SideEffect, Description
@@ -33,13 +37,16 @@ class DescriptionJSONEncoder(json.JSONEncoder):
                 t = str(o.type)
             else:
                 t = o.type.__name__
-            return {
+            res = {
                 "type": t,
                 "range": o.range,
                 "default": o.default,
                 "name": o.name,
                 "doc": o.doc,
             }
+            if o.kind is not None:
+                res["kind"] = o.kind.name
+            return res
         elif isinstance(o, _NotDef):
             return "not_defined"
         elif isinstance(o, SideEffect):
@@ -57,7 +64,7 @@ class DescriptionJSONDecoder(json.JSONDecoder):
             env: T.Optional[T.Dict[str, T.Any]] = None
             ) -> "Value":
         from ..desc import Value, NotDef
-        import typing
+        import inspect
 
         # fill the missing values with default values
         v['type'] = v.get('type', None)
@@ -66,13 +73,12 @@ class DescriptionJSONDecoder(json.JSONDecoder):
         v['name'] = v.get('name', None)
         v['doc'] = v.get('doc', None)
 
-        if env is not None:
-            env["typing"] = typing
-
         if isinstance(v["type"], str):
             try:
-                t = eval(v["type"], env)
-            except NameError:
+                t = resolve_type(v["type"], env)
+            except (NameError, ValueError, TypeError, IndexError, KeyError):
+                # invalid subscriptions raise the last ones, e.g.
+                # `int[str]` or an alias with a wrong number of arguments
                 warnings.warn(
                     f"Failed to eval type {v['type']}, "
                     "using the original string as type."
@@ -87,12 +93,14 @@ class DescriptionJSONDecoder(json.JSONDecoder):
             d = NotDef
         else:
             d = v["default"]
+        kind = v.get("kind")
         value = Value(
             type_=t,
             range_=r,
             default=d,
             name=v["name"],
             doc=v["doc"],
+            kind=None if kind is None else inspect._ParameterKind[kind],
         )
         return value
 
@@ -106,8 +114,16 @@ class DescriptionJSONDecoder(json.JSONDecoder):
             s: str,
             env: T.Optional[T.Dict[str, T.Any]] = None
             ) -> "Description":
-        from ..desc import Description
         jdict = super().decode(s)
+        return self.decode_dict(jdict, env)
+
+    def decode_dict(
+            self,
+            jdict: T.Dict[str, T.Any],
+            env: T.Optional[T.Dict[str, T.Any]] = None
+            ) -> "Description":
+        """Create the Description from a decoded JSON object."""
+        from ..desc import Description
         desc = Description()
         desc.name = jdict["name"]
         desc.doc = jdict.get("doc", "")
@@ -124,3 +140,72 @@ class DescriptionJSONDecoder(json.JSONDecoder):
 
     def decode(self, *args, **kwargs) -> T.Any:
         return self.decode_description(*args, **kwargs)
+
+
+PathOrFile = T.Union[str, os.PathLike, T.IO[str]]
+
+
+@contextlib.contextmanager
+def _open(path_or_file: PathOrFile, mode: str) -> T.Iterator[T.IO[str]]:
+    if isinstance(path_or_file, (str, os.PathLike)):
+        with open(path_or_file, mode, encoding="utf-8") as f:
+            yield f
+    else:
+        yield path_or_file
+
+
+def dump_jsonl(
+        descs: T.Iterable["Description"],
+        path_or_file: PathOrFile,
+        ) -> int:
+    """Write the descriptions to a JSON Lines file, one description
+    per line, and return the number of written descriptions.
+
+    The descriptions are encoded one by one, so `descs` can be
+    a lazy iterable of any size."""
+    encoder = DescriptionJSONEncoder()
+    n = 0
+    with _open(path_or_file, "w") as f:
+        for desc in descs:
+            obj = encoder.default(desc)
+            # "name" goes first, for filtering lines without decoding them
+            line = encoder.encode({"name": obj.pop("name"), **obj})
+            f.write(line + "\n")
+            n += 1
+    return n
+
+
+_NAME_PREFIX = '{"name": '
+_raw_decoder = json.JSONDecoder()
+
+
+def _line_name(line: str) -> T.Any:
+    """Get the name of the description in a line,
+    only decode the whole line when it doesn't start with the name."""
+    if line.startswith(_NAME_PREFIX):
+        try:
+            name, _ = _raw_decoder.raw_decode(line, len(_NAME_PREFIX))
+            return name
+        except ValueError:  # pragma: no cover
+            pass
+    return json.loads(line).get("name")
+
+
+def iter_jsonl(
+        path_or_file: PathOrFile,
+        names: T.Optional[T.Container[str]] = None,
+        env: T.Optional[T.Dict[str, T.Any]] = None,
+        ) -> T.Iterator["Description"]:
+    """Lazily read the descriptions of a JSON Lines file.
+
+    When `names` is given, only the descriptions with these names are
+    decoded, the other lines are skipped after reading their name."""
+    decoder = DescriptionJSONDecoder()
+    with _open(path_or_file, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if (names is not None) and (_line_name(line) not in names):
+                continue
+            yield decoder.decode(line, env=env)
@@ -0,0 +1,105 @@
+import ast
+import builtins
+import functools
+import typing
+import typing as T
+
+
+NoneType = type(None)
+
+# only the classes of builtins are resolvable, not functions like `eval`
+_BUILTIN_TYPES: T.Dict[str, T.Any] = {
+    k: v for k, v in vars(builtins).items() if isinstance(v, type)
+}
+_BUILTIN_TYPES["NoneType"] = NoneType
+_BUILTIN_TYPES["typing"] = typing
+
+_TYPING_NAMES: T.Dict[str, T.Any] = {
+    k: getattr(typing, k) for k in typing.__all__ if hasattr(typing, k)
+}
+
+
+def _lookup(name: str, env: T.Optional[T.Mapping[str, T.Any]]) -> T.Any:
+    if (env is not None) and (name in env):
+        return env[name]
+    if name in _BUILTIN_TYPES:
+        return _BUILTIN_TYPES[name]
+    if name in _TYPING_NAMES:
+        return _TYPING_NAMES[name]
+    raise NameError(f"name '{name}' is not defined")
+
+
+def _union(left: T.Any, right: T.Any) -> T.Any:
+    try:
+        return left | right
+    except TypeError:  # PEP 604 unions are not supported(python < 3.10)
+        return T.Union[left, right]
+
+
+def _evaluate(node: ast.AST, env: T.Optional[T.Mapping[str, T.Any]]) -> T.Any:
+    if isinstance(node, ast.Constant):
+        return node.value
+    elif isinstance(node, ast.Name):
+        return _lookup(node.id, env)
+    elif isinstance(node, ast.Attribute):
+        if node.attr.startswith("_"):
+            raise ValueError(f"Private attribute is not allowed: {node.attr}")
+        base = _evaluate(node.value, env)
+        try:
+            return getattr(base, node.attr)
+        except AttributeError:
+            raise NameError(f"name '{node.attr}' is not defined")
+    elif isinstance(node, ast.Subscript):
+        base = _evaluate(node.value, env)
+        return base[_evaluate(node.slice, env)]
+    elif isinstance(node, ast.Tuple):
+        return tuple(_evaluate(e, env) for e in node.elts)
+    elif isinstance(node, ast.List):
+        return [_evaluate(e, env) for e in node.elts]
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        return _union(_evaluate(node.left, env), _evaluate(node.right, env))
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) \
+            and isinstance(node.operand, ast.Constant) \
+            and isinstance(node.operand.value, (int, float)):
+        return -node.operand.value  # e.g. Literal[-1]
+    raise ValueError(f"Unsupported type expression: {ast.dump(node)}")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse(expr: str) -> T.Tuple[ast.AST, T.FrozenSet[str]]:
+    """Parse the expression, return the AST and the names used in it."""
+    try:
+        tree = ast.parse(expr.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid type expression: {expr}") from e
+    names = frozenset(
+        n.id for n in ast.walk(tree) if isinstance(n, ast.Name))
+    return tree, names
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_cached(expr: str) -> T.Any:
+    tree, _ = _parse(expr)
+    return _evaluate(tree, None)
+
+
+def resolve_type(
+        expr: str,
+        env: T.Optional[T.Mapping[str, T.Any]] = None,
+        ) -> T.Any:
+    """Resolve a type expression string without `eval`.
+
+    Supported are the builtin classes, `NoneType`, the `typing` names
+    (`typing.List[int]`, `Optional[str]`, `Literal["a", 1]` ...),
+    PEP 604 unions (`int | str`) and names(and their public
+    attributes) supplied by `env`, which take precedence.
+    Raise NameError for unknown names and ValueError for
+    invalid or unsupported expressions.
+
+    Results that don't depend on `env` are cached.
+    """
+    if env:
+        tree, names = _parse(expr)
+        if any(n in env for n in names):
+            return _evaluate(tree, env)
+    return _resolve_cached(expr)
@@ -0,0 +1,187 @@
+"""Compile typing constructs(`List[int]`, `Dict[str, float]`,
+`Optional[int]`, `Union[...]`, `Literal[...]` ...) into checker closures."""
+import typing as T
+import types
+import random
+import itertools
+import collections.abc as abc
+
+
+NoneType = type(None)
+Check = T.Callable[[T.Any], bool]
+Lookup = T.Callable[[type], T.Optional[T.Callable[[T.Any, T.Any], bool]]]
+
+_UNION_TYPES: T.Tuple[T.Any, ...] = (T.Union,)
+if hasattr(types, "UnionType"):  # python >= 3.10
+    _UNION_TYPES += (types.UnionType,)  # type: ignore
+
+_SEQUENCE_ORIGINS = (
+    list, set, frozenset, abc.Sequence, abc.MutableSequence,
+    abc.Set, abc.MutableSet, abc.Collection,
+)
+_MAPPING_ORIGINS = (dict, abc.Mapping, abc.MutableMapping)
+
+
+class ContainerStrategy():
+    """Which elements of a container are checked.
+
+    * "full": all elements.
+    * "first": the first `k` elements.
+    * "sample": `k` randomly chosen elements, for the containers
+      without indexing(sets, mappings) the first `k` elements.
+    """
+    MODES = ("full", "first", "sample")
+
+    def __init__(
+            self, mode: str = "full", k: int = 100,
+            seed: T.Optional[int] = None) -> None:
+        if mode not in self.MODES:
+            raise ValueError(
+                f"mode should be one of {self.MODES}, got {mode!r}")
+        if k < 1:
+            raise ValueError(f"k should be a positive integer, got {k}")
+        self.mode = mode
+        self.k = k
+        self._random = random.Random(seed)
+
+    def select(self, container: T.Iterable) -> T.Iterable:
+        """The elements of the container to check."""
+        if self.mode == "full":
+            return container
+        if (self.mode == "sample") and isinstance(container, abc.Sequence):
+            n = len(container)
+            if n <= self.k:
+                return container
+            indexes = self._random.sample(range(n), self.k)
+            return [container[i] for i in indexes]
+        return itertools.islice(container, self.k)
+
+    def __repr__(self) -> str:
+        if self.mode == "full":
+            return "ContainerStrategy('full')"
+        return f"ContainerStrategy({self.mode!r}, k={self.k})"
+
+
+FULL = ContainerStrategy("full")
+
+
+def _class_check(cls: type, lookup: Lookup) -> T.Optional[Check]:
+    if cls is object:
+        return None
+    checker = lookup(cls)
+    if checker is not None:
+        return lambda v: checker(v, cls)
+    try:
+        isinstance(None, cls)
+    except TypeError:  # e.g. not runtime checkable protocols
+        return None
+    return lambda v: isinstance(v, cls)
+
+
+def _elements_check(
+        origin: T.Any, elem: T.Optional[Check],
+        strategy: ContainerStrategy) -> Check:
+    if elem is None:
+        return lambda v: isinstance(v, origin)
+    if strategy.mode == "full":
+        return lambda v: isinstance(v, origin) and all(map(elem, v))
+    select = strategy.select
+    return lambda v: isinstance(v, origin) and all(map(elem, select(v)))
+
+
+def _mapping_check(
+        origin: T.Any, key: T.Optional[Check], value: T.Optional[Check],
+        strategy: ContainerStrategy) -> Check:
+    if (key is None) and (value is None):
+        return lambda v: isinstance(v, origin)
+    key = key or (lambda k: True)
+    value = value or (lambda v: True)
+    select = strategy.select
+
+    def check(v: T.Any) -> bool:
+        if not isinstance(v, origin):
+            return False
+        for k, x in select(v.items()):
+            if not (key(k) and value(x)):
+                return False
+        return True
+    return check
+
+
+def _tuple_check(
+        args: T.Tuple[T.Any, ...], strategy: ContainerStrategy,
+        lookup: Lookup) -> Check:
+    if (len(args) == 2) and (args[1] is Ellipsis):
+        return _elements_check(
+            tuple, compile_check(args[0], strategy, lookup), strategy)
+    if args == ((),):  # Tuple[()]
+        args = ()
+    items = [compile_check(a, strategy, lookup) for a in args]
+    n = len(items)
+
+    def check(v: T.Any) -> bool:
+        if not (isinstance(v, tuple) and len(v) == n):
+            return False
+        return all(c(x) for c, x in zip(items, v) if c is not None)
+    return check
+
+
+def compile_check(
+        type_: T.Any,
+        strategy: ContainerStrategy = FULL,
+        lookup: T.Optional[Lookup] = None,
+        ) -> T.Optional[Check]:
+    """Compile the type into a one-argument check function,
+    return None when any value is accepted(or the type is unknown).
+
+    `lookup` gives the registered type checker of a class, classes
+    without registered checkers are checked by `isinstance`.
+    Elements of the containers are selected by `strategy`.
+    """
+    lookup = lookup or (lambda cls: None)
+    if (type_ is T.Any) or isinstance(type_, (str, T.TypeVar, T.ForwardRef)):
+        return None
+    if (type_ is None) or (type_ is NoneType):
+        return lambda v: v is None
+    origin = T.get_origin(type_)
+    args = T.get_args(type_)
+    if origin is None:
+        supertype = getattr(type_, "__supertype__", None)  # NewType
+        if supertype is not None:
+            return compile_check(supertype, strategy, lookup)
+        if isinstance(type_, type):
+            return _class_check(type_, lookup)
+        return None
+    if origin in _UNION_TYPES:
+        checks = [compile_check(a, strategy, lookup) for a in args]
+        if any(c is None for c in checks):
+            return None
+        return lambda v: any(c(v) for c in checks)  # type: ignore
+    if origin is T.Literal:
+        literals = args
+        return lambda v: any(
+            (v == x) and (type(v) is type(x)) for x in literals)
+    if origin is T.Annotated:
+        return compile_check(args[0], strategy, lookup)
+    if origin is tuple:
+        if not args:
+            return lambda v: isinstance(v, tuple)
+        return _tuple_check(args, strategy, lookup)
+    if origin in _MAPPING_ORIGINS:
+        key, value = (
+            [compile_check(a, strategy, lookup) for a in args]
+            if args else (None, None))
+        return _mapping_check(origin, key, value, strategy)
+    if origin in _SEQUENCE_ORIGINS:
+        elem = compile_check(args[0], strategy, lookup) if args else None
+        return _elements_check(origin, elem, strategy)
+    if isinstance(origin, type):
+        return lambda v: isinstance(v, origin)
+    return None
+
+
+def is_typing_construct(type_: T.Any) -> bool:
+    """Whether the type is a parameterized generic, a union, a literal
+    etc. which has no registered checkers."""
+    return (T.get_origin(type_) is not None) or \
+        (getattr(type_, "__supertype__", None) is not None)
@@ -0,0 +1,78 @@
+import asyncio
+import inspect
+import sys
+
+import pytest
+
+from funcdesc.mark import Val, mark_side_effect
+from funcdesc.desc import SideEffect
+from funcdesc.guard import make_guard, AsyncGuard, CheckError
+
+
+class AsyncEffect(SideEffect):
+    def __init__(self, ok_before: bool = True, ok_after: bool = True):
+        super().__init__("async effect")
+        self.ok_before = ok_before
+        self.ok_after = ok_after
+        self.calls = []
+
+    async def check_before_run(self, inputs):
+        await asyncio.sleep(0)
+        self.calls.append(("before", inputs["a"]))
+        return self.ok_before
+
+    async def check_after_run(self, inputs, outputs):
+        await asyncio.sleep(0)
+        self.calls.append(("after", outputs[0]))
+        return self.ok_after
+
+
+def test_async_guard(monkeypatch):
+    @make_guard
+    async def add(a: Val[int, [0, 10]], b: int = 1) -> Val[int, [0, 10]]:
+        await asyncio.sleep(0)
+        return a + b
+
+    assert isinstance(add, AsyncGuard)
+    if sys.version_info >= (3, 12):
+        assert inspect.iscoroutinefunction(add)
+    assert asyncio.run(add(1)) == 2
+    with pytest.raises(CheckError):
+        asyncio.run(add(-1))
+    # outputs are checked on the awaited value
+    with pytest.raises(CheckError):
+        asyncio.run(add(10))
+
+    # without policy and metrics the calls are not timed
+    import funcdesc.guard
+
+    def no_timing():
+        raise AssertionError("timed")
+
+    with monkeypatch.context() as m:
+        m.setattr(funcdesc.guard, "perf_counter", no_timing)
+        assert asyncio.run(add(2)) == 3
+        add.desc.inputs[0].range = [0, 1]
+        with pytest.raises(CheckError):
+            asyncio.run(add(2))
+        add.desc.inputs[0].range = [0, 10]
+
+    res = asyncio.run(add.map([(1,), (20,), (10,)]))
+    assert res.results == [2, None, None]
+    assert sorted(res.errors) == [1, 2]
+
+
+def test_async_side_effects():
+    effect = AsyncEffect()
+
+    @make_guard(check_side_effect=True)
+    @mark_side_effect(effect)
+    @mark_side_effect(SideEffect("sync effect"))
+    async def func(a: int) -> int:
+        return a
+
+    assert asyncio.run(func(1)) == 1
+    assert effect.calls == [("before", 1), ("after", 1)]
+    effect.ok_after = False
+    with pytest.raises(CheckError):
+        asyncio.run(func(1))
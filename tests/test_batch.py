@@ -0,0 +1,108 @@
+import pytest
+
+from funcdesc.mark import Val, mark_side_effect
+from funcdesc.desc import SideEffect
+from funcdesc.guard import make_guard
+from funcdesc.types import OneOf
+
+
+@make_guard
+def func(
+        a: Val[int, [0, 10]],
+        b: Val[float, [0, 1]] = 0.5,
+        c: Val[OneOf, ["x", "y"]] = "x") -> Val[int, [0, 5]]:
+    return a
+
+
+@pytest.mark.parametrize("vectorize", [True, False])
+def test_check_batch(vectorize):
+    errors = func.check_batch(
+        [(1,), (11, 0.2), ("s", 2.0, "z"), (), {"a": 3, "b": 1}],
+        vectorize=vectorize)
+    assert sorted(errors) == [1, 2, 3, 4]
+    assert [type(e) for e in errors[1]] == [ValueError]
+    assert [type(e) for e in errors[2]] == [TypeError, ValueError, ValueError]
+    assert [type(e) for e in errors[3]] == [TypeError]
+    assert [type(e) for e in errors[4]] == [TypeError]
+
+    errors = func.check_batch(
+        {"a": [1, 20, 3], "b": [0.1, 0.2, float("nan")]},
+        vectorize=vectorize)
+    assert sorted(errors) == [1, 2]
+    with pytest.raises(ValueError):
+        func.check_batch({"a": [1, 2], "b": [0.1]})
+    errors = func.check_batch({"b": [0.1, 0.2]})
+    assert sorted(errors) == [0, 1]
+
+
+@pytest.mark.parametrize("vectorize", [True, False])
+def test_check_batch_range_edits(vectorize):
+    @make_guard
+    def pick(a: Val[int, [0, 10]], c: Val[OneOf, ["x", "y"]]) -> int:
+        return a
+
+    rows = {"a": [1, 5, 9], "c": ["x", "z", "y"]}
+    assert sorted(pick.check_batch(rows, vectorize=vectorize)) == [1]
+    # the edits made in place are seen by both kinds of checks
+    pick.desc.inputs[0].range[1] = 6
+    pick.desc.inputs[1].range.append("z")
+    assert sorted(pick.check_batch(rows, vectorize=vectorize)) == [2]
+    assert pick(5, "z") == 5
+
+
+def test_map():
+    res = func.map([(1,), (20,), (7,), {"a": 2, "c": "y"}])
+    assert res.results == [1, None, None, 2]
+    assert sorted(res.errors) == [1, 2]
+    # output is out of range
+    assert isinstance(res.errors[2][0], ValueError)
+    assert res.valid_rows == [0, 3]
+
+    @make_guard(check_side_effect=True)
+    @mark_side_effect(SideEffect("nothing"))
+    def add(*args: int) -> int:
+        return sum(args)
+
+    res = add.map([(1, 2), (1, "2"), ()])
+    assert res.results == [3, None, 0]
+    assert list(res.errors) == [1]
+
+
+def test_map_keeps_function_errors():
+    @make_guard
+    def inv(a: int) -> float:
+        return 1 / a
+
+    res = inv.map([(1,), (0,), (2,)])
+    assert res.results == [1.0, None, 0.5]
+    assert list(res.errors) == [1]
+    assert isinstance(res.errors[1][0], ZeroDivisionError)
+
+
+def test_vectorized_range_is_exact():
+    np = pytest.importorskip("numpy")
+    big = 2 ** 53
+
+    @make_guard
+    def f(a: Val[int, [0, big]]) -> int:
+        return a
+
+    @make_guard
+    def g(a: Val[float, [0.0, float(big)]]) -> float:
+        return a
+
+    rows = {"a": [big, big + 1, 0]}
+    for vectorize in (True, False):
+        assert sorted(f.check_batch(rows, vectorize=vectorize)) == [1]
+        assert sorted(g.check_batch(
+            {"a": np.array([0.5, float(big), -1.0])},
+            vectorize=vectorize)) == [2]
+
+    @make_guard
+    def h(a: Val[int, [0, float(big)]]) -> int:
+        return a
+
+    # float bounds with int values
+    for vectorize in (True, False):
+        assert sorted(h.check_batch(
+            {"a": [big + 1, 2, -1]}, vectorize=vectorize)) == [0, 2]
@@ -0,0 +1,146 @@
+import subprocess
+import sys
+
+from funcdesc.desc import Pending
+from funcdesc.mark import Val, mark_input
+from funcdesc.parse import parse_func, parse_cache
+from funcdesc.disk_cache import (
+    DiskCache, source_key, enable_disk_cache, disable_disk_cache)
+
+
+def func(a: Val[int, [0, 10]], b: str = "x") -> int:
+    """The func."""
+    return a
+
+
+def test_disk_cache(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = DiskCache(path)
+    desc = cache.get(func)
+    assert desc.frozen and desc == parse_func(func)
+    assert cache.get(func) == desc
+    assert cache.stats() == {
+        "hits": 1, "misses": 1, "stale": 0, "unloadable": 0,
+        "unpicklable": 0, "size": 1}
+    # another process(a new instance) reads the stored entry
+    cache2 = DiskCache(path)
+    assert cache2.get(func) == desc
+    assert cache2.get(func, update_by_docstring=True) == desc
+    assert cache2.stats()["hits"] == 1 and cache2.stats()["size"] == 2
+    # the stored docs are computed, lazy_docstring shares the entry
+    lazy = cache2.get(func, lazy_docstring=True)
+    assert cache2.stats()["hits"] == 2 and lazy == desc
+    assert not isinstance(lazy.inputs[0]._doc, Pending)
+    # an unchanged function whose entry can't be loaded is not stale
+    cache2._connect().execute("UPDATE descriptions SET data = x'00'")
+    assert cache2.get(func) == desc
+    assert cache2.stats()["unloadable"] == 1
+    assert cache2.stats()["stale"] == 0
+    assert cache2.get(func) == desc
+    assert cache2.stats()["hits"] == 3
+
+    def local(a: int):
+        pass
+
+    key = source_key(local)
+    assert cache.get(local).inputs[0].range is None
+    mark_input("a", range=[0, 1])(local)
+    assert source_key(local) != key
+    assert cache.get(local).inputs[0].range == [0, 1]
+    assert cache.stats()["stale"] == 1
+
+    def unpicklable(a: int = lambda: 1):  # noqa: E731
+        pass
+
+    cache.get(unpicklable)
+    assert cache.stats()["unpicklable"] == 1
+    cache.clear()
+    assert len(cache) == 0
+    cache.close()
+    cache2.close()
+
+
+def test_disk_cache_processes(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    code = (
+        "import sys\n"
+        "from funcdesc.disk_cache import DiskCache\n"
+        "from funcdesc import guard, parse, desc\n"
+        "cache = DiskCache(sys.argv[1])\n"
+        "for mod in (guard, parse, desc):\n"
+        "    for f in vars(mod).values():\n"
+        "        if callable(f) and getattr(f, '__module__', '') == "
+        "mod.__name__ and not isinstance(f, type):\n"
+        "            cache.get(f)\n"
+        "print(cache.stats()['hits'])\n"
+    )
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", code, str(path)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    for p in procs:
+        out, err = p.communicate(timeout=60)
+        assert p.returncode == 0, err
+    out = subprocess.run(
+        [sys.executable, "-c", code, str(path)],
+        capture_output=True, text=True, check=True).stdout
+    assert int(out) == len(DiskCache(path))
+
+
+def test_parse_cache_persistent(tmp_path):
+    parse_cache.clear()
+    cache = enable_disk_cache(tmp_path / "cache.sqlite")
+    try:
+        desc = parse_func(func, cache=True)
+        assert parse_func(func, cache=True) is desc
+        assert cache.stats()["misses"] == 1
+        parse_cache.clear()
+        assert parse_func(func, cache=True) == desc
+        assert cache.stats()["hits"] == 1
+    finally:
+        disable_disk_cache()
+        parse_cache.clear()
+
+
+def test_source_key_per_function(tmp_path, monkeypatch):
+    import importlib
+    import os
+
+    mod_path = tmp_path / "cached_mod.py"
+    template = (
+        "{header}"
+        "def f1(a: int = 1) -> int:\n"
+        "    '''The first.'''\n"
+        "    return a\n"
+        "\n"
+        "def f2(b: str) -> str:\n"
+        "    return {body}\n"
+    )
+    mod_path.write_text(template.format(header="", body="b"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    mod = importlib.import_module("cached_mod")
+    key1, key2 = source_key(mod.f1), source_key(mod.f2)
+    cache = DiskCache(tmp_path / "cache.sqlite")
+    cache.get(mod.f1)
+    cache.get(mod.f2)
+
+    # edit f2 and move both functions down
+    mod_path.write_text(template.format(header="X = 1\n\n", body="b * 2"))
+    os.utime(mod_path, ns=(0, 10 ** 9))
+    importlib.invalidate_caches()
+    mod = importlib.reload(mod)
+    assert source_key(mod.f1) == key1
+    assert source_key(mod.f2) != key2
+    cache.get(mod.f1)
+    cache.get(mod.f2)
+    assert cache.stats()["hits"] == 1 and cache.stats()["stale"] == 1
+
+    # the docstring is in the source lines of the function
+    mod_path.write_text(
+        template.format(header="", body="b").replace("first", "1st"))
+    os.utime(mod_path, ns=(0, 2 * 10 ** 9))
+    mod = importlib.reload(mod)
+    assert source_key(mod.f1) != key1
+    cache.close()
@@ -39,3 +39,42 @@ def test_docstring():
     assert desc.inputs[1].doc == "The second argument."
     assert desc.outputs[0].doc is None
     assert desc.outputs[0].type == int
+
+
+def test_docstring_by_name_and_lazy():
+    import pickle
+    from funcdesc.desc import Pending
+    from funcdesc.parse import parse_docstring
+
+    def func(a, b, *args, c: str = "x"):
+        """
+        Args:
+            c: The option.
+            b (float): The second argument.
+            *args (int): The rest.
+
+        Returns:
+            list: The results.
+        """
+
+    desc = parse_func(func, update_by_docstring=True)
+    a, b, args, c = desc.inputs
+    assert (a.doc, a.type) == (None, None)
+    assert (b.doc, b.type) == ("The second argument.", float)
+    assert (args.doc, args.type) == ("The rest.", int)
+    assert (c.doc, c.type) == ("The option.", str)
+    assert desc.outputs[0].type is list
+
+    parse_docstring.cache_clear()
+    lazy = parse_func(func, update_by_docstring=True, lazy_docstring=True)
+    assert isinstance(lazy.inputs[1]._doc, Pending)
+    assert parse_docstring.cache_info().misses == 0
+    assert lazy.inputs[1].type is float
+    assert parse_docstring.cache_info().misses == 1
+    assert lazy == desc
+    assert pickle.loads(pickle.dumps(lazy)) == desc
+
+    frozen = parse_func(
+        func, update_by_docstring=True, lazy_docstring=True, cache=True)
+    assert frozen.frozen and frozen.outputs[0].doc == "The results."
+    assert parse_docstring.cache_info().hits >= 1
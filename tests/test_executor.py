@@ -0,0 +1,126 @@
+import os
+
+import pytest
+
+from funcdesc.mark import Val, Outputs, mark_side_effect
+from funcdesc.desc import SideEffect
+from funcdesc.guard import make_guard
+from funcdesc.errors import CheckError
+from funcdesc.executor import GuardExecutor, SharedArray
+
+np = pytest.importorskip("numpy")
+
+
+@make_guard
+def add(a: Val[int, [0, 10]], b: int = 1) -> Val[int, [0, 15]]:
+    return a + b
+
+
+def scale(arr: np.ndarray, k: float) -> np.ndarray:
+    return arr * k
+
+
+def split(arr: np.ndarray) -> Outputs[np.ndarray, np.ndarray]:
+    return arr[:2], arr[2:]
+
+
+def fail(a: int) -> int:
+    raise RuntimeError("failed in the worker")
+
+
+def inverse(a: int) -> float:
+    return 1 / a
+
+
+class Positive(SideEffect):
+    def __init__(self):
+        super().__init__("a is positive")
+
+    def check_before_run(self, inputs: dict) -> bool:
+        return inputs["a"] > 0
+
+
+@mark_side_effect(Positive())
+def identity(a: int) -> int:
+    return a
+
+
+def shm_segments():
+    try:
+        return set(os.listdir("/dev/shm"))
+    except FileNotFoundError:  # pragma: no cover
+        return set()
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with GuardExecutor(add, max_workers=2) as ex:
+        yield ex
+
+
+def test_submit(executor):
+    assert executor.submit(1).result() == 2
+    assert executor.submit(1, b=2).result() == 3
+    # invalid inputs fail in the parent
+    future = executor.submit(20)
+    assert future.done()
+    with pytest.raises(CheckError):
+        future.result()
+    # outputs are checked on return
+    with pytest.raises(CheckError):
+        executor.submit(10, b=10).result()
+
+
+@pytest.mark.parametrize("batch_size", [None, 1, 3])
+def test_map(executor, batch_size):
+    rows = [(i,) for i in range(8)] + [(20,), (10, 10), ("x",)]
+    res = executor.map(rows, batch_size=batch_size)
+    assert res.results[:8] == [i + 1 for i in range(8)]
+    assert sorted(res.errors) == [8, 9, 10]
+    assert res.valid_rows == list(range(8))
+    assert executor.map({"a": [1, 2], "b": [3, 4]}).results == [4, 6]
+
+
+def test_shared_memory_arrays():
+    before = shm_segments()
+    arr = np.arange(1000, dtype=np.float64)
+    with GuardExecutor(scale, max_workers=1, shm_threshold=1024) as ex:
+        assert (ex.submit(arr, 2.0).result() == arr * 2).all()
+        res = ex.map([(arr, 1.0), (arr[:10], 3.0)])
+        assert (res.results[0] == arr).all()
+        assert (res.results[1] == arr[:10] * 3).all()
+    with GuardExecutor(split, max_workers=1, shm_threshold=16) as ex:
+        first, rest = ex.submit(arr).result()
+        assert (first == arr[:2]).all() and (rest == arr[2:]).all()
+    assert shm_segments() - before == set()
+
+    handle, shm = SharedArray.create(arr, np)
+    view, shm2 = handle.attach(np)
+    assert (view == arr).all()
+    del view
+    shm2.close()
+    shm.unlink()
+
+
+def test_worker_errors_and_side_effects():
+    with GuardExecutor(fail, max_workers=1) as ex:
+        with pytest.raises(RuntimeError) as info:
+            ex.submit(1).result()
+        assert "failed in the worker" in str(info.value.__cause__)
+        res = ex.map([(1,)])
+        assert isinstance(res.errors[0][0], RuntimeError)
+    with GuardExecutor(inverse, max_workers=2) as ex:
+        # the other rows are kept
+        res = ex.map([(1,), (0,), (4,)], batch_size=1)
+        assert res.results == [1.0, None, 0.25]
+        err, = res.errors[1]
+        assert isinstance(err, ZeroDivisionError)
+        assert "ZeroDivisionError" in str(err.__cause__)
+    with GuardExecutor(identity, max_workers=1, check_side_effect=True) as ex:
+        assert ex.submit(1).result() == 1
+        with pytest.raises(CheckError):
+            ex.submit(-1).result()
+        res = ex.map([(1,), (-1,)])
+        assert res.results[0] == 1 and list(res.errors) == [1]
+    with pytest.raises(ValueError):
+        GuardExecutor(add, batch_size=0)
@@ -1,13 +1,14 @@
 import pytest
 
 import typing as T
+import inspect
 from funcdesc.mark import (
     Val, Outputs, mark_input, mark_output, mark_side_effect
 )
 from funcdesc.desc import Value, SideEffect, Description
 from funcdesc.parse import parse_func
 from funcdesc.guard import make_guard, Guard, CheckError
-from funcdesc.utils.json import DescriptionJSONEncoder
+from funcdesc.utils.json import DescriptionJSONEncoder, DescriptionJSONDecoder
 
 
 def test_mark_Val():
@@ -290,6 +291,21 @@ def test_serialization4():
     ser = desc2.to_json()
     with pytest.warns(UserWarning):
         Description.from_json(ser)
+    # invalid subscriptions are kept too
+    ser = ser.replace('"Position"', '"int[str]"')
+    with pytest.warns(UserWarning):
+        desc3 = Description.from_json(ser)
+    assert desc3.outputs[0].type == "int[str]"
+
+    class Picky():
+        def __class_getitem__(cls, item):
+            raise {1: IndexError, 2: KeyError}[item]()
+
+    decoder = DescriptionJSONDecoder()
+    for expr in ["Picky[1]", "Picky[2]"]:
+        with pytest.warns(UserWarning):
+            val = decoder.decode_value({"type": expr}, {"Picky": Picky})
+        assert val.type == expr
 
 
 def test_class_method():
@@ -320,6 +336,118 @@ def test_class_method():
         a.mth3(-1, 10)
 
 
+class Counter():
+    def __init__(self, start: int):
+        self.start = start
+
+    @make_guard
+    def add(self, a: Val[int, [0, 10]]) -> int:
+        return self.start + a
+
+    @make_guard
+    @classmethod
+    def create(cls, start: Val[int, [0, 10]]) -> "Counter":
+        return cls(start)
+
+    @make_guard
+    @staticmethod
+    def double(a: Val[int, [0, 10]]) -> int:
+        return a * 2
+
+
+def test_bound_guard():
+    import copy
+    import pickle
+    import threading
+
+    c1, c2 = Counter(100), Counter(200)
+    assert c1.add(1) == 101
+    assert c2.add(1) == 201
+    assert c1.add(2) == 102
+    with pytest.raises(CheckError):
+        c2.add(11)
+    # cached per instance, sharing the description and the plan
+    assert c1.add is c1.add
+    assert c1.add is not c2.add
+    assert c1.add.desc is c2.add.desc
+    assert c1.add.plan is c2.add.plan
+    assert [v.name for v in c1.add.desc.inputs] == ["a"]
+    # the description of the guard itself is not modified
+    assert [v.name for v in Counter.add.desc.inputs] == ["self", "a"]
+    assert Counter.add(c1, 3) == 103
+
+    assert pickle.loads(pickle.dumps(c1)).add(1) == 101
+    # copies don't reuse the guard bound to the original
+    c4 = copy.copy(c1)
+    c4.start = 400
+    assert c4.add(1) == 401
+    assert c1.add(1) == 101
+    assert c4.add.__self__ is c4
+    assert "add" not in vars(c1)
+    assert copy.deepcopy(c1).add.__self__ is not c1
+
+    results = {}
+
+    def run(i):
+        results[i] = Counter(i).add(1)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {i: i + 1 for i in range(8)}
+
+    c3 = Counter.create(5)
+    assert isinstance(c3, Counter) and c3.start == 5
+    assert c3.create(1).start == 1
+    with pytest.raises(CheckError):
+        Counter.create(11)
+    assert Counter.double(2) == c1.double(2) == 4
+    with pytest.raises(CheckError):
+        c1.double(11)
+
+
+def test_bound_guard_updates():
+    from funcdesc.metrics import GuardMetrics
+    from funcdesc.policy import EveryN
+
+    class Box():
+        @make_guard
+        def add(self, a: Val[int, [0, 10]]) -> int:
+            return a
+
+        @make_guard
+        @classmethod
+        def make(cls, a: Val[int, [0, 10]]) -> int:
+            return a
+
+    box = Box()
+    bound = box.add
+    assert box.add is bound
+    # recompiling the guard rebuilds the bound guards
+    Box.add.compile()
+    assert box.add is not bound
+    # so do the edits of the description
+    with pytest.raises(CheckError):
+        box.add(50)
+    Box.add.desc.inputs[1].range = [0, 100]
+    assert box.add(50) == 50
+    make = Box.__dict__["make"]
+    with pytest.raises(CheckError):
+        Box.make(50)
+    make.desc.inputs[1].range = [0, 100]
+    assert Box.make(50) == 50
+    # and replacing the policy or the metrics
+    policy = EveryN(2)
+    Box.add.policy = policy
+    assert box.add.policy is policy
+    make.metrics = GuardMetrics("make", make.desc)
+    assert Box.make.metrics is make.metrics
+    Box.make(1)
+    assert make.metrics.calls == 1
+
+
 def test_desc_repr():
     @mark_side_effect(SideEffect("test"))
     def f1(a: Val[int, [0, 10]], b: int = 10) -> Outputs[int, int]:
@@ -327,3 +455,293 @@ def test_desc_repr():
 
     desc = parse_func(f1)
     print(desc)
+
+
+def test_parameter_kinds():
+    def func(a, /, b: int = 1, *args: int, c, d=4, **kwargs: str):
+        return a
+
+    desc = parse_func(func)
+    assert desc.parse_pass_in((0, 2, 3, 4), {"c": 3, "e": "e"}) == {
+        "a": 0, "b": 2, "args": (3, 4), "c": 3, "d": 4, "kwargs": {"e": "e"},
+    }
+    assert desc.parse_pass_in((0,), {"a": "a", "c": 3}) == {
+        "a": 0, "b": 1, "args": (), "c": 3, "d": 4, "kwargs": {"a": "a"},
+    }
+    with pytest.raises(TypeError):
+        desc.parse_pass_in((0,), {})
+    with pytest.raises(TypeError):
+        desc.parse_pass_in((0, 1), {"b": 1, "c": 3})
+
+    def func2(a, *, b=1):
+        return a
+
+    desc2 = parse_func(func2)
+    with pytest.raises(TypeError):
+        desc2.parse_pass_in((0, 1), {})
+    with pytest.raises(TypeError):
+        desc2.parse_pass_in((0,), {"c": 1})
+    assert str(desc2.compose_signature()) == "(a: None, *, b: None = 1)"
+    assert Description.from_json(desc.to_json()) == desc
+
+    guard = make_guard(func)
+    assert guard(0, 1, 2, 3, c=3, e="e") == 0
+    with pytest.raises(CheckError):
+        guard(0, 1, 2, "3", c=3)
+    with pytest.raises(CheckError):
+        guard(0, 1, c=3, e=5)
+
+
+def test_binding_plan_invalidation():
+    desc = parse_func(lambda a, b=1: a)
+    plan = desc.binding_plan
+    assert desc.binding_plan is plan
+    assert desc.parse_pass_in((0,), {}) == {"a": 0, "b": 1}
+    desc.inputs[1].default = 2
+    assert desc.parse_pass_in((0,), {}) == {"a": 0, "b": 2}
+    desc.inputs[1].name = "c"
+    assert desc.parse_pass_in((0,), {"c": 3}) == {"a": 0, "c": 3}
+    desc.inputs[0] = Value(int, name="x")
+    assert desc.parse_pass_in((), {"x": 5}) == {"x": 5, "c": 2}
+    desc.inputs[1].kind = inspect.Parameter.KEYWORD_ONLY
+    with pytest.raises(TypeError):
+        desc.parse_pass_in((0, 1), {})
+    desc.inputs.append(Value(name="d", default=4))
+    assert desc.parse_pass_in((0,), {})["d"] == 4
+    # the plan of a frozen description is built once
+    frozen = desc.copy().freeze()
+    assert frozen.binding_plan is frozen.binding_plan
+
+
+def test_freeze():
+    desc = parse_func(lambda a, b=1: a)
+    desc.freeze()
+    assert desc.frozen and desc.inputs[0].frozen
+    assert isinstance(desc, Description)
+    with pytest.raises(AttributeError):
+        desc.name = "f"
+    with pytest.raises(AttributeError):
+        desc.inputs[0].range = [0, 1]
+    assert desc.parse_pass_in((0,), {}) == {"a": 0, "b": 1}
+    desc2 = desc.copy()
+    assert (not desc2.frozen) and (not desc2.inputs[0].frozen)
+    assert desc2 == desc
+    desc2.inputs[0].range = [0, 1]
+    assert desc.inputs[0].range is None
+
+    # Value in annotations are not shared between inputs
+    V = Val[int, [0, 10]]
+
+    def func(a: V, b: V):
+        pass
+
+    desc = parse_func(func)
+    assert [v.name for v in desc.inputs] == ["a", "b"]
+    assert V.name is None
+
+
+def test_fingerprint_and_intern():
+    import subprocess
+    import sys
+    from funcdesc.desc import InternTable
+
+    def func(a: Val[int, [0, 10]], b: str = "x") -> int:
+        return a
+
+    def func2(a: Val[int, [0, 10]], c: float = 1.0) -> int:
+        return a
+
+    desc = parse_func(func)
+    fp = desc.fingerprint()
+    assert parse_func(func).fingerprint() == fp
+    assert parse_func(func2).fingerprint() != fp
+    desc2 = parse_func(func)
+    desc2.inputs[0].range = [0, 11]
+    assert desc2.fingerprint() != fp
+    assert desc.freeze().fingerprint() == fp
+    assert desc.copy().fingerprint() == fp
+    # same across processes
+    code = (
+        "from funcdesc.desc import Value\n"
+        "print(Value(int, [0, 10], name='a').fingerprint())"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True,
+        check=True).stdout.strip()
+    assert out == Value(int, [0, 10], name="a").fingerprint()
+
+    # hashing of the frozen instances
+    frozen = parse_func(func).freeze()
+    assert hash(frozen) == hash(desc) and len({frozen, desc}) == 1
+    with pytest.raises(TypeError):
+        hash(parse_func(func))
+    assert len({Value(T.List[int]).freeze(), Value(T.List[int]).freeze()}) == 1
+
+    table = InternTable()
+    d1 = table.description(parse_func(func))
+    d2 = table.description(parse_func(func2))
+    assert d1.frozen and (d1.inputs[0] is d2.inputs[0])
+    assert table.description(parse_func(func)) is d1
+    assert table.value(Value(str, name="b", default="x")) is d1.inputs[1]
+    assert len(table) == 6  # a, b, c, the output and 2 descriptions
+    table.clear()
+    assert len(table) == 0
+
+
+def test_parse_cache():
+    from funcdesc.parse import parse_cache
+    from funcdesc.mark import sign_parameters
+
+    def func(a: int, b: int) -> int:
+        return a + b
+
+    parse_cache.clear()
+    desc = parse_func(func, cache=True)
+    assert desc.frozen
+    assert parse_func(func, cache=True) is desc
+    assert parse_cache.stats()["hits"] == 1
+    assert parse_func(func) is not desc
+
+    mark_input("a", range=[0, 10])(func)
+    desc2 = parse_func(func, cache=True)
+    assert desc2 is not desc
+    assert desc2.inputs[0].range == [0, 10]
+    sign_parameters("c")(func)
+    desc3 = parse_func(func, cache=True)
+    assert [v.name for v in desc3.inputs] == ["c"]
+    assert parse_cache.stats() == {
+        "hits": 1, "misses": 3, "invalidations": 2, "size": 1}
+    del func
+    assert parse_cache.stats()["size"] == 0
+
+
+def test_compact_and_pickle():
+    import pickle
+
+    v = Val[int, [0, 10]]
+    assert not hasattr(v, "__dict__")
+    assert v._kwargs is None
+    assert v.kwargs == {}
+    v2 = Value(int, attr=1)
+    assert v2.kwargs == {"attr": 1}
+    assert v2.copy().kwargs == {"attr": 1}
+    assert v2.copy().kwargs is not v2.kwargs
+    assert not hasattr(Description(), "__dict__")
+    assert not hasattr(SideEffect("test"), "__dict__")
+
+    @mark_input("a", attr="a")
+    @mark_side_effect(SideEffect("test"))
+    def func(a: Val[int, [0, 10]], b=1) -> int:
+        return a
+
+    desc = parse_func(func)
+    assert desc.inputs[0].kwargs == {"attr": "a"}
+    for d in (desc, desc.copy().freeze()):
+        d2 = pickle.loads(pickle.dumps(d))
+        assert d2 == d
+        assert d2.frozen == d.frozen
+        assert d2.inputs[0].default is d.inputs[0].default
+
+
+def test_jsonl(tmp_path):
+    import io
+    from funcdesc.utils.json import dump_jsonl, iter_jsonl
+
+    def func1(a: int, b: int = 2) -> int:
+        return a + b
+
+    def func2(a: str, *args: int) -> T.List[int]:
+        """doc\nwith new line"""
+        return []
+
+    descs = [parse_func(func1), parse_func(func2)]
+    path = tmp_path / "descs.jsonl"
+    assert dump_jsonl(iter(descs), path) == 2
+    assert list(iter_jsonl(path)) == descs
+    assert list(iter_jsonl(str(path), names={"func2"})) == descs[1:]
+
+    buf = io.StringIO()
+    dump_jsonl(descs, buf)
+    buf.seek(0)
+    res = iter_jsonl(buf, names=["func1"])
+    assert next(res) == descs[0]
+    with pytest.raises(StopIteration):
+        next(res)
+
+
+def test_binary_registry(tmp_path):
+    from funcdesc.utils.binary import dump_binary, BinaryRegistry
+    from funcdesc.utils.json import dump_jsonl, iter_jsonl
+
+    def func1(a: int, b: int = 2) -> int:
+        return a + b
+
+    def func2(a: str, *args: int, c: T.Optional[str] = None, **kw) -> T.List:
+        """doc\nwith new line"""
+        return []
+
+    desc3 = Description(
+        [Value(float, [0, 1], name="x", doc="ratio")],
+        [Value(float, [0, 1])],
+        [SideEffect("print")], name="func3", doc="d")
+    descs = [parse_func(func2), parse_func(func1), desc3]
+    path = tmp_path / "descs.bin"
+    assert dump_binary(descs, path) == 3
+    jsonl_path = tmp_path / "descs.jsonl"
+    dump_jsonl(descs, jsonl_path)
+    with BinaryRegistry(path) as reg:
+        assert len(reg) == 3
+        assert list(reg.names()) == ["func1", "func2", "func3"]
+        assert "func2" in reg
+        assert "func4" not in reg
+        assert reg.get("func4") is None
+        with pytest.raises(KeyError):
+            reg["func4"]
+        assert reg["func2"] == descs[0]
+        assert reg["func3"].side_effects[0].description == "print"
+        by_name = {d.name: d for d in iter_jsonl(jsonl_path)}
+        assert list(reg) == [by_name[n] for n in sorted(by_name)]
+        # the cached ranges are not shared between the decoded values
+        reg["func3"].inputs[0].range.append(2)
+        assert reg["func3"].inputs[0].range == [0, 1]
+
+    with pytest.raises(ValueError):
+        dump_binary([desc3, desc3], path)
+    with pytest.raises(ValueError):
+        BinaryRegistry(jsonl_path)
+    short_path = tmp_path / "short.bin"
+    short_path.write_bytes(b"FDSC")
+    with pytest.raises(ValueError, match="Not a binary registry"):
+        BinaryRegistry(short_path)
+
+
+def test_lazy_import():
+    import subprocess
+    import sys
+    import funcdesc
+
+    code = (
+        "import sys, funcdesc\n"
+        "assert 'funcdesc.guard' not in sys.modules\n"
+        "assert 'funcdesc.desc' not in sys.modules\n"
+        "from funcdesc import Description\n"
+        "assert 'funcdesc.guard' not in sys.modules\n"
+        "from funcdesc import make_guard, parse_func\n"
+        "for m in ('asyncio', 'docstring_parser', 'pydantic'):\n"
+        "    assert m not in sys.modules, m\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+    assert "make_guard" in dir(funcdesc)
+    assert funcdesc.Guard is Guard
+    with pytest.raises(AttributeError):
+        funcdesc.not_exists
+    # the submodules are still accessible as attributes
+    code = (
+        "import funcdesc\n"
+        "assert funcdesc.guard.Guard is funcdesc.Guard\n"
+        "assert funcdesc.types.OneOf\n"
+        "assert funcdesc.utils.json.dump_jsonl\n"
+        "for m in ('desc', 'parse', 'mark'):\n"
+        "    assert getattr(funcdesc, m).__name__ == 'funcdesc.' + m\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
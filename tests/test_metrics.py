@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from funcdesc.mark import Val, mark_side_effect
+from funcdesc.desc import SideEffect
+from funcdesc.guard import make_guard, CheckError
+from funcdesc.policy import EveryN
+from funcdesc.plan import error_source
+from funcdesc.metrics import registry, profile_checks, Histogram
+
+
+class Flag(SideEffect):
+    def __init__(self):
+        super().__init__("flag")
+        self.ok = True
+
+    def check_before_run(self, inputs):
+        return self.ok
+
+
+def test_guard_metrics():
+    flag = Flag()
+
+    @make_guard(metrics=True, check_side_effect=True)
+    @mark_side_effect(flag)
+    def func(a: Val[int, [0, 10]], b: Val[int, [0, 10]]) -> Val[int, [0, 10]]:
+        return a + b
+
+    m = func.metrics
+    assert m in list(registry)
+    func(1, 2)
+    with pytest.raises(CheckError) as e:
+        func(11, 12)
+    assert error_source(e.value.args[0][0]) is func.desc.inputs[0]
+    with pytest.raises(CheckError):
+        func(5, 9)
+    flag.ok = False
+    with pytest.raises(CheckError):
+        func(1, 2)
+    assert (m.calls, m.checked_calls, m.failures) == (4, 4, 3)
+    assert m.phase_failures == {
+        "check_inputs": 1, "check_outputs": 1,
+        "check_side_effects_before_run": 1,
+    }
+    assert m.source_failures == {
+        "input[0]:a": 1, "input[1]:b": 1, "output[0]:output_0": 1,
+        "side_effect[0]:Flag": 1,
+    }
+    assert m.timings["func"].count == 2
+    assert m.timings["check_inputs"].count == 3
+
+    snap = [s for s in registry.snapshot() if s["name"] == m.name][0]
+    assert snap["calls"] == 4
+    assert set(snap["timings"]) >= {"check_inputs", "func"}
+    report = registry.report()
+    assert m.name in report
+    assert "failed input[0]:a" in report
+    m.reset()
+    assert m.calls == 0
+
+
+def test_metrics_with_policy():
+    @make_guard(metrics=True, policy=EveryN(2))
+    def func(a: Val[int, [0, 10]]) -> int:
+        return a
+
+    for i in range(4):
+        func(i)
+    m = func.metrics
+    assert (m.calls, m.checked_calls) == (4, 2)
+    assert m.timings["func"].count == 4
+    assert m.timings["check_inputs"].count == 2
+    assert m.timings["check_side_effects_before_run"].count == 0
+
+
+def test_async_metrics():
+    @make_guard(metrics=True)
+    async def func(a: Val[int, [0, 10]]) -> int:
+        return a
+
+    asyncio.run(func(1))
+    with pytest.raises(CheckError):
+        asyncio.run(func(11))
+    assert (func.metrics.calls, func.metrics.failures) == (2, 1)
+    assert func.metrics.source_failures == {"input[0]:a": 1}
+
+
+def test_histogram():
+    h = Histogram()
+    for t in (1e-6, 3e-6, 1e-3):
+        h.observe(t)
+    assert h.count == 3
+    assert h.mean == pytest.approx((1e-6 + 3e-6 + 1e-3) / 3)
+    assert h.quantile(0.5) == pytest.approx(4e-6)
+    assert h.quantile(1.0) == pytest.approx(1e-3)
+    assert sum(h.to_dict()["buckets"].values()) == 3
+
+
+def test_profile_checks():
+    @make_guard
+    def func(a: Val[int, [0, 10]], *args: Val[int, [0, 10]]) -> int:
+        return a
+
+    costs = profile_checks(func, (1, 2, 3), repeat=10)
+    assert set(costs) == {"input[0]:a", "input[1]:args"}
+    assert all(c >= 0 for c in costs.values())
+
+
+def test_bound_method_metrics():
+    class A():
+        @make_guard(metrics=True)
+        def f(self, a: Val[int, [0, 10]]) -> int:
+            return a
+
+    obj = A()
+    m = A.f.metrics
+    assert obj.f.metrics is m
+    with pytest.raises(CheckError):
+        obj.f(11)
+    with pytest.raises(CheckError):
+        A.f(obj, 12)
+    assert obj.f(1) == 1
+    with pytest.raises(CheckError):
+        obj.f(13)
+    assert A.f(obj, 2) == 2
+    # bound and unbound calls are labeled by the method's description
+    assert m.desc is A.f.desc
+    assert (m.calls, m.failures) == (5, 3)
+    assert m.source_failures == {"input[1]:a": 3}
@@ -0,0 +1,87 @@
+import pytest
+
+from funcdesc.desc import Value
+from funcdesc.mark import Val, mark_input
+from funcdesc.parse import parse_func
+from funcdesc.guard import make_guard, CheckError
+from funcdesc.plan import CheckPlan
+
+
+def test_plan_check_inputs():
+    def add(a: Val[int, [0, 10]], b: int = 1, c=None) -> int:
+        return a + b
+
+    plan = CheckPlan(parse_func(add), bind_inputs=True)
+    assert plan.check_inputs((1,), {}) == {"a": 1, "b": 1, "c": None}
+    assert plan.check_inputs((1,), {"b": 2}) == {"a": 1, "b": 2, "c": None}
+    with pytest.raises(CheckError) as e:
+        plan.check_inputs((11, "1"), {})
+    errors = e.value.args[0]
+    assert isinstance(errors[0], ValueError)
+    assert isinstance(errors[1], TypeError)
+    with pytest.raises(TypeError):
+        plan.check_inputs((), {})
+
+    plan = CheckPlan(parse_func(add), check_range=False)
+    assert plan.check_inputs((11,), {}) is None
+    plan = CheckPlan(parse_func(add), check_inputs=False)
+    assert "args[0]" not in plan.source
+
+
+def test_plan_check_outputs():
+    def func(a) -> Val[int, [0, 10]]:
+        return a
+
+    plan = CheckPlan(parse_func(func))
+    plan.check_outputs(1)
+    plan.check_outputs((1,))
+    with pytest.raises(CheckError):
+        plan.check_outputs(11)
+    with pytest.raises(CheckError):
+        plan.check_outputs((1, 2))
+    assert plan.call(func, (1,), {}) == 1
+
+
+def test_guard_recompile():
+    @make_guard
+    @mark_input("a", range=[0, 10])
+    def func(a: int) -> int:
+        return a
+
+    with pytest.raises(CheckError):
+        func(20)
+    # changes of the description are applied on the next call
+    func.desc.inputs[0].range = [0, 100]
+    assert func(20) == 20
+    func.desc.inputs[0].range[1] = 15
+    with pytest.raises(CheckError):
+        func(20)
+    func.desc.inputs[0].type = str
+    with pytest.raises(CheckError):
+        func(5)
+    func.desc.inputs[0].type = int
+    plan = func.plan
+    assert func.plan is plan
+    assert func(5) == 5
+    func.is_check_inputs = False
+    func.compile()
+    assert func(200) == 200
+
+    class Small():
+        pass
+
+    @make_guard
+    def func2(a: Small) -> int:
+        return 1
+
+    plan = func2.plan
+    assert func2(100) == 1
+    # registering a checker increases Value.checker_version,
+    # the plan is recompiled on the next call
+    Value.register_type_check(Small, lambda v, t: v < 10)
+    assert plan.checker_version != Value.checker_version
+    with pytest.raises(CheckError):
+        func2(100)
+    assert func2.plan is not plan
+    assert func2.plan.checker_version == Value.checker_version
+    assert func2(1) == 1
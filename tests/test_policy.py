@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pytest
+
+from funcdesc.mark import Val
+from funcdesc.guard import make_guard, CheckError
+from funcdesc.policy import (
+    EveryN, RandomFraction, FirstNPerSignature, OverheadBudget,
+)
+
+
+def test_every_n():
+    @make_guard(policy=EveryN(3))
+    def func(a: Val[int, [0, 10]]) -> int:
+        return a
+
+    with pytest.raises(CheckError):
+        func(11)  # 1st call is checked
+    assert func(11) == 11
+    assert func(11) == 11
+    with pytest.raises(CheckError):
+        func(11)
+    func.policy.reset()
+    with pytest.raises(CheckError):
+        func(11)
+    with pytest.raises(ValueError):
+        EveryN(0)
+
+
+def test_sampled_out_calls_skip_binding():
+    @make_guard(policy=EveryN(2))
+    def func(a: int) -> int:
+        return a
+
+    func(1)
+    # sampled out: bad arguments reach the function directly
+    with pytest.raises(TypeError):
+        func(1, 2)
+
+
+def test_random_fraction():
+    @make_guard(policy=RandomFraction(0.0))
+    def func(a: Val[int, [0, 10]]) -> int:
+        return a
+
+    assert func(11) == 11
+    func.policy = RandomFraction(1.0)
+    with pytest.raises(CheckError):
+        func(11)
+    policy = RandomFraction(0.5, seed=1)
+    n = sum(policy.should_check((), {}) for _ in range(1000))
+    assert 400 < n < 600
+    with pytest.raises(ValueError):
+        RandomFraction(2)
+
+
+def test_first_n_per_signature():
+    @make_guard(policy=FirstNPerSignature(1))
+    def func(a: Val[int, [0, 10]], b=None) -> int:
+        return a
+
+    assert func(1) == 1
+    assert func(11) == 11  # (int,) was checked once
+    with pytest.raises(CheckError):
+        func("a")
+    with pytest.raises(CheckError):
+        func(11, b=1)
+    assert func(11, b=2) == 11
+    assert func.policy.counts == {(int,): 1, (str,): 1, (int, ("b", int)): 1}
+
+
+def test_overhead_budget():
+    policy = OverheadBudget(10)
+
+    def slow_check(x):
+        time.sleep(0.01)
+        return True
+
+    from funcdesc.desc import Value, Description
+    from funcdesc.guard import Guard
+
+    class Slow:
+        pass
+
+    Value.register_type_check(Slow, lambda v, t: slow_check(v))
+    try:
+        def func(a):
+            return a
+
+        desc = Description([Value(Slow, name="a")], [Value(Slow)])
+        guard = Guard(func, desc, policy=policy)
+        s = Slow()
+        for _ in range(20):
+            guard(s)
+        assert policy.n_checked == 1
+        assert policy.overhead > 10
+    finally:
+        Value.type_to_type_checker.pop(Slow)
+        Value.checker_version += 1
+
+    policy = OverheadBudget(50)
+    policy.record(1.0, 10.0)
+    assert policy.should_check((), {})
+    policy.record(5.0, 0.0)
+    assert not policy.should_check((), {})
+    assert policy.overhead == pytest.approx(60)
+
+
+def test_async_policy():
+    @make_guard(policy=EveryN(2))
+    async def func(a: Val[int, [0, 10]]) -> int:
+        return a
+
+    with pytest.raises(CheckError):
+        asyncio.run(func(11))
+    assert asyncio.run(func(11)) == 11
+
+    @make_guard(policy=OverheadBudget(1000))
+    async def func2(a: Val[int, [0, 10]]) -> int:
+        await asyncio.sleep(0.001)
+        return a
+
+    assert asyncio.run(func2(1)) == 1
+    assert func2.policy.n_checked == 1
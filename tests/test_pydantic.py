@@ -1,4 +1,5 @@
 from funcdesc.pydantic import parse_func_pydantic
+from funcdesc.parse import parse_func
 
 from pydantic import BaseModel
 
@@ -17,3 +18,47 @@ def test_pydantic():
     res = parse_func_pydantic(func2)
     assert issubclass(res["inputs"], BaseModel)
     assert issubclass(res["outputs"], BaseModel)
+
+
+def test_model_cache():
+    from funcdesc.pydantic import (
+        desc_to_pydantic, desc_to_json_schema, model_cache,
+        clear_model_cache, ModelCache,
+    )
+
+    def func(a: int, b: int = 10) -> int:
+        return a + b
+
+    def func2(a: int, b: int = 10) -> int:
+        return a - b
+
+    func2.__name__ = "func"
+
+    def func3(a: int, b: bool = True) -> int:
+        return a
+
+    clear_model_cache()
+    res = parse_func_pydantic(func, cache=True)
+    # equivalent description
+    assert parse_func_pydantic(func2, cache=True) == res
+    res3 = parse_func_pydantic(func3, cache=True)
+    assert res3["inputs"] is not res["inputs"]
+    assert model_cache.stats()["hits"] == 1
+    desc = parse_func(func)
+    assert desc_to_pydantic(desc, cache=True)["inputs"] is res["inputs"]
+    # not cached by default
+    uncached = desc_to_pydantic(desc)
+    assert uncached["inputs"] is not res["inputs"]
+    assert parse_func_pydantic(func)["inputs"] is not res["inputs"]
+    assert model_cache.stats()["hits"] == 2
+
+    schemas = desc_to_json_schema(desc)
+    assert schemas["inputs"]["properties"]["b"]["default"] == 10
+    assert desc_to_json_schema(desc)["inputs"] is schemas["inputs"]
+
+    small = ModelCache(maxsize=1)
+    small.models(desc)
+    small.models(parse_func(func3))
+    assert small.stats()["size"] == 1
+    clear_model_cache()
+    assert model_cache.stats()["size"] == 0
@@ -0,0 +1,129 @@
+import typing as T
+
+import pytest
+
+from funcdesc import DescriptionRegistry
+from funcdesc.desc import Value, Description
+from funcdesc.mark import Val, mark_side_effect
+from funcdesc.parse import parse_func
+from funcdesc.types import OneOf, SubSet, InputPath, WriteFile
+
+
+class WriteLog(WriteFile):
+    pass
+
+
+def read_table(
+        path: InputPath, sep: Val[OneOf, [",", "\t"]] = ",",
+        ) -> T.List[float]:
+    return []
+
+
+@mark_side_effect(WriteFile("{inputs[out]}"))
+def save(values: T.List[float], out: str, n: Val[int, [0, 10]] = 0) -> None:
+    pass
+
+
+@mark_side_effect(WriteLog("log.txt"))
+def mean(values: T.List[float]) -> Val[float, [0.0, 1.0]]:
+    return 0.0
+
+
+def test_registry_lookups():
+    reg = DescriptionRegistry({
+        "read_table": parse_func(read_table),
+        "save": parse_func(save),
+        "mean": parse_func(mean),
+    })
+    assert len(reg) == 3
+    assert reg["save"].frozen
+    assert set(reg.with_input_type(InputPath)) == {"read_table"}
+    assert set(reg.with_input_type(T.List[float])) == {"save", "mean"}
+    assert set(reg.with_output_type(float)) == {"mean"}
+    assert set(reg.with_output_type(T.List[float])) == {"read_table"}
+    assert set(reg.with_value_name("values")) == {"save", "mean"}
+    assert set(reg.with_range_checker(OneOf)) == {"read_table"}
+    # int and float share the checker
+    assert set(reg.with_range_checker(int)) == {"save", "mean"}
+    assert set(reg.with_range_checker(SubSet)) == set()
+    assert set(reg.with_range_checker(list)) == set()
+    assert set(reg.with_side_effect(WriteFile)) == {"save", "mean"}
+    assert set(reg.with_side_effect(WriteFile, subclasses=False)) == \
+        {"save"}
+    assert set(reg.with_side_effect(WriteLog)) == {"mean"}
+    assert set(reg.with_input_type(object, subclasses=True)) == \
+        {"read_table", "save"}  # only the classes, not List[float]
+    assert reg.find(value_name="values", output_type=float) == {"mean"}
+    assert reg.find(value_name="values", side_effect=WriteLog) == {"mean"}
+    assert reg.find(value_name="nothing", side_effect=WriteLog) == set()
+    assert reg.find() == {"read_table", "save", "mean"}
+
+
+def test_registry_updates():
+    reg = DescriptionRegistry()
+    desc = Description([Value(int, name="a")], [Value(float)], name="f")
+    stored = reg.add("f", desc)
+    assert stored.frozen and not desc.frozen
+    assert reg.get("f") is stored
+    view = reg.with_input_type(int)
+    assert set(view) == {"f"}
+    # replacing drops the old keys
+    reg["f"] = Description([Value(str, name="b")])
+    assert set(view) == set()
+    assert set(reg.with_input_type(int)) == set()
+    # the view stays live after its key is emptied
+    reg["f"] = desc
+    assert set(view) == {"f"}
+    reg["f"] = Description([Value(str, name="b")])
+    assert set(reg.with_value_name("a")) == set()
+    assert set(reg.with_value_name("b")) == {"f"}
+    assert set(reg.with_output_type(float)) == set()
+    reg.add("g", Description([Value(str, name="b")]))
+    del reg["f"]
+    assert "f" not in reg
+    assert set(reg.with_value_name("b")) == {"g"}
+    with pytest.raises(KeyError):
+        reg.remove("f")
+    assert reg.remove("g").inputs[0].name == "b"
+    assert len(reg) == 0
+    assert all(not names for index in reg._indexes.values()
+               for names in index.values())
+    reg.add("h", Description([Value([1, 2], name="x")]))
+    assert set(reg.with_input_type([1, 2])) == {"h"}
+    reg.clear()
+    assert list(reg) == [] and reg._keys == {}
+    assert set(view) == set()
+    reg.add("f", desc)
+    assert set(view) == {"f"}
+
+
+def test_registry_failed_add():
+    reg = DescriptionRegistry()
+    reg.add("f", Description([Value(int, name="a")], name="f"))
+    # an unfreezable description doesn't remove the old one
+    bad = Description([Value(int, name="a")], name="f")
+    bad.inputs = None  # type: ignore
+    with pytest.raises(TypeError):
+        reg.add("f", bad)
+    assert set(reg.with_value_name("a")) == {"f"}
+    assert reg["f"].inputs[0].name == "a"
+
+
+def test_registry_subclass_views():
+    reg = DescriptionRegistry({"save": parse_func(save)})
+    exact = reg.with_side_effect(WriteFile, subclasses=False)
+    subclasses = reg.with_side_effect(WriteFile)
+    assert set(exact) == set(subclasses) == {"save"}
+    # both forms are live views
+    reg["mean"] = parse_func(mean)
+    assert set(exact) == {"save"}
+    assert set(subclasses) == {"save", "mean"} and len(subclasses) == 2
+    assert "mean" in subclasses and "read_table" not in subclasses
+    assert subclasses & {"mean", "x"} == {"mean"}
+    inputs = reg.with_input_type(object, subclasses=True)
+    reg["read_table"] = parse_func(read_table)
+    assert set(inputs) == {"read_table", "save"}
+    del reg["save"]
+    assert set(exact) == set()
+    assert set(subclasses) == {"mean"}
+    assert set(inputs) == {"read_table"}
@@ -0,0 +1,142 @@
+import textwrap
+import typing as T
+import warnings
+
+import pytest
+
+from funcdesc.parse import parse_func
+from funcdesc.scan import scan_source, scan_file, scan_paths, module_name
+
+
+SOURCE = textwrap.dedent('''
+    import typing as T
+    import numpy as np
+    from funcdesc import Val, Outputs, mark_input, mark_output
+    from funcdesc import mark_side_effect
+    from funcdesc.types import WriteFile
+
+    CHOICES = ["a", "b"]
+
+
+    @mark_input("b", range=[0, 1], doc="The b.")
+    @mark_output(0, name="total")
+    def add(a: Val[int, [0, 10]], b: float = 0.5, *args: int,
+            c: Val[str, CHOICES] = "a", **kwargs) -> int:
+        """Add the numbers."""
+        return a
+
+
+    def split(x: T.List[int], /, arr: np.ndarray) -> T.Tuple[int, str]:
+        return 0, ""
+
+
+    async def pair(a: "int") -> Outputs[Val[int, [0, 1]], np.ndarray]:
+        pass
+
+
+    @mark_side_effect(WriteFile("{inputs[0]}.txt"))
+    def write(path, mode=T.Any):
+        pass
+
+
+    def _private(a: int):
+        pass
+''')
+
+
+def test_scan_source():
+    descs = scan_source(SOURCE)
+    assert list(descs) == ["add", "split", "pair", "write"]
+
+    namespace: dict = {}
+    exec(compile(SOURCE, "<test>", "exec"), namespace)
+    for name in ["add", "split"]:
+        parsed = parse_func(namespace[name])
+        scanned = descs[name]
+        assert [v.name for v in scanned.inputs] == \
+            [v.name for v in parsed.inputs]
+        assert [v.kind for v in scanned.inputs] == \
+            [v.kind for v in parsed.inputs]
+        assert [v.name for v in scanned.outputs] == \
+            [v.name for v in parsed.outputs]
+    assert descs["add"] == parse_func(namespace["add"])
+    assert descs["add"].doc == "Add the numbers."
+    assert descs["add"].inputs[1].range == [0, 1]
+    assert descs["add"].inputs[3].range == ["a", "b"]
+
+    split = descs["split"]
+    assert split.inputs[0].type == namespace["T"].List[int]
+    assert split.inputs[1].type == "np.ndarray"
+    assert [v.type for v in split.outputs] == [int, str]
+    pair = descs["pair"]
+    assert pair.inputs[0].type is int
+    assert pair.outputs[0].range == [0, 1]
+    assert pair.outputs[1].type == "np.ndarray"
+    write = descs["write"]
+    assert write.side_effects[0].description == \
+        "WriteFile('{inputs[0]}.txt')"
+    assert write.inputs[1].default == "T.Any"
+    # the types as strings survive the JSON round trip
+    from funcdesc.desc import Description
+    with pytest.warns(UserWarning):
+        assert Description.from_json(split.to_json()) == split
+
+
+def test_scan_paths(tmp_path):
+    pkg = tmp_path / "pkg"
+    (pkg / "sub").mkdir(parents=True)
+    (pkg / "__init__.py").write_text("def top(a: int) -> int:\n    pass\n")
+    (pkg / "sub" / "__init__.py").write_text("")
+    (pkg / "sub" / "mod.py").write_text(SOURCE)
+    (pkg / "broken.py").write_text("def f(:\n")
+    assert module_name(pkg / "sub" / "mod.py") == "pkg.sub.mod"
+    assert module_name(pkg / "__init__.py") == "pkg"
+    assert list(scan_file(pkg / "__init__.py")) == ["pkg.top"]
+
+    expected = {
+        "pkg.top", "pkg.sub.mod.add", "pkg.sub.mod.split",
+        "pkg.sub.mod.pair", "pkg.sub.mod.write",
+    }
+    for max_workers in [1, 2]:
+        with warnings.catch_warnings(record=True) as record:
+            warnings.simplefilter("always")
+            descs = scan_paths(pkg, max_workers=max_workers)
+        assert set(descs) == expected
+        assert any("broken.py" in str(w.message) for w in record)
+    assert descs["pkg.sub.mod.add"] == scan_source(SOURCE)["add"]
+
+
+def test_scan_unresolvable_types(tmp_path):
+    source = (
+        "import typing as T\n"
+        "def f(a: 'T.Dict[int]', b: T.List[int, str], c: 'int[') -> int:\n"
+        "    pass\n"
+    )
+    desc = scan_source(source)["f"]
+    assert [v.type for v in desc.inputs] == \
+        ["T.Dict[int]", "T.List[int, str]", "int["]
+    (tmp_path / "mod.py").write_text(source)
+    assert set(scan_paths(tmp_path, max_workers=1)) == {"mod.f"}
+
+
+def test_scan_local_names():
+    source = (
+        "import typing as T\n"
+        "from typing import List\n"
+        "from re import Pattern\n"
+        "def f(m: Match, p: Pattern, a: List[int], b: T.Optional[int],\n"
+        "      c: 'Item', d: list) -> Text:\n"
+        "    pass\n"
+        "class Match:\n"
+        "    pass\n"
+        "class Item:\n"
+        "    pass\n"
+    )
+    desc = scan_source(source)["f"]
+    # names not imported from typing nor builtins are kept as strings
+    assert [v.type for v in desc.inputs] == [
+        "Match", "Pattern", T.List[int], T.Optional[int], "Item", list]
+    assert desc.outputs[0].type == "Text"
+    # module level definitions shadow the builtins
+    desc = scan_source("class list:\n    pass\ndef g(a: list): pass\n")["g"]
+    assert desc.inputs[0].type == "list"
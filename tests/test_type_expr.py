@@ -0,0 +1,47 @@
+import typing as T
+
+import pytest
+
+from funcdesc.utils.type_expr import resolve_type
+
+
+def test_resolve_type():
+    assert resolve_type("int") is int
+    assert resolve_type("NoneType") is type(None)
+    assert resolve_type("None") is None
+    assert resolve_type("list[int]") == list[int]
+    assert resolve_type("typing.Dict[str, int]") == T.Dict[str, int]
+    assert resolve_type("typing.Optional[str]") == T.Optional[str]
+    assert resolve_type("Optional[str]") == T.Optional[str]
+    assert resolve_type("typing.Union[str, int]") == T.Union[str, int]
+    assert resolve_type("str | int") == T.Union[str, int]
+    assert resolve_type("typing.Literal['a', 1, -1]") == \
+        T.Literal["a", 1, -1]
+    assert resolve_type("typing.Tuple[int, ...]") == T.Tuple[int, ...]
+    assert resolve_type("typing.Callable[[int], str]") == \
+        T.Callable[[int], str]
+    assert resolve_type(str(T.List[T.Dict[str, T.Optional[int]]])) == \
+        T.List[T.Dict[str, T.Optional[int]]]
+
+
+def test_resolve_type_env():
+    class Position:
+        pass
+
+    env = {"Position": Position, "T": T}
+    assert resolve_type("Position", env) is Position
+    assert resolve_type("typing.List[Position]", env) == T.List[Position]
+    assert resolve_type("T.Optional[int]", env) == T.Optional[int]
+    assert resolve_type("int", env) is int
+    assert env == {"Position": Position, "T": T}
+    with pytest.raises(NameError):
+        resolve_type("Position")
+
+
+def test_resolve_type_unsafe():
+    for expr in [
+            "eval('1')", "__import__('os')", "open",
+            "int.__subclasses__", "[c for c in ()]", "lambda: 1", "1 +",
+            ]:
+        with pytest.raises((NameError, ValueError)):
+            resolve_type(expr)
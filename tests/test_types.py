@@ -123,3 +123,157 @@ def test_write_file_effect():
     with pytest.raises(CheckError):
         func6(test_name)
     os.remove(test_name+".txt")
+
+
+def test_checker_resolution():
+    import enum
+    from funcdesc.desc import Value
+
+    class Level(enum.IntEnum):
+        LOW = 1
+        HIGH = 5
+
+    @make_guard
+    def func(a: Val[Level, [0, 3]]):
+        return a
+
+    assert func(Level.LOW) == Level.LOW
+    with pytest.raises(CheckError):
+        func(Level.HIGH)
+    with pytest.raises(CheckError):
+        func(1)
+
+    class MyPath(InputPath):
+        pass
+
+    assert Val[MyPath].type_checker is InputPath.check_type
+
+    # classes with the same name do not share checkers
+    def make_cls():
+        class Point:
+            pass
+        return Point
+
+    P1, P2 = make_cls(), make_cls()
+    Value.register_type_check(P1, lambda v, t: False)
+    assert Val[P1].type_checker is not None
+    assert Val[P2].type_checker is None
+
+    # registering a checker invalidates the resolved checkers
+    @make_guard
+    def func2(p: P2):
+        return p
+
+    func2(P2())
+    val = func2.desc.inputs[0]
+    Value.register_type_check(P2, lambda v, t: False)
+    assert val.type_checker is not None
+    with pytest.raises(CheckError):
+        func2(P2())
+
+
+def test_path_template():
+    from funcdesc.types import PathTemplate
+
+    t = PathTemplate("{inputs[0]}/{outputs[name]}.txt")
+    assert t.fields == {"inputs", "outputs"} and t.depends_on_outputs
+    assert t.format(inputs=["d"], outputs={"name": "f"}) == "d/f.txt"
+    assert not PathTemplate("{inputs.a}.txt").depends_on_outputs
+    effect = WriteFile("{inputs[0]}.txt")
+    effect.path_template = "{inputs[0]}/{outputs[0]}"
+    assert effect.check_before_run({0: "not_exist"})
+    assert effect.description == "Write file to {inputs[0]}/{outputs[0]}"
+
+
+def test_stat_cache(tmp_path):
+    from funcdesc.types import (
+        StatCache, enable_stat_cache, disable_stat_cache)
+
+    cache = StatCache(ttl=None)
+    (tmp_path / "a.txt").write_text("a")
+    assert cache.exists(tmp_path / "a.txt")
+    assert not cache.exists(str(tmp_path / "b.txt"))
+    assert not cache.exists(tmp_path / "no_dir" / "a.txt")
+    assert cache.stats() == {"hits": 1, "scans": 2, "dirs": 2}
+    (tmp_path / "b.txt").write_text("b")
+    assert not cache.exists(tmp_path / "b.txt")  # stale snapshot
+    assert cache.refresh(tmp_path / "b.txt")
+    assert cache.exists(tmp_path / "b.txt")
+    (tmp_path / "a.txt").unlink()
+    cache.invalidate(tmp_path / "a.txt")
+    assert not cache.exists(tmp_path / "a.txt")
+    cache.invalidate()
+    assert cache.stats()["dirs"] == 0
+    assert cache.exists("/")
+
+    ttl_cache = StatCache(ttl=0)
+    ttl_cache.exists(tmp_path / "a.txt")
+    ttl_cache.exists(tmp_path / "a.txt")
+    assert ttl_cache.stats()["scans"] == 2
+
+    # the hits are counted under the lock
+    from concurrent.futures import ThreadPoolExecutor
+    cache = StatCache(ttl=None)
+    cache.exists(tmp_path / "a.txt")
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(
+            lambda _: [cache.exists(tmp_path / "a.txt") for _ in range(500)],
+            range(8)))
+    assert cache.stats() == {"hits": 4000, "scans": 1, "dirs": 1}
+
+    @make_guard(check_side_effect=True)
+    @mark_side_effect(WriteFile(str(tmp_path) + "/{inputs[name]}.txt"))
+    def write(name: str, src: InputPath):
+        (tmp_path / f"{name}.txt").write_text("x")
+
+    shared = enable_stat_cache(ttl=None)
+    try:
+        write("c", tmp_path / "b.txt")
+        # the written file is seen by the snapshot
+        with pytest.raises(CheckError):
+            write("c", tmp_path / "b.txt")
+        with pytest.raises(CheckError):
+            write("d", tmp_path / "a.txt")
+        assert shared.stats()["scans"] == 1
+    finally:
+        disable_stat_cache()
+
+
+def test_indexed_range():
+    from funcdesc.types.value import RangeIndex
+
+    allowed = [f"v{i}" for i in range(500)] + [["x"], {"y": 1}]
+    index = RangeIndex(allowed)
+    assert "v1" in index and ["x"] in index and {"y": 1} in index
+    assert ("v1",) not in index and ["z"] not in index
+    assert index.missing(["v1", "a", ["x"], ["z"]]) == ["a", ["z"]]
+    assert repr(index) == repr(allowed) and len(index) == len(allowed)
+
+    val = Val[OneOf, allowed]
+    assert isinstance(val.checked_range, RangeIndex)
+    assert val.checked_range is val.checked_range
+    val.range = ["a"]
+    assert list(val.checked_range) == ["a"]
+    # the prepared range is rebuilt after the edits made in place
+    index = val.checked_range
+    val.range.append("b")
+    assert val.checked_range is not index
+    assert list(val.checked_range) == ["a", "b"]
+    val.check_range("b")
+    with pytest.raises(ValueError):
+        val.check_range("c")
+    assert val.checked_range is val.checked_range
+    assert Val[OneOf, "abc"].checked_range == "abc"
+    assert Val[int, [0, 1]].checked_range == [0, 1]
+
+    @make_guard
+    def pick(a: Val[OneOf, allowed], s: Val[SubSet, allowed]):
+        return a
+
+    assert pick("v3", ["v1", ["x"]]) == "v3"
+    with pytest.raises(CheckError) as e:
+        pick("v1", ["v1", "bad", "worse"])
+    err = e.value.args[0][0]
+    assert isinstance(err, ValueError)
+    assert "['bad', 'worse']" in str(err)
+    assert pick.map([("v1", ["v2"]), ("a", ["v2"])]).valid_rows == [0]
@@ -0,0 +1,82 @@
+import typing as T
+import collections.abc as abc
+
+import pytest
+
+from funcdesc.desc import Value
+from funcdesc.guard import make_guard, CheckError
+from funcdesc.mark import mark_input
+from funcdesc.validators import ContainerStrategy, compile_check
+
+
+def test_compile_check():
+    check = compile_check(T.List[int])
+    assert check([1, 2]) and check([])
+    assert not check([1, "a"]) and not check((1, 2))
+    check = compile_check(T.Dict[str, T.List[float]])
+    assert check({"a": [1.0]})
+    assert not check({"a": [1]}) and not check({1: [1.0]})
+    check = compile_check(T.Optional[int])
+    assert check(None) and check(1) and not check("a")
+    check = compile_check(T.Union[int, str])
+    assert check(1) and check("a") and not check(1.0)
+    check = compile_check(T.Literal["a", 1])
+    assert check("a") and check(1) and not check("b") and not check(True)
+    check = compile_check(T.Tuple[int, str])
+    assert check((1, "a")) and not check((1, 2)) and not check((1,))
+    check = compile_check(T.Tuple[int, ...])
+    assert check((1, 2, 3)) and not check((1, "a"))
+    check = compile_check(abc.Sequence[int])
+    assert check((1, 2)) and check([1]) and not check({1})
+    assert compile_check(T.Optional[T.Any]) is None
+    assert compile_check(T.List[T.Any])([1, "a"])
+    assert compile_check("List[int]") is None
+
+
+def test_container_strategy():
+    data = [1] * 1000 + ["a"]
+    assert not compile_check(T.List[int])(data)
+    first = ContainerStrategy("first", k=10)
+    assert compile_check(T.List[int], first)(data)
+    assert not compile_check(T.List[int], first)(["a"] + data)
+    sample = ContainerStrategy("sample", k=5, seed=0)
+    check = compile_check(T.List[int], sample)
+    assert check([1] * 100)
+    assert not check(["a"] * 100)
+    assert not compile_check(T.Set[int], sample)({"a"})
+    with pytest.raises(ValueError):
+        ContainerStrategy("all")
+
+
+def test_value_generic_checkers():
+    val = Value(T.List[int])
+    assert val.type_checker is not None
+    val.check_type([1, 2])
+    with pytest.raises(TypeError):
+        val.check_type([1, "a"])
+
+    @make_guard
+    @mark_input("a", container_strategy=ContainerStrategy("first", k=1))
+    def func(a: T.List[int], b: T.Optional[T.Dict[str, int]] = None) -> int:
+        return len(a)
+
+    assert func([1, "a"]) == 2
+    with pytest.raises(CheckError):
+        func(["a", 1])
+    assert func([1], {"x": 1}) == 1
+    with pytest.raises(CheckError):
+        func([1], {"x": "y"})
+
+    # registered checkers are used for the elements
+    class Pos(int):
+        pass
+
+    Value.register_type_check(Pos, lambda v, t: isinstance(v, int) and v > 0)
+    try:
+        val = Value(T.List[Pos])
+        val.check_type([1, 2])
+        with pytest.raises(TypeError):
+            val.check_type([1, -1])
+    finally:
+        Value.type_to_type_checker.pop(Pos)
+        Value.checker_version += 1